@@ -0,0 +1,37 @@
+"""movie_full_text_index
+
+Revision ID: 3f1c9a7d2b64
+Revises: 89d06752bbf2
+Create Date: 2026-10-17 09:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = '89d06752bbf2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index('ft_movies_title_description', 'movies', ['title', 'description'], mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        op.execute('CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(title, description)')
+        op.execute('INSERT INTO movies_fts (rowid, title, description) SELECT id, title, description FROM movies')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ft_movies_title_description', table_name='movies')
+    elif dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS movies_fts')
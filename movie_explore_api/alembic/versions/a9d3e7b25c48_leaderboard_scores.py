@@ -0,0 +1,72 @@
+"""leaderboard_scores
+
+Revision ID: a9d3e7b25c48
+Revises: f2c6d8a4b913
+Create Date: 2026-10-17 20:14:36.902117
+
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e7b25c48'
+down_revision: Union[str, Sequence[str], None] = 'f2c6d8a4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Match database_models.TOP_PRIOR_* and rating_stats.TRENDING_HALF_LIFE_DAYS.
+TOP_PRIOR_REVIEWS = 10
+TOP_PRIOR_RATING = 6.0
+TRENDING_HALF_LIFE_DAYS = 7.0
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A virtual generated column: SQLite cannot add a stored one to an existing table.
+    op.add_column('movie_rating_stats', sa.Column('top_score', sa.Float(), sa.Computed(
+        f'(rating_sum + {TOP_PRIOR_REVIEWS * TOP_PRIOR_RATING}) / (review_count + {TOP_PRIOR_REVIEWS})'
+    )))
+    op.add_column('movie_rating_stats', sa.Column('trend_score', sa.Double(), nullable=False, server_default='0'))
+    op.create_index('ix_movie_rating_stats_top_score_movie_id', 'movie_rating_stats', ['top_score', 'movie_id'])
+    op.create_index('ix_movie_rating_stats_trend_score_movie_id', 'movie_rating_stats', ['trend_score', 'movie_id'])
+
+    # Scores are scaled to a landmark that leaderboards.py moves forward; the
+    # backfill starts it at the present.
+    landmark = datetime.utcnow().replace(microsecond=0)
+    trend_landmark = op.create_table(
+        'trend_landmark',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('epoch', sa.DateTime(), nullable=False),
+    )
+    op.bulk_insert(trend_landmark, [{'id': 1, 'epoch': landmark}])
+
+    # Backfill in Python: the decay needs date arithmetic that differs per dialect.
+    bind = op.get_bind()
+    scores = defaultdict(float)
+    for movie_id, rating, created_at in bind.execute(sa.text('SELECT movie_id, rating, created_at FROM reviews')):
+        if created_at is None:
+            continue
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        half_lives = (created_at - landmark).total_seconds() / (TRENDING_HALF_LIFE_DAYS * 86400)
+        scores[movie_id] += rating / 10 * 2 ** half_lives
+    if scores:
+        bind.execute(
+            sa.text('UPDATE movie_rating_stats SET trend_score = :score WHERE movie_id = :movie_id'),
+            [{'movie_id': movie_id, 'score': score} for movie_id, score in scores.items()]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trend_landmark')
+    op.drop_index('ix_movie_rating_stats_trend_score_movie_id', table_name='movie_rating_stats')
+    op.drop_index('ix_movie_rating_stats_top_score_movie_id', table_name='movie_rating_stats')
+    with op.batch_alter_table('movie_rating_stats') as batch_op:
+        batch_op.drop_column('trend_score')
+        batch_op.drop_column('top_score')
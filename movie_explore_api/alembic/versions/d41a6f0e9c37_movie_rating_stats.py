@@ -0,0 +1,53 @@
+"""movie_rating_stats
+
+Revision ID: d41a6f0e9c37
+Revises: b7e2d4c81a05
+Create Date: 2026-10-17 13:05:27.880412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a6f0e9c37'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4c81a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BUCKETS = range(1, 11)
+
+
+def _bucket_condition(bucket: int) -> str:
+    # Matches rating_stats.rating_bucket: ratings are clamped into 1..10.
+    if bucket == 1:
+        return 'r.rating < 2'
+    if bucket == 10:
+        return 'r.rating >= 10'
+    return f'r.rating >= {bucket} AND r.rating < {bucket + 1}'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'movie_rating_stats',
+        sa.Column('movie_id', sa.Integer(), sa.ForeignKey('movies.id'), primary_key=True),
+        sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'),
+        *[sa.Column(f'rating_{bucket}', sa.Integer(), nullable=False, server_default='0') for bucket in BUCKETS],
+    )
+    # Backfill one row per movie, including movies without reviews.
+    bucket_columns = ', '.join(f'rating_{bucket}' for bucket in BUCKETS)
+    bucket_sums = ', '.join(f'SUM(CASE WHEN {_bucket_condition(bucket)} THEN 1 ELSE 0 END)' for bucket in BUCKETS)
+    op.execute(
+        f'INSERT INTO movie_rating_stats (movie_id, review_count, rating_sum, {bucket_columns}) '
+        f'SELECT m.id, COUNT(r.id), COALESCE(SUM(r.rating), 0), {bucket_sums} '
+        'FROM movies m LEFT JOIN reviews r ON r.movie_id = m.id GROUP BY m.id'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('movie_rating_stats')
@@ -0,0 +1,59 @@
+"""secondary_indexes
+
+Revision ID: e5b8a3f17c20
+Revises: d41a6f0e9c37
+Create Date: 2026-10-17 16:21:48.204931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8a3f17c20'
+down_revision: Union[str, Sequence[str], None] = 'd41a6f0e9c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns); kept in step with database_models.py.
+INDEXES = (
+    ('ix_movies_director_id', 'movies', ['director_id']),
+    ('ix_movies_release_year_id', 'movies', ['release_year', 'id']),
+    ('ix_movies_rating_id', 'movies', ['rating', 'id']),
+    ('ix_reviews_movie_id_rating', 'reviews', ['movie_id', 'rating']),
+    ('ix_reviews_rating', 'reviews', ['rating']),
+    ('ix_movie_actor_actor_id_movie_id', 'movie_actor', ['actor_id', 'movie_id']),
+    ('ix_movie_genre_genre_id_movie_id', 'movie_genre', ['genre_id', 'movie_id']),
+    ('ix_genres_type', 'genres', ['type']),
+    ('ix_actors_last_name_first_name', 'actors', ['last_name', 'first_name']),
+    ('ix_directors_last_name_first_name', 'directors', ['last_name', 'first_name']),
+)
+
+
+# Foreign-key columns that lead one of the new indexes. InnoDB indexes these
+# implicitly and silently drops that index once a new one covers the column.
+FOREIGN_KEY_COLUMNS = {
+    ('movies', 'director_id'),
+    ('reviews', 'movie_id'),
+    ('movie_actor', 'actor_id'),
+    ('movie_genre', 'genre_id'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    mysql = op.get_bind().dialect.name == 'mysql'
+    for name, table, columns in reversed(INDEXES):
+        if mysql and (table, columns[0]) in FOREIGN_KEY_COLUMNS:
+            # Restore InnoDB's own foreign-key index first; MySQL refuses to
+            # drop the only index a foreign key can use.
+            op.create_index(columns[0], table, [columns[0]])
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,37 @@
+"""movie_similarity
+
+Revision ID: f2c6d8a4b913
+Revises: e5b8a3f17c20
+Create Date: 2026-10-17 18:42:10.517364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6d8a4b913'
+down_revision: Union[str, Sequence[str], None] = 'e5b8a3f17c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by `python similarity.py` once the migration has run.
+    op.create_table(
+        'movie_similarity',
+        sa.Column('movie_id', sa.Integer(), sa.ForeignKey('movies.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('position', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('similar_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+    )
+    op.create_index('ix_movie_similarity_similar_id', 'movie_similarity', ['similar_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movie_similarity_similar_id', table_name='movie_similarity')
+    op.drop_table('movie_similarity')
@@ -0,0 +1,96 @@
+import inspect
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_async_db, get_read_db
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """Copy of ``router`` whose database endpoints run on an ``AsyncSession``.
+
+    Each sync endpoint runs unchanged inside ``AsyncSession.run_sync``, so its
+    queries (lazy loads included) go through the async driver on the event
+    loop instead of holding a threadpool slot while MySQL answers. Responses
+    are validated and serialized inside ``run_sync`` as well, while the ORM
+    objects can still lazy load. Endpoints that are already coroutines (the
+    bulk import) keep their sync session and offload it to the threadpool.
+    Reads use the primary: read replicas are only wired to the sync engine.
+    """
+    async_router = APIRouter()
+    for route in router.routes:
+        if (
+            not isinstance(route, APIRoute)
+            or _db_parameter(route.endpoint) is None
+            or inspect.iscoroutinefunction(route.endpoint)
+        ):
+            async_router.routes.append(route)
+            continue
+        async_router.add_api_route(
+            route.path,
+            _async_endpoint(route),
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            summary=route.summary,
+            description=route.description,
+            name=route.name,
+            response_class=route.response_class,
+        )
+    return async_router
+
+
+def _db_parameter(endpoint):
+    for parameter in inspect.signature(endpoint).parameters.values():
+        if isinstance(parameter.default, DependsParam) and parameter.default.dependency in (get_db, get_read_db):
+            return parameter.name
+    return None
+
+
+def _async_endpoint(route: APIRoute):
+    endpoint = route.endpoint
+    signature = inspect.signature(endpoint)
+    db_name = _db_parameter(endpoint)
+    wants_response = "response" in signature.parameters
+    adapter = TypeAdapter(route.response_model) if route.response_model else None
+    status_code = route.status_code or status.HTTP_200_OK
+    response_class = route.response_class
+    if isinstance(response_class, DefaultPlaceholder):
+        response_class = response_class.value
+
+    parameters = [
+        parameter.replace(default=Depends(get_async_db), annotation=AsyncSession) if parameter.name == db_name else parameter
+        for parameter in signature.parameters.values()
+    ]
+    if not wants_response:
+        parameters.append(inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+    def render(sync_db, kwargs):
+        result = endpoint(**kwargs, **{db_name: sync_db})
+        if isinstance(result, Response) or (result is None and status_code == status.HTTP_204_NO_CONTENT):
+            return result
+        if adapter is None:
+            return jsonable_encoder(result)
+        return adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json", by_alias=True)
+
+    async def call(**kwargs):
+        db = kwargs.pop(db_name)
+        response = kwargs["response"] if wants_response else kwargs.pop("response")
+        content = await db.run_sync(render, kwargs)
+        if isinstance(content, Response):
+            return content
+        if content is None:
+            rendered = Response(status_code=response.status_code or status_code)
+        else:
+            rendered = response_class(content, status_code=response.status_code or status_code)
+        rendered.headers.raw.extend(response.headers.raw)
+        return rendered
+
+    call.__name__ = endpoint.__name__
+    call.__doc__ = endpoint.__doc__
+    call.__signature__ = signature.replace(parameters=parameters)
+    return call
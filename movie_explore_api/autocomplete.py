@@ -0,0 +1,243 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from database_models import Movie, Actor, Director, Genre, movie_actor, movie_genre
+from live_index import LiveIndex
+from name_index import tokenize
+
+TOP_K = 10
+
+
+def normalize(value: str) -> str:
+    return " ".join(tokenize(value))
+
+
+def suffixes(label: str) -> list:
+    """Index a label under every word start: "Christopher Nolan" -> both names."""
+    words = normalize(label).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def movie_weight(rating) -> float:
+    return min(max(rating or 0, 0), 10) / 10
+
+
+def count_weight(count: int) -> float:
+    # Saturates towards 1 so a prolific actor ranks like a 10/10 movie.
+    return count / (count + 5)
+
+
+class _Node:
+    __slots__ = ("label", "children", "keys", "top")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.children = {}
+        self.keys = set()
+        self.top = []
+
+
+class PrefixIndex(LiveIndex):
+    """Radix trie whose nodes cache the top-k entries of their subtree.
+
+    A lookup walks at most ``len(prefix)`` characters and returns the cached
+    list, so its cost does not depend on how many entries share the prefix.
+    Inserts refresh the caches on the path; removals rebuild them bottom-up
+    from the children's caches (top-k of a subtree is always contained in
+    the union of its own entries and its children's top-k).
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        super().__init__()
+
+    def clear(self):
+        with self._lock:
+            self.loaded = False
+            self._root = _Node()
+            self._entries = {}
+
+    def replacement(self):
+        return PrefixIndex(self.k)
+
+    def _adopt(self, fresh):
+        self._root = fresh._root
+        self._entries = fresh._entries
+        self.loaded = fresh.loaded
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ensure_loaded(self, db: Session):
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            for key, label, weight in load_entries(db):
+                if key not in self._entries:
+                    self._put(key, label, weight)
+            self.loaded = True
+
+    def put(self, kind: str, id: int, label: str, weight: float | None = None):
+        """Add or replace an entry; ``weight=None`` keeps the current weight."""
+        with self._lock:
+            if weight is None:
+                weight = self._entries.get((kind, id), (label, 0.0))[1]
+            self._discard((kind, id))
+            self._put((kind, id), label, weight)
+            self._record("put", kind, id, label, weight)
+
+    def discard(self, kind: str, id: int):
+        with self._lock:
+            self._discard((kind, id))
+            self._record("discard", kind, id)
+
+    def reweight(self, kind: str, id: int, weight: float):
+        with self._lock:
+            entry = self._entries.get((kind, id))
+            if entry:
+                self._discard((kind, id))
+                self._put((kind, id), entry[0], weight)
+            self._record("reweight", kind, id, weight)
+
+    def complete(self, db: Session, prefix: str, limit: int = TOP_K) -> list:
+        self.ensure_loaded(db)
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            node = self._find(prefix)
+            if node is None:
+                return []
+            return [
+                {"type": key[0], "id": key[1], "label": self._entries[key][0], "score": -neg_weight}
+                for neg_weight, key in node.top[:limit]
+            ]
+
+    def _put(self, key, label, weight):
+        self._entries[key] = (label, weight)
+        for term in suffixes(label):
+            path = self._insert_path(term)
+            path[-1].keys.add(key)
+            for node in path:
+                self._offer(node, (-weight, key))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        paths = [self._walk_path(term) for term in suffixes(entry[0])]
+        for path in paths:
+            path[-1].keys.discard(key)
+        for path in paths:
+            for parent, node in reversed(list(zip([None] + path[:-1], path))):
+                self._rebuild(node)
+                if parent is not None and not node.keys and not node.children:
+                    if parent.children.get(node.label[0]) is node:
+                        del parent.children[node.label[0]]
+
+    def _offer(self, node, item):
+        if any(key == item[1] for _, key in node.top):
+            return
+        if len(node.top) < self.k or item < node.top[-1]:
+            node.top.append(item)
+            node.top.sort()
+            del node.top[self.k:]
+
+    def _rebuild(self, node):
+        candidates = {key: -self._entries[key][1] for key in node.keys}
+        for child in node.children.values():
+            for neg_weight, key in child.top:
+                candidates[key] = neg_weight
+        node.top = sorted((neg_weight, key) for key, neg_weight in candidates.items())[:self.k]
+
+    def _insert_path(self, term):
+        node, path = self._root, [self._root]
+        while term:
+            child = node.children.get(term[0])
+            if child is None:
+                child = node.children[term[0]] = _Node(term)
+                path.append(child)
+                return path
+            common = _common_prefix(child.label, term)
+            if common < len(child.label):
+                # Split the edge: node -> middle -> child.
+                middle = _Node(child.label[:common])
+                child.label = child.label[common:]
+                middle.children[child.label[0]] = child
+                middle.top = list(child.top)
+                node.children[middle.label[0]] = middle
+                child = middle
+            node = child
+            path.append(node)
+            term = term[common:]
+        return path
+
+    def _walk_path(self, term):
+        node, path = self._root, [self._root]
+        while term:
+            node = node.children[term[0]]
+            path.append(node)
+            term = term[len(node.label):]
+        return path
+
+    def _find(self, prefix):
+        node = self._root
+        while prefix:
+            child = node.children.get(prefix[0])
+            if child is None:
+                return None
+            common = _common_prefix(child.label, prefix)
+            if common == len(prefix):
+                return child
+            if common < len(child.label):
+                return None
+            node, prefix = child, prefix[common:]
+        return node
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def load_entries(db: Session):
+    for id, title, rating in db.execute(select(Movie.id, Movie.title, Movie.rating)):
+        yield ("movie", id), title, movie_weight(rating)
+    people = [
+        ("actor", Actor, select(Actor.id, func.count(movie_actor.c.movie_id)).outerjoin(movie_actor).group_by(Actor.id)),
+        ("director", Director, select(Director.id, func.count(Movie.id)).outerjoin(Movie).group_by(Director.id)),
+    ]
+    for kind, model, counts in people:
+        movie_counts = dict(db.execute(counts).all())
+        for id, first_name, last_name in db.execute(select(model.id, model.first_name, model.last_name)):
+            yield (kind, id), f"{first_name} {last_name}", count_weight(movie_counts.get(id, 0))
+    genre_counts = dict(db.execute(
+        select(Genre.id, func.count(movie_genre.c.movie_id)).outerjoin(movie_genre).group_by(Genre.id)
+    ).all())
+    for id, type in db.execute(select(Genre.id, Genre.type)):
+        yield ("genre", id), type, count_weight(genre_counts.get(id, 0))
+
+
+MOVIE_COUNT_LINKS = {
+    "actor": (movie_actor.c.actor_id, movie_actor.c.movie_id),
+    "director": (Movie.director_id, Movie.id),
+    "genre": (movie_genre.c.genre_id, movie_genre.c.movie_id),
+}
+
+
+def refresh_movie_counts(db: Session, kind: str, ids):
+    """Re-weight actors, directors or genres whose movie count changed."""
+    ids = {id for id in ids if id is not None}
+    if not ids:
+        return
+    owner, movie = MOVIE_COUNT_LINKS[kind]
+    counts = dict(db.execute(select(owner, func.count(movie)).where(owner.in_(ids)).group_by(owner)).all())
+    for id in ids:
+        catalog_prefixes.reweight(kind, id, count_weight(counts.get(id, 0)))
+
+
+catalog_prefixes = PrefixIndex()
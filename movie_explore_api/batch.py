@@ -0,0 +1,42 @@
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from loading import loader_options
+
+MAX_BATCH_SIZE = 500
+
+
+def parse_ids(value: str) -> list:
+    """Parse ``ids=3,1,2`` from a batch GET."""
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    return unique_ids(ids)
+
+
+def unique_ids(ids: list) -> list:
+    # Repeated ids are answered once, at their first position.
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch takes between 1 and {MAX_BATCH_SIZE} ids"
+        )
+    return ids
+
+
+def fetch_batch(db: Session, model, endpoint: str, ids: list) -> dict:
+    """Load ``ids`` with one query plus one eager-load pass, in input order.
+
+    Ids that do not exist are listed under ``missing`` instead of failing
+    the whole batch.
+    """
+    objects = db.query(model).options(*loader_options(endpoint, model)).filter(model.id.in_(ids)).all()
+    by_id = {obj.id: obj for obj in objects}
+    return {
+        "items": [by_id[id] for id in ids if id in by_id],
+        "missing": [id for id in ids if id not in by_id],
+    }
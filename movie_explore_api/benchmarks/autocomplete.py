@@ -0,0 +1,63 @@
+"""Measure prefix-index build time and lookup latency.
+
+Run from ``movie_explore_api/``::
+
+    python -m benchmarks.autocomplete --movies 100000 --people 300000
+
+Lookups use random 1-8 character prefixes of indexed labels, which is what a
+search box sends while the user types.
+"""
+import argparse
+import random
+import time
+
+from autocomplete import PrefixIndex
+from benchmarks.name_index import synthetic_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--people", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = synthetic_names(rng, 20_000)
+    first_names = synthetic_names(rng, 5_000)
+    labels = []
+
+    index = PrefixIndex()
+    index.loaded = True
+    start = time.perf_counter()
+    for id in range(args.movies):
+        label = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        index.put("movie", id, label, rng.random())
+        labels.append(label)
+    for id in range(args.people):
+        label = f"{rng.choice(first_names)} {rng.choice(words)}"
+        index.put("actor", id, label, rng.random())
+        labels.append(label)
+    print(f"built index for {len(index):,} entries in {time.perf_counter() - start:.1f}s")
+
+    prefixes = []
+    for _ in range(args.queries):
+        label = rng.choice(labels).lower()
+        prefixes.append(label[:rng.randint(1, min(8, len(label)))])
+    timings = []
+    start = time.perf_counter()
+    for prefix in prefixes:
+        t0 = time.perf_counter()
+        index.complete(None, prefix)
+        timings.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    print(f"{args.queries:,} lookups: {args.queries / elapsed:,.0f}/s single thread, "
+          f"p50 {timings[len(timings) // 2] * 1e6:.1f} µs, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f} µs, "
+          f"max {timings[-1] * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Generate a reproducible synthetic catalog with realistic skew.
+
+Run from ``movie_explore_api/``::
+
+    python -m benchmarks.catalog --movies 50000 --url sqlite:///catalog.db
+    python -m benchmarks.catalog --movies 1000 --ndjson > catalog.ndjson
+
+Cast sizes, actor, director and genre popularity and reviews per movie all
+follow Zipf distributions: most movies have a small cast and a handful of
+reviews, while a few actors appear in hundreds of movies and a few movies
+collect most of the reviews. The same ``--seed`` always yields the same
+catalog. Movies go through the bulk importer (bulk_import.py); reviews and
+their ``movie_rating_stats`` aggregates are written in bulk afterwards.
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.name_index import SYLLABLES, synthetic_names
+from bulk_import import MovieImporter, chunked
+from database import Base
+from database_models import Movie, MovieRatingStats, Review
+from rating_stats import rating_bucket, trend_landmark, trend_weight
+
+MAX_CAST = 40
+MAX_GENRES = 3
+# Zipf exponents: with 0.5 the busiest of 10,000 actors is in ~100x as many
+# movies as the median one; reviews are skewed harder towards hit movies.
+PEOPLE_EXPONENT = 0.5
+REVIEW_EXPONENT = 0.7
+# Reviews are dated over the year before this fixed day, so trending has
+# something to rank and the catalog stays reproducible.
+LAST_REVIEW_DAY = datetime(2026, 10, 1)
+REVIEW_DAYS = 365
+WORDS = ["".join(pair) for pair in itertools.product(SYLLABLES, repeat=2)]
+
+
+def zipf(rng, population: list, exponent: float = 1.0):
+    """Sampler drawing ``population[k]`` with probability proportional to ``1 / (k + 1) ** exponent``."""
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(len(population))))
+    return lambda k=1: rng.choices(population, cum_weights=cum_weights, k=k)
+
+
+def people(rng, count: int) -> list:
+    first_names = synthetic_names(rng, max(10, count // 20))
+    last_names = synthetic_names(rng, max(10, count // 2))
+    pick_first, pick_last = zipf(rng, first_names), zipf(rng, last_names)
+    names = set()
+    while len(names) < count:
+        names.add((pick_first()[0], pick_last()[0]))
+    # Shuffled so that popularity rank does not follow name order.
+    names = sorted(names)
+    rng.shuffle(names)
+    return [{"first_name": first, "last_name": last, "age": rng.randint(18, 90)} for first, last in names]
+
+
+def movie_records(rng, movies: int, actors: int, directors: int, genres: int):
+    """NDJSON-ready records in the bulk import format."""
+    pick_actors = zipf(rng, people(rng, actors), PEOPLE_EXPONENT)
+    pick_director = zipf(rng, people(rng, directors), PEOPLE_EXPONENT)
+    pick_genres = zipf(rng, [f"{word.capitalize()} {i}" for i, word in enumerate(rng.sample(WORDS, genres))])
+    pick_cast_size = zipf(rng, list(range(1, MAX_CAST + 1)), exponent=1.2)
+    pick_genre_count = zipf(rng, list(range(1, MAX_GENRES + 1)))
+    for i in range(movies):
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        yield {
+            "title": f"{' '.join(words).title()} {i}",
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(8, 40))).capitalize() + ".",
+            "release_year": rng.randint(1920, 2025),
+            "image_url": f"https://example.com/movies/{i}.jpg",
+            "rating": round(rng.uniform(1, 10), 1),
+            "director": pick_director()[0],
+            "actors": pick_actors(pick_cast_size()[0]),
+            "genres": pick_genres(pick_genre_count()[0]),
+        }
+
+
+def review_rows(rng, movie_ids: list, reviews: int):
+    # Popularity is shuffled so the most reviewed movies are spread over ids.
+    ranked = movie_ids[:]
+    rng.shuffle(ranked)
+    quality = {movie_id: rng.uniform(3, 9) for movie_id in movie_ids}
+    for movie_id in zipf(rng, ranked, REVIEW_EXPONENT)(reviews):
+        rating = min(max(round(rng.gauss(quality[movie_id], 1.5) * 2) / 2, 1.0), 10.0)
+        yield {
+            "movie_id": movie_id,
+            "reviewer_name": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()}",
+            "rating": rating,
+            "comment": " ".join(rng.choices(WORDS, k=rng.randint(0, 20))) or None,
+            "created_at": LAST_REVIEW_DAY - timedelta(seconds=rng.randrange(REVIEW_DAYS * 86400)),
+        }
+
+
+def seed_catalog(engine, movies: int, actors: int, directors: int, genres: int, reviews: int, seed: int = 42) -> dict:
+    """Create the schema on ``engine`` and fill it; returns the import report."""
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine, autoflush=False)() as db:
+        importer = MovieImporter(db)
+        lines = (json.dumps(record) for record in movie_records(rng, movies, actors, directors, genres))
+        for chunk in chunked(lines, 5000):
+            importer.import_lines(chunk)
+
+        stats = defaultdict(lambda: defaultdict(int))
+        landmark = trend_landmark(db)
+        movie_ids = list(db.scalars(select(Movie.id).order_by(Movie.id)))
+        for chunk in chunked(review_rows(rng, movie_ids, reviews), 10_000):
+            db.execute(insert(Review), chunk)
+            for review in chunk:
+                movie = stats[review["movie_id"]]
+                movie["review_count"] += 1
+                movie["rating_sum"] += review["rating"]
+                movie[rating_bucket(review["rating"])] += 1
+                movie["trend_score"] += trend_weight(review["rating"], review["created_at"], landmark)
+        if stats:
+            db.execute(update(MovieRatingStats), [{"movie_id": id, **values} for id, values in stats.items()])
+        db.commit()
+    return importer.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///catalog.db")
+    parser.add_argument("--ndjson", action="store_true", help="print bulk-import NDJSON instead of writing --url")
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--actors", type=int, help="default: movies / 2")
+    parser.add_argument("--directors", type=int, help="default: movies / 10")
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--reviews", type=int, help="default: movies * 10")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    actors = args.actors or max(1, args.movies // 2)
+    directors = args.directors or max(1, args.movies // 10)
+    reviews = args.reviews if args.reviews is not None else args.movies * 10
+
+    if args.ndjson:
+        for record in movie_records(random.Random(args.seed), args.movies, actors, directors, args.genres):
+            sys.stdout.write(json.dumps(record) + "\n")
+        return
+    report = seed_catalog(create_engine(args.url), args.movies, actors, directors, args.genres, reviews, args.seed)
+    report["errors"] = report["errors"][:10]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare the ORM and Core read paths of the list endpoints.
+
+Run from ``movie_explore_api/``::
+
+    python -m benchmarks.core_reads --movies 10000
+
+Builds the full, unpaginated list of movies, actors, directors and reviews of
+a synthetic catalog through each path, from the first query to the encoded
+body: ORM objects with the list route's eager-loading policy, and the plain
+rows of ``core_reads.py``. The report shows CPU time and peak memory
+allocated per 10k top-level rows, and checks both paths return the same bytes.
+"""
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import core_reads
+from benchmarks.catalog import seed_catalog
+from database_models import Actor, Director, Movie, Review
+from loading import loader_options
+from serialization import render
+
+LISTS = {
+    "movies": (Movie, "movie_list"),
+    "actors": (Actor, "actor_list"),
+    "directors": (Director, "director_list"),
+    "reviews": (Review, None),
+}
+
+
+def orm_path(db, model, endpoint) -> bytes:
+    options = loader_options(endpoint, model) if endpoint else ()
+    objects = db.query(model).options(*options).order_by(model.id).all()
+    return render(core_reads.LIST_MODELS[model], objects).body
+
+
+def core_path(db, model, endpoint) -> bytes:
+    rows = core_reads.root_query(db, model).order_by(model.id).all()
+    return render(core_reads.LIST_MODELS[model], core_reads.load_records(db, model, rows)).body
+
+
+PATHS = {
+    "ORM objects": orm_path,
+    "Core rows": core_path,
+}
+
+
+def measure(session_factory, read, model, endpoint, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        # A fresh session per run: the ORM path must not reuse an identity map.
+        with session_factory() as db:
+            gc.collect()
+            start = time.process_time()
+            body = read(db, model, endpoint)
+            timings.append(time.process_time() - start)
+    with session_factory() as db:
+        gc.collect()
+        tracemalloc.start()
+        read(db, model, endpoint)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"cpu_ms": statistics.median(timings) * 1000, "peak_mb": peak / 1e6, "body": body}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL of an empty database (default: temporary SQLite file)")
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    seed_catalog(
+        engine, args.movies, max(1, args.movies // 2), max(1, args.movies // 10), 20, args.movies * 5, seed=args.seed
+    )
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        counts = {name: db.query(model).count() for name, (model, _) in LISTS.items()}
+
+    print(f"{'list':<11}{'rows':>8}  {'path':<14}{'CPU ms/10k':>12}{'peak MB/10k':>13}")
+    for name, (model, endpoint) in LISTS.items():
+        scale = 10_000 / max(counts[name], 1)
+        results = {path: measure(session_factory, read, model, endpoint, args.repeat) for path, read in PATHS.items()}
+        bodies = {result["body"] for result in results.values()}
+        assert len(bodies) == 1, f"{name}: the read paths return different bodies"
+        for path, result in results.items():
+            print(f"{name:<11}{counts[name]:>8}  {path:<14}{result['cpu_ms'] * scale:>12.0f}{result['peak_mb'] * scale:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Compare eager-loading policies for the movie list and detail routes.
+
+Run from ``movie_explore_api/``::
+
+    python -m benchmarks.loader_strategies --movies 5 --genres 10 --actors 30 --reviews 200
+
+Every policy is run against the same synthetic SQLite catalog; the report
+shows statements issued, rows fetched from the driver and median latency.
+"""
+import argparse
+import sqlite3
+import statistics
+import time
+from fastapi import Response
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from database_models import Movie, Genre, Actor, Director, Review, movie_genre, movie_actor
+from loading import LOADER_POLICIES
+from routes import movies
+
+POLICIES = {
+    "joined (before)": {"director": "joined", "genres": "joined", "actors": "joined", "reviews": "joined"},
+    "selectin (default)": {"director": "joined", "genres": "selectin", "actors": "selectin", "reviews": "selectin"},
+    "subquery": {"director": "joined", "genres": "subquery", "actors": "subquery", "reviews": "subquery"},
+}
+
+
+class CountingCursor(sqlite3.Cursor):
+    rows = 0
+
+    def fetchone(self):
+        row = super().fetchone()
+        CountingCursor.rows += row is not None
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        CountingCursor.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        CountingCursor.rows += len(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+def build_catalog(session, n_movies, n_genres, n_actors, n_reviews):
+    session.execute(insert(Director), [{"id": 1, "first_name": "Synthetic", "last_name": "Director"}])
+    session.execute(insert(Genre), [{"id": i, "type": f"Genre {i}"} for i in range(1, n_genres + 1)])
+    session.execute(insert(Actor), [
+        {"id": i, "first_name": "Actor", "last_name": f"Number {i}"} for i in range(1, n_actors + 1)
+    ])
+    session.execute(insert(Movie), [
+        {"id": i, "title": f"Movie {i}", "description": "Synthetic", "release_year": 2000, "director_id": 1}
+        for i in range(1, n_movies + 1)
+    ])
+    for movie_id in range(1, n_movies + 1):
+        session.execute(insert(movie_genre), [
+            {"movie_id": movie_id, "genre_id": g} for g in range(1, n_genres + 1)
+        ])
+        session.execute(insert(movie_actor), [
+            {"movie_id": movie_id, "actor_id": a} for a in range(1, n_actors + 1)
+        ])
+        session.execute(insert(Review), [
+            {"movie_id": movie_id, "reviewer_name": f"Reviewer {r}", "rating": 1 + r % 10}
+            for r in range(n_reviews)
+        ])
+    session.commit()
+
+
+def measure(session_factory, engine, call, repeat):
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    timings = []
+    CountingCursor.rows = 0
+    try:
+        for _ in range(repeat):
+            session = session_factory()
+            start = time.perf_counter()
+            call(session)
+            timings.append(time.perf_counter() - start)
+            session.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return statements // repeat, CountingCursor.rows // repeat, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=5)
+    parser.add_argument("--genres", type=int, default=10)
+    parser.add_argument("--actors", type=int, default=30)
+    parser.add_argument("--reviews", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False, "factory": CountingConnection},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as session:
+        build_catalog(session, args.movies, args.genres, args.actors, args.reviews)
+
+    routes = {
+        "movie_detail": lambda db: movies.getMovieById(
+            1, Response(), fields=None, include=None, if_none_match=None, db=db
+        ),
+        "movie_list": lambda db: movies.getAllMovies(
+            genre=None, actor=None, director=None, release_year=None, title=None, sort="id",
+            limit=args.movies, after=None, fields=None, include=None, if_none_match=None, db=db
+        ),
+    }
+    print(f"{'endpoint':<14}{'policy':<20}{'statements':>11}{'rows':>12}{'median ms':>12}")
+    for endpoint, call in routes.items():
+        for name, policy in POLICIES.items():
+            saved = LOADER_POLICIES[endpoint]
+            LOADER_POLICIES[endpoint] = policy
+            try:
+                statements, rows, latency = measure(session_factory, engine, call, args.repeat)
+            finally:
+                LOADER_POLICIES[endpoint] = saved
+            print(f"{endpoint:<14}{name:<20}{statements:>11}{rows:>12}{latency:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Measure trigram name-index build time and query latency.
+
+Run from ``movie_explore_api/``::
+
+    python -m benchmarks.name_index --people 1000000
+
+Names are drawn from a synthetic vocabulary with Zipf-skewed frequencies, so
+common surnames are shared by many people like in a real catalog.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from database_models import Actor
+from name_index import TrigramIndex
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["son", "ler", "man", "ton", "sky", "ez"]
+
+
+def synthetic_names(rng, count):
+    names = set()
+    while len(names) < count:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize())
+    return sorted(names)
+
+
+def misspell(rng, name):
+    i = rng.randrange(1, len(name))
+    return name[:i] + rng.choice("aeiou") + name[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=1_000_000)
+    parser.add_argument("--first-names", type=int, default=5_000)
+    parser.add_argument("--last-names", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    first_names = synthetic_names(rng, args.first_names)
+    last_names = synthetic_names(rng, args.last_names)
+    first_weights = [1 / (rank + 1) for rank in range(len(first_names))]
+    last_weights = [1 / (rank + 1) for rank in range(len(last_names))]
+
+    index = TrigramIndex(Actor)
+    index.loaded = True
+    start = time.perf_counter()
+    firsts = rng.choices(first_names, first_weights, k=args.people)
+    lasts = rng.choices(last_names, last_weights, k=args.people)
+    for id in range(1, args.people + 1):
+        index.add(id, firsts[id - 1], lasts[id - 1])
+    print(f"built index for {len(index):,} people in {time.perf_counter() - start:.1f}s")
+
+    workloads = {
+        "exact last name": lambda: rng.choice(last_names),
+        "misspelled last name": lambda: misspell(rng, rng.choice(last_names)),
+        "prefix": lambda: rng.choice(last_names)[:4],
+        "first + last": lambda: f"{rng.choice(first_names)} {rng.choice(last_names)}",
+    }
+    print(f"{'query':<22}{'p50 ms':>10}{'p99 ms':>10}{'avg hits':>10}")
+    for name, make_query in workloads.items():
+        timings, hits = [], 0
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            hits += len(index.search(None, query, limit=20))
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p50 = statistics.median(timings) * 1000
+        p99 = timings[int(len(timings) * 0.99)] * 1000
+        print(f"{name:<22}{p50:>10.3f}{p99:>10.3f}{hits / args.queries:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
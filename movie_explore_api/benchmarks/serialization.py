@@ -0,0 +1,102 @@
+"""Compare response serialization paths on large lists.
+
+Run from ``movie_explore_api/``::
+
+    python -m benchmarks.serialization --movies 10000
+
+Loads every movie (and actor) of a synthetic catalog with the list route's
+eager-loading policy, then serializes the list three ways: the stdlib path
+older FastAPI versions take, FastAPI's current pydantic ``dump_json`` path,
+and ``serialization.render``. The report shows CPU time, the peak memory
+allocated while serializing and the number of full garbage collections.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.catalog import seed_catalog
+from database_models import Actor, Movie
+from loading import loader_options
+from models import ActorDetailResponse, MovieDetailResponse
+from serialization import render, response_adapter
+
+
+def stdlib_json(model, objects) -> bytes:
+    adapter = response_adapter(model, many=True)
+    return json.dumps(adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")).encode()
+
+
+def pydantic_json(model, objects) -> bytes:
+    adapter = response_adapter(model, many=True)
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def fast_json(model, objects) -> bytes:
+    return render(model, objects).body
+
+
+PATHS = {
+    "validate + json.dumps (older FastAPI)": stdlib_json,
+    "validate + dump_json (FastAPI default)": pydantic_json,
+    "render (encoder + orjson)": fast_json,
+}
+
+
+def measure(serialize, model, objects, repeat: int) -> dict:
+    serialize(model, objects)
+    timings = []
+    full_collections = gc.get_stats()[2]["collections"]
+    for _ in range(repeat):
+        start = time.process_time()
+        body = serialize(model, objects)
+        timings.append(time.process_time() - start)
+    full_collections = gc.get_stats()[2]["collections"] - full_collections
+    tracemalloc.start()
+    serialize(model, objects)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "cpu_ms": statistics.median(timings) * 1000,
+        "peak_mb": peak / 1e6,
+        "full_gcs": full_collections / repeat,
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL of an empty database (default: temporary SQLite file)")
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    seed_catalog(
+        engine, args.movies, max(1, args.movies // 2), max(1, args.movies // 10), 20, args.movies * 5, seed=args.seed
+    )
+    with sessionmaker(bind=engine)() as db:
+        lists = {
+            "movies": (MovieDetailResponse, db.query(Movie).options(*loader_options("movie_list", Movie)).all()),
+            "actors": (ActorDetailResponse, db.query(Actor).options(*loader_options("actor_list", Actor)).all()),
+        }
+        print(f"{'list':<8}{'path':<42}{'CPU ms':>10}{'peak MB':>10}{'full GCs':>10}{'MB out':>9}")
+        for name, (model, objects) in lists.items():
+            expected = pydantic_json(model, objects)
+            for path, serialize in PATHS.items():
+                if serialize is not stdlib_json:
+                    assert serialize(model, objects) == expected, f"{path} output differs from pydantic"
+                result = measure(serialize, model, objects, args.repeat)
+                print(f"{name:<8}{path:<42}{result['cpu_ms']:>10.0f}{result['peak_mb']:>10.1f}"
+                      f"{result['full_gcs']:>10.1f}{result['bytes'] / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
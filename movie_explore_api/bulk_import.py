@@ -0,0 +1,236 @@
+"""Bulk import of movies from NDJSON, one movie per line::
+
+    {"title": "Inception", "description": "...", "release_year": 2010, "rating": 8.8,
+     "director": {"first_name": "Christopher", "last_name": "Nolan"},
+     "actors": [{"first_name": "Leonardo", "last_name": "DiCaprio"}], "genres": ["Sci-Fi"]}
+
+Directors and actors are matched by first and last name, genres by name;
+unknown ones are created. Run from ``movie_explore_api/``::
+
+    python bulk_import.py catalog.ndjson
+    python bulk_import.py - --chunk-size 5000 < catalog.ndjson
+"""
+import argparse
+import json
+import sys
+import time
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from database_models import Actor, Director, Genre, Movie, MovieRatingStats, movie_actor, movie_genre
+from models import MovieImport
+import similarity
+import text_search
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10_000
+# The report lists at most this many row errors; ``failed`` counts them all.
+MAX_REPORTED_ERRORS = 1000
+
+
+class MovieImporter:
+    """Validates and writes NDJSON lines one chunk (and one transaction) at a time.
+
+    Each chunk costs a handful of set-based statements: one lookup per kind
+    of natural key, one ``executemany`` INSERT per table, and a commit.
+    Resolved director, actor and genre ids are cached across chunks.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.line = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self.directors = {}
+        self.actors = {}
+        self.genres = {}
+
+    def import_lines(self, lines):
+        records = []
+        for raw in lines:
+            self.line += 1
+            if not raw.strip():
+                continue
+            try:
+                records.append((self.line, MovieImport.model_validate_json(raw)))
+            except ValidationError as error:
+                self._fail(self.line, _describe(error))
+        records = self._drop_duplicate_titles(records)
+        if not records:
+            return
+        try:
+            self._write(records)
+            self.db.commit()
+        except SQLAlchemyError as error:
+            self.db.rollback()
+            # Ids cached during the failed chunk may have been rolled back.
+            self._reset_caches()
+            for line, _ in records:
+                self._fail(line, f"Chunk rolled back: {getattr(error, 'orig', None) or error}")
+            return
+        self.imported += len(records)
+
+    def report(self) -> dict:
+        seconds = time.perf_counter() - self.started
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(self.imported / seconds, 1) if seconds else 0.0,
+            "errors": self.errors,
+        }
+
+    def _fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def _drop_duplicate_titles(self, records: list) -> list:
+        titles = [record.title for _, record in records]
+        taken = set(self.db.scalars(select(Movie.title).where(Movie.title.in_(titles))))
+        kept = []
+        for line, record in records:
+            if record.title in taken:
+                self._fail(line, f"Movie with title '{record.title}' already exists")
+                continue
+            taken.add(record.title)
+            kept.append((line, record))
+        return kept
+
+    def _write(self, records: list):
+        directors = self._resolve_people(Director, self.directors, [record.director for _, record in records])
+        actors = self._resolve_people(Actor, self.actors, [actor for _, record in records for actor in record.actors])
+        genres = self._resolve_genres({genre for _, record in records for genre in record.genres})
+
+        movies = [
+            {
+                "title": record.title,
+                "description": record.description,
+                "release_year": record.release_year,
+                "image_url": record.image_url,
+                "rating": record.rating,
+                "director_id": directors[_person_key(record.director)],
+            }
+            for _, record in records
+        ]
+        self.db.execute(insert(Movie), movies)
+        movie_ids = dict(self.db.execute(
+            select(Movie.title, Movie.id).where(Movie.title.in_([movie["title"] for movie in movies]))
+        ).all())
+        for movie in movies:
+            movie["id"] = movie_ids[movie["title"]]
+
+        self.db.execute(insert(MovieRatingStats), [{"movie_id": movie["id"]} for movie in movies])
+        actor_links = {
+            (movie_ids[record.title], actors[_person_key(actor)]) for _, record in records for actor in record.actors
+        }
+        genre_links = {(movie_ids[record.title], genres[genre]) for _, record in records for genre in record.genres}
+        if actor_links:
+            self.db.execute(insert(movie_actor), [{"movie_id": m, "actor_id": a} for m, a in actor_links])
+        if genre_links:
+            self.db.execute(insert(movie_genre), [{"movie_id": m, "genre_id": g} for m, g in genre_links])
+        text_search.index_new_movies(self.db, [
+            {"id": movie["id"], "title": movie["title"], "description": movie["description"]} for movie in movies
+        ])
+        similarity.refresh_movies(self.db, [movie["id"] for movie in movies])
+
+    def _resolve_people(self, model, cache: dict, people: list) -> dict:
+        wanted = {_person_key(person): person for person in people}
+        unknown = [key for key in wanted if key not in cache]
+        if unknown:
+            self._load_people(model, cache, unknown)
+            new = [key for key in unknown if key not in cache]
+            if new:
+                self.db.execute(insert(model), [wanted[key].model_dump() for key in new])
+                self._load_people(model, cache, new)
+        return cache
+
+    def _load_people(self, model, cache: dict, keys: list):
+        keys = set(keys)
+        rows = self.db.execute(
+            select(model.id, model.first_name, model.last_name)
+            .where(model.last_name.in_({last_name for _, last_name in keys}))
+            .order_by(model.id)
+        )
+        for id, first_name, last_name in rows:
+            if (first_name, last_name) in keys:
+                # Of several people with the same name, the oldest row wins.
+                cache.setdefault((first_name, last_name), id)
+
+    def _resolve_genres(self, names: set) -> dict:
+        unknown = [name for name in names if name not in self.genres]
+        if unknown:
+            self._load_genres(unknown)
+            new = [name for name in unknown if name not in self.genres]
+            if new:
+                self.db.execute(insert(Genre), [{"type": name} for name in new])
+                self._load_genres(new)
+        return self.genres
+
+    def _load_genres(self, names: list):
+        for id, name in self.db.execute(select(Genre.id, Genre.type).where(Genre.type.in_(names)).order_by(Genre.id)):
+            self.genres.setdefault(name, id)
+
+
+def _person_key(person) -> tuple:
+    return person.first_name, person.last_name
+
+
+def _describe(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+def chunked(lines, chunk_size: int):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def ndjson_chunks(stream, chunk_size: int):
+    """Group a streamed request body into chunks of lines without buffering it whole."""
+    chunk, pending = [], b""
+    async for data in stream:
+        *lines, pending = (pending + data).split(b"\n")
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if pending:
+        chunk.append(pending)
+    if chunk:
+        yield chunk
+
+
+def main():
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk import movies from an NDJSON file.")
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    with source, SessionLocal() as db:
+        importer = MovieImporter(db)
+        for chunk in chunked(source, args.chunk_size):
+            importer.import_lines(chunk)
+            print(f"{importer.imported} imported, {importer.failed} failed", file=sys.stderr)
+    print(json.dumps(importer.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
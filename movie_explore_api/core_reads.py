@@ -0,0 +1,192 @@
+import os
+from functools import lru_cache
+from operator import itemgetter
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.orm import RelationshipDirection, Session
+from database_models import Movie, Actor, Director, Review, MovieRatingStats
+from models import (
+    MovieResponse, MovieDetailResponse, ActorResponse, ActorDetailResponse, DirectorResponse, DirectorDetailResponse,
+    GenreResponse, ReviewResponse, RatingStatsResponse,
+)
+
+# Opt-in: list routes read plain rows instead of ORM objects when set to "core".
+CORE_LIST_READS = os.getenv("LIST_READ_MODE", "orm").lower() == "core"
+
+LIST_MODELS = {
+    Movie: MovieDetailResponse,
+    Actor: ActorDetailResponse,
+    Director: DirectorDetailResponse,
+    Review: ReviewResponse,
+}
+
+# Relationships each list response embeds, with the model of the embedded rows.
+EMBEDS = {
+    Movie: {
+        "director": DirectorResponse,
+        "genres": GenreResponse,
+        "actors": ActorResponse,
+        "reviews": ReviewResponse,
+        "rating_stats": RatingStatsResponse,
+    },
+    Actor: {"movies": MovieResponse},
+    Director: {"movies": MovieResponse},
+    Review: {},
+}
+
+# Parent ids per IN list; keeps each statement under SQLite's variable limit.
+IN_CHUNK_SIZE = 500
+
+# Per dialect: the aggregate collecting JSON objects into an array, and the object constructor.
+JSON_AGGREGATES = {
+    "sqlite": (func.json_group_array, func.json_object),
+    "mysql": (func.json_arrayagg, func.json_object),
+}
+# Column types the database writes to JSON exactly as pydantic would (floats are
+# coerced by the encoder); anything else, such as datetimes, is read as rows.
+JSON_EXACT_TYPES = (int, str)
+
+
+def _copy(row) -> dict:
+    data = row._asdict()
+    data.pop("parent_id", None)
+    return data
+
+
+def _rating_stats(row) -> dict:
+    # The properties the ORM object would serialize, applied to the row.
+    return {
+        "review_count": row.review_count,
+        "average_rating": MovieRatingStats.average_rating.fget(row),
+        "histogram": MovieRatingStats.histogram.fget(row),
+    }
+
+
+# Embedded values computed from the whole row instead of copied from it.
+SHAPES = {
+    MovieRatingStats: _rating_stats,
+}
+
+
+@lru_cache(maxsize=None)
+def columns(model, response_model=None) -> tuple:
+    """Table columns behind ``response_model``'s fields, plus ``version`` for ETags."""
+    table = model.__table__
+    if model in SHAPES:
+        return tuple(table.c)
+    names = [name for name in (response_model or LIST_MODELS[model]).model_fields if name in table.c]
+    if "version" in table.c:
+        names.append("version")
+    return tuple(table.c[name] for name in names)
+
+
+def root_query(db: Session, model):
+    """The list's top-level rows as plain tuples; filter and page it like the ORM query."""
+    return db.query(*columns(model))
+
+
+def load_records(db: Session, model, rows: list) -> list:
+    """Turn top-level rows into dicts and attach what the list response embeds.
+
+    Each relationship costs one statement per ``IN_CHUNK_SIZE`` parents,
+    like ``selectinload``, but no ORM object or identity map entry is made.
+    """
+    records = [row._asdict() for row in rows]
+    for name, response_model in EMBEDS[model].items():
+        _attach(db, getattr(model, name).property, name, response_model, records)
+    return records
+
+
+def _attach(db: Session, relationship, name: str, response_model, records: list):
+    target = relationship.mapper.class_
+    target_columns = columns(target, response_model)
+
+    if relationship.direction is RelationshipDirection.MANYTOONE:
+        (local, remote), = relationship.local_remote_pairs
+        shape = SHAPES.get(target, _copy)
+        keys = list({record[local.key] for record in records if record[local.key] is not None})
+        related = {}
+        for chunk in _chunks(keys):
+            for row in db.execute(select(*target_columns).where(remote.in_(chunk))):
+                related[getattr(row, remote.key)] = shape(row)
+        for record in records:
+            record[name] = related.get(record[local.key])
+        return
+
+    (parent, parent_key), = relationship.synchronize_pairs
+    ids = [record[parent.key] for record in records]
+    aggregate = JSON_AGGREGATES.get(db.get_bind().dialect.name)
+    if aggregate is not None and relationship.uselist and _json_exact(target, target_columns):
+        related = _aggregated(db, relationship, parent_key, target_columns, aggregate, ids)
+    else:
+        related = _collected(db, relationship, parent_key, target_columns, ids)
+    for record in records:
+        items = related.get(record[parent.key], [])
+        record[name] = items if relationship.uselist else (items[0] if items else None)
+
+
+def _json_exact(target, target_columns) -> bool:
+    return target not in SHAPES and all(column.type.python_type in JSON_EXACT_TYPES for column in target_columns)
+
+
+def _source(relationship):
+    target_table = relationship.mapper.local_table
+    if relationship.secondary is None:
+        return target_table
+    (target_key, link_key), = relationship.secondary_synchronize_pairs
+    return relationship.secondary.join(target_table, target_key == link_key)
+
+
+def _collected(db: Session, relationship, parent_key, target_columns, ids: list) -> dict:
+    """Embedded rows per parent id, one row per (parent, target) pair."""
+    shape = SHAPES.get(relationship.mapper.class_, _copy)
+    statement = (
+        select(parent_key.label("parent_id"), *target_columns)
+        .select_from(_source(relationship))
+        .order_by(parent_key, *(relationship.order_by or ()))
+    )
+    # Many-to-many targets repeat across parents; build each once and share
+    # it, as the identity map would.
+    shared = {} if relationship.secondary is not None else None
+    related = {}
+    for chunk in _chunks(ids):
+        for row in db.execute(statement.where(parent_key.in_(chunk))):
+            if shared is None:
+                item = shape(row)
+            else:
+                item = shared.get(row.id)
+                if item is None:
+                    item = shared[row.id] = shape(row)
+            related.setdefault(row.parent_id, []).append(item)
+    return related
+
+
+def _aggregated(db: Session, relationship, parent_key, target_columns, aggregate, ids: list) -> dict:
+    """Embedded rows per parent id, as one JSON array per parent built by the database."""
+    array, build_object = aggregate
+    items = array(build_object(*[part for column in target_columns for part in (column.key, column)]))
+    statement = (
+        select(parent_key.label("parent_id"), items.label("items"))
+        .select_from(_source(relationship))
+        .group_by(parent_key)
+    )
+    # Not every dialect can order inside an aggregate, so arrays are sorted here.
+    order_keys = [column.key for column in relationship.order_by or ()]
+    order = itemgetter(*order_keys) if order_keys else None
+    shared = {} if relationship.secondary is not None else None
+    related = {}
+    for chunk in _chunks(ids):
+        for row in db.execute(statement.where(parent_key.in_(chunk))):
+            # Both dialects return the array as JSON text.
+            value = orjson.loads(row.items)
+            if shared is not None:
+                value = [shared.setdefault(item["id"], item) for item in value]
+            if order is not None:
+                value.sort(key=order)
+            related[row.parent_id] = value
+    return related
+
+
+def _chunks(ids: list):
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        yield ids[start:start + IN_CHUNK_SIZE]
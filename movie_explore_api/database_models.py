@@ -1,5 +1,5 @@
 from database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, Text, Float, DateTime
+from sqlalchemy import Column, Computed, Integer, String, ForeignKey, Table, Text, Float, Double, DateTime, DDL, Index, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,14 +7,17 @@ movie_actor =  Table(
     "movie_actor",
     Base.metadata,
     Column("movie_id", Integer, ForeignKey("movies.id"), primary_key=True),
-    Column("actor_id", Integer, ForeignKey("actors.id"), primary_key=True)
+    Column("actor_id", Integer, ForeignKey("actors.id"), primary_key=True),
+    # The primary key serves movie -> actors; this serves actor -> movies.
+    Index("ix_movie_actor_actor_id_movie_id", "actor_id", "movie_id")
 )
 
 movie_genre = Table(
     "movie_genre",
     Base.metadata,
     Column("movie_id", Integer, ForeignKey("movies.id"), primary_key=True),
-    Column("genre_id", Integer, ForeignKey("genres.id"), primary_key=True)
+    Column("genre_id", Integer, ForeignKey("genres.id"), primary_key=True),
+    Index("ix_movie_genre_genre_id_movie_id", "genre_id", "movie_id")
 )
 
 class Movie(Base):
@@ -24,19 +27,52 @@ class Movie(Base):
     description= Column(String(500))
     release_year= Column(Integer)
     image_url= Column(String(500))
-    director_id= Column(Integer, ForeignKey("directors.id"))
+    director_id= Column(Integer, ForeignKey("directors.id"), index=True)
     rating= Column(Integer)
     director = relationship("Director", back_populates="movies")
-    genres = relationship("Genre", secondary=movie_genre, back_populates="movies")  
-    actors = relationship("Actor", secondary=movie_actor, back_populates="movies")
-    reviews = relationship("Review", back_populates="movie")  
+    # Collections are ordered by id so that every read path (ORM or
+    # core_reads.py) serializes them in the same order.
+    genres = relationship("Genre", secondary=movie_genre, back_populates="movies", order_by="Genre.id")
+    actors = relationship("Actor", secondary=movie_actor, back_populates="movies", order_by="Actor.id")
+    reviews = relationship("Review", back_populates="movie", order_by="Review.id")
+    rating_stats = relationship("MovieRatingStats", uselist=False, cascade="all, delete-orphan")
+    # Bumped by the ORM on every UPDATE (and checked, so a concurrent write
+    # raises StaleDataError); etags.py derives ETags from it.
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    # Keyset pagination (pagination.py) orders by (sort column, id).
+    __table_args__ = (
+        Index("ix_movies_release_year_id", "release_year", "id"),
+        Index("ix_movies_rating_id", "rating", "id"),
+    )
+
+
+# Full-text index over title and description: InnoDB FULLTEXT on MySQL, an
+# FTS5 table keyed by movie id on SQLite (kept in sync by text_search.py).
+event.listen(
+    Movie.__table__,
+    "after_create",
+    DDL("CREATE FULLTEXT INDEX ft_movies_title_description ON movies (title, description)").execute_if(dialect="mysql")
+)
+event.listen(
+    Movie.__table__,
+    "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(title, description)").execute_if(dialect="sqlite")
+)
+event.listen(
+    Movie.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS movies_fts").execute_if(dialect="sqlite")
+)
 
 
 class Genre(Base):
     __tablename__ = "genres"
     id= Column(Integer, primary_key=True, index=True)
-    type= Column(String(30))
-    movies= relationship('Movie', secondary=movie_genre, back_populates="genres")
+    type= Column(String(30), index=True)
+    movies= relationship('Movie', secondary=movie_genre, back_populates="genres", order_by="Movie.id")
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Actor(Base):
@@ -46,7 +82,11 @@ class Actor(Base):
     last_name= Column(String(50))
     age= Column(Integer)
     image_url = Column(String(500))
-    movies = relationship('Movie', secondary=movie_actor, back_populates="actors")
+    movies = relationship('Movie', secondary=movie_actor, back_populates="actors", order_by="Movie.id")
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    # Natural key used by bulk_import.py.
+    __table_args__ = (Index("ix_actors_last_name_first_name", "last_name", "first_name"),)
 
 
 class Director(Base):
@@ -56,7 +96,10 @@ class Director(Base):
     last_name= Column(String(50))
     age= Column(Integer)
     image_url = Column(String(500))
-    movies= relationship("Movie", back_populates="director")
+    movies= relationship("Movie", back_populates="director", order_by="Movie.id")
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    __table_args__ = (Index("ix_directors_last_name_first_name", "last_name", "first_name"),)
 
 
 class Review(Base):
@@ -67,4 +110,95 @@ class Review(Base):
     rating = Column(Float, nullable=False)
     comment = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    movie = relationship("Movie", back_populates="reviews")
\ No newline at end of file
+    movie = relationship("Movie", back_populates="reviews")
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    # (movie_id, rating) serves a movie's reviews and ?movie_id=&min_rating=.
+    __table_args__ = (
+        Index("ix_reviews_movie_id_rating", "movie_id", "rating"),
+        Index("ix_reviews_rating", "rating"),
+    )
+
+
+# Prior of the Bayesian average ranking /movies/top: every movie starts as if
+# it had TOP_PRIOR_REVIEWS reviews rated TOP_PRIOR_RATING, so a movie with one
+# 10 does not outrank one with hundreds of 9s. Part of the top_score DDL.
+TOP_PRIOR_REVIEWS = 10
+TOP_PRIOR_RATING = 6.0
+
+
+class MovieRatingStats(Base):
+    """Review aggregates per movie, kept in step with reviews by rating_stats.py.
+
+    ``rating_<n>`` counts the reviews rated at least n and below n + 1
+    (``rating_10`` holds the 10s). ``top_score`` and ``trend_score`` rank
+    the leaderboards in leaderboards.py.
+    """
+    __tablename__ = "movie_rating_stats"
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0, server_default="0")
+    rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_6 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_7 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_8 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_9 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_10 = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bayesian average rating, computed by the database from the two sums.
+    top_score = Column(Float, Computed(
+        f"(rating_sum + {TOP_PRIOR_REVIEWS * TOP_PRIOR_RATING}) / (review_count + {TOP_PRIOR_REVIEWS})"
+    ))
+    # Time-decayed review weight, scaled to the TrendLandmark (see
+    # rating_stats.trend_weight). A double: the scale grows between landmarks.
+    trend_score = Column(Double, nullable=False, default=0, server_default="0")
+    # Leaderboards walk these backwards and stop after the page.
+    __table_args__ = (
+        Index("ix_movie_rating_stats_top_score_movie_id", "top_score", "movie_id"),
+        Index("ix_movie_rating_stats_trend_score_movie_id", "trend_score", "movie_id"),
+    )
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.review_count, 2) if self.review_count else None
+
+    @property
+    def histogram(self) -> dict:
+        return {bucket: getattr(self, f"rating_{bucket}") for bucket in range(1, 11)}
+
+
+# The first landmark trend scores are scaled to; leaderboards.py moves it forward.
+TREND_FIRST_LANDMARK = datetime(2026, 1, 1)
+
+
+class TrendLandmark(Base):
+    """The single row holding the instant every ``trend_score`` is scaled to."""
+    __tablename__ = "trend_landmark"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    epoch = Column(DateTime, nullable=False)
+
+
+event.listen(
+    TrendLandmark.__table__,
+    "after_create",
+    DDL(f"INSERT INTO trend_landmark (id, epoch) VALUES (1, '{TREND_FIRST_LANDMARK:%Y-%m-%d %H:%M:%S}')")
+)
+
+
+class MovieSimilarity(Base):
+    """The top-k most similar movies of each movie, kept by similarity.py.
+
+    ``similar_id`` has no foreign key: when a movie is deleted,
+    similarity.refresh_movies rewrites the lists naming it in the same
+    transaction.
+    """
+    __tablename__ = "movie_similarity"
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True, autoincrement=False)
+    similar_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    # Finds the lists a changed movie appears in.
+    __table_args__ = (Index("ix_movie_similarity_similar_id", "similar_id"),)
@@ -0,0 +1,119 @@
+import hashlib
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from database_models import Movie, Actor, Director
+
+# Relationships serialized into the detail and list responses of each model.
+# A response's ETag covers the version of every row it embeds, so renaming a
+# director changes the ETag of each movie that shows that director.
+EMBEDDED = {
+    Movie: ("director", "genres", "actors", "reviews"),
+    Actor: ("movies",),
+    Director: ("movies",),
+}
+
+# Embedded values without versions of their own, mapped to the relationship
+# they are computed from.
+DERIVED = {
+    Movie: {"rating_stats": "reviews"},
+}
+
+
+def etag_relations(model, relations) -> tuple:
+    """The versioned relationships an ETag must cover for a response embedding ``relations``."""
+    covered = {DERIVED.get(model, {}).get(name, name) for name in relations}
+    return tuple(name for name in EMBEDDED[model] if name in covered)
+
+
+def _format(roots: list, embedded: list, weak: bool) -> str:
+    digest = hashlib.blake2b(repr((roots, sorted(embedded))).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def graph_etag(model, objects: list, weak: bool = False, relations=None) -> str:
+    """ETag of already loaded objects, read from their version attributes.
+
+    ``relations`` limits the embedded relationships to those in the response
+    (see fieldsets.py); by default all of ``EMBEDDED[model]`` are covered.
+    """
+    relations = EMBEDDED[model] if relations is None else relations
+    roots, embedded = [], []
+    for obj in objects:
+        roots.append((obj.id, obj.version))
+        for name in relations:
+            value = getattr(obj, name)
+            related = value if isinstance(value, list) else [value] if value is not None else []
+            embedded.extend((name, obj.id, item.id, item.version) for item in related)
+    return _format(roots, embedded, weak)
+
+
+def record_etag(model, records: list, weak: bool = False) -> str:
+    """``graph_etag`` for the plain dicts built by core_reads.py."""
+    roots, embedded = [], []
+    for record in records:
+        roots.append((record["id"], record["version"]))
+        for name in EMBEDDED[model]:
+            value = record[name]
+            related = value if isinstance(value, list) else [value] if value is not None else []
+            embedded.extend((name, record["id"], item["id"], item["version"]) for item in related)
+    return _format(roots, embedded, weak)
+
+
+def extend_etag(etag: str, data) -> str:
+    """``etag`` changed to also cover ``data``, such as facet counts computed outside the page."""
+    digest = hashlib.blake2b(repr((etag, data)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"' if etag.startswith("W/") else f'"{digest}"'
+
+
+def stored_etag(db: Session, model, ids: list, weak: bool = False, relations=None) -> str | None:
+    """The ETag ``graph_etag`` would return for ``ids``, from one version-only query.
+
+    Returns None if any of the ids no longer exists.
+    """
+    relations = EMBEDDED[model] if relations is None else relations
+    if not ids:
+        return _format([], [], weak)
+    statements = [
+        select(literal("").label("relation"), model.id.label("parent_id"), model.id.label("id"), model.version)
+        .where(model.id.in_(ids))
+    ]
+    for name in relations:
+        relationship = getattr(model, name)
+        target = relationship.property.mapper.class_
+        statements.append(
+            select(literal(name).label("relation"), model.id.label("parent_id"), target.id.label("id"), target.version)
+            .select_from(model)
+            .join(relationship)
+            .where(model.id.in_(ids))
+        )
+    rows = [tuple(row) for row in db.execute(union_all(*statements))]
+    versions = {id: version for relation, _, id, version in rows if relation == ""}
+    if any(id not in versions for id in ids):
+        return None
+    return _format([(id, versions[id]) for id in ids], [row for row in rows if row[0] != ""], weak)
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    if not if_none_match or etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str, headers: dict | None = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})})
+
+
+def stale_version_response(request: Request, exc: StaleDataError) -> Response:
+    # The version column makes every UPDATE and DELETE check the version it
+    # read; a concurrent write to the same row makes that check fail.
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "The resource was modified by another request; retry"},
+    )
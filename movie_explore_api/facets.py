@@ -0,0 +1,112 @@
+from functools import lru_cache
+from typing import List
+from fastapi import HTTPException, status
+from pydantic import create_model
+from sqlalchemy import Integer, String, case, cast, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from database_models import Movie, Genre, Director
+from filters import MOVIE_FILTERS, compile_filters
+from models import MovieFacets
+
+# Values returned per facet, most frequent first.
+FACET_LIMIT = 20
+# Ratings are counted in bands [low, low + width).
+RATING_BAND_WIDTH = 2
+
+_count = func.count().label("count")
+_no_label = cast(null(), String).label("label")
+
+
+def _genre_counts(filters: list):
+    return (
+        select(Genre.id.label("value"), Genre.type.label("label"), _count)
+        .select_from(Movie).join(Movie.genres)
+        .where(*filters).group_by(Genre.id, Genre.type)
+    )
+
+
+def _decade_counts(filters: list):
+    decade = Movie.release_year - Movie.release_year % 10
+    return select(decade.label("value"), _no_label, _count).where(*filters).group_by(decade)
+
+
+def _director_counts(filters: list):
+    return (
+        select(Director.id.label("value"), (Director.first_name + " " + Director.last_name).label("label"), _count)
+        .select_from(Movie).join(Movie.director)
+        .where(*filters).group_by(Director.id, Director.first_name, Director.last_name)
+    )
+
+
+def _rating_counts(filters: list):
+    # Ratings are fractional, and SQLite's % truncates its operands to integers.
+    # The CASE keeps NULL from the floor() SQLAlchemy registers on SQLite.
+    band = case(
+        (Movie.rating.is_not(None), cast(func.floor(Movie.rating / RATING_BAND_WIDTH), Integer) * RATING_BAND_WIDTH)
+    )
+    return select(band.label("value"), _no_label, _count).where(*filters).group_by(band)
+
+
+# Facet name -> (the movie filter it leaves out, grouped count statement, label
+# of a value when the statement has none). Leaving out its own filter makes each
+# count the number of movies choosing that value would return with the other
+# filters kept.
+FACETS = {
+    "genre": ("genre", _genre_counts, None),
+    "decade": ("release_year", _decade_counts, lambda value: f"{value}s"),
+    "director": ("director", _director_counts, None),
+    "rating": (None, _rating_counts, lambda value: f"{value}-{value + RATING_BAND_WIDTH}"),
+}
+# Facets over small ordered domains are listed in value order instead of by count.
+ORDERED_FACETS = ("decade", "rating")
+
+
+def parse_facets(value: str | None) -> tuple:
+    if value is None:
+        return ()
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown facet '{unknown[0]}'. Allowed: {', '.join(FACETS)}"
+        )
+    return tuple(name for name in FACETS if name in names)
+
+
+def facet_counts(db: Session, names: tuple, **params) -> dict:
+    """Counts per value of each facet in ``names`` for the movies matching ``params``.
+
+    All facets come from one UNION ALL statement, so asking for four facets
+    costs one round trip.
+    """
+    if not names:
+        return {}
+    statements = []
+    for name in names:
+        excluded, counts, _ = FACETS[name]
+        filters = compile_filters(MOVIE_FILTERS, **{key: value for key, value in params.items() if key != excluded})
+        statement = counts(filters)
+        top = statement.order_by(_count.desc(), statement.selected_columns.value).limit(FACET_LIMIT).subquery()
+        statements.append(select(literal(name).label("facet"), top.c.value, top.c.label, top.c.count))
+
+    result = {name: [] for name in names}
+    for facet, value, label, count in db.execute(union_all(*statements)):
+        make_label = FACETS[facet][2]
+        if value is None:
+            label = "Unknown"
+        elif make_label is not None:
+            label = make_label(value)
+        result[facet].append({"value": value, "label": label, "count": count})
+    for name, values in result.items():
+        if name in ORDERED_FACETS:
+            values.sort(key=lambda item: (item["value"] is None, item["value"] or 0))
+        else:
+            values.sort(key=lambda item: (-item["count"], item["label"]))
+    return result
+
+
+@lru_cache(maxsize=None)
+def faceted_model(item_model):
+    """Response model of a movie list returned together with its facets."""
+    return create_model(f"Faceted{item_model.__name__}", items=(List[item_model], ...), facets=(MovieFacets, ...))
@@ -0,0 +1,96 @@
+from functools import lru_cache
+from fastapi import HTTPException, Response, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import RelationshipDirection, load_only
+from database_models import Movie, Actor, Director
+from etags import etag_relations
+from loading import loader_options
+from models import MovieDetailResponse, ActorDetailResponse, DirectorDetailResponse
+from serialization import render
+
+# Full response model of each resource; ``fields=`` picks its scalar fields
+# and ``include=`` its embedded relationships.
+RESPONSE_MODELS = {
+    Movie: MovieDetailResponse,
+    Actor: ActorDetailResponse,
+    Director: DirectorDetailResponse,
+}
+
+# Always loaded: the identity and the version the ETag is computed from.
+ALWAYS_LOADED = ("id", "version")
+
+
+class Fieldset:
+    def __init__(self, model, columns: tuple, relations: tuple):
+        self.model = model
+        self.columns = columns
+        self.relations = relations
+
+    @property
+    def etag_relations(self) -> tuple:
+        return etag_relations(self.model, self.relations)
+
+    def options(self, endpoint: str, *extra_columns) -> list:
+        """Loader options that load only the requested columns and relationships.
+
+        Unrequested relationships get no eager loader and are never touched
+        during serialization, so they cost no SQL at all.
+        """
+        mapper = inspect(self.model)
+        columns = {getattr(self.model, name) for name in self.columns + ALWAYS_LOADED}
+        columns.update(column for column in extra_columns if column is not None)
+        for name in self.relations:
+            relationship = mapper.relationships[name]
+            if relationship.direction is RelationshipDirection.MANYTOONE:
+                columns.update(getattr(self.model, column.key) for column in relationship.local_columns)
+        return [load_only(*columns), *loader_options(endpoint, self.model, self.relations)]
+
+    @property
+    def response_model(self):
+        return _sparse_model(RESPONSE_MODELS[self.model], self.columns, self.relations)
+
+    def render(self, objects, headers: dict | None = None) -> Response:
+        return render(self.response_model, objects, headers)
+
+
+def parse_fieldset(model, fields: str | None, include: str | None) -> Fieldset | None:
+    """Parse ``fields=title,release_year`` and ``include=director,genres``.
+
+    Returns None when neither is given (the full response). With only
+    ``fields``, nothing is embedded; with only ``include``, every scalar
+    field is kept. ``id`` is always returned.
+    """
+    if fields is None and include is None:
+        return None
+    relationships = inspect(model).relationships
+    available = RESPONSE_MODELS[model].model_fields
+    all_columns = tuple(name for name in available if name not in relationships)
+    all_relations = tuple(name for name in available if name in relationships)
+    columns = _parse_names(fields, all_columns, "field") if fields is not None else all_columns
+    relations = _parse_names(include, all_relations, "include") if include is not None else ()
+    return Fieldset(model, tuple(name for name in all_columns if name in columns or name == "id"), relations)
+
+
+def _parse_names(value: str, allowed: tuple, kind: str) -> tuple:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {kind} '{unknown[0]}'. Allowed: {', '.join(allowed)}"
+        )
+    return tuple(name for name in allowed if name in names)
+
+
+@lru_cache(maxsize=256)
+def _sparse_model(response_model, columns: tuple, relations: tuple):
+    keep = set(columns) | set(relations)
+    sparse_model = create_model(
+        f"Sparse{response_model.__name__}",
+        __config__=ConfigDict(from_attributes=True),
+        # Resolve forward references such as "DirectorResponse" in models.py.
+        __module__=response_model.__module__,
+        **{name: (field.annotation, field) for name, field in response_model.model_fields.items() if name in keep}
+    )
+    return sparse_model
@@ -0,0 +1,31 @@
+from database_models import Movie, Genre, Actor, Director
+
+# Each filter compiles to a plain column predicate or an EXISTS semi-join
+# (relationship.any()/has()), so combining filters never multiplies rows and
+# the filtered query can be paged and eager-loaded in a single statement.
+
+
+def name_matches(model, name: str):
+    return model.first_name.ilike(f"%{name}%") | model.last_name.ilike(f"%{name}%")
+
+
+MOVIE_FILTERS = {
+    "title": lambda title: Movie.title.ilike(f"%{title}%"),
+    "genre": lambda genre: Movie.genres.any(Genre.type == genre),
+    "actor": lambda actor: Movie.actors.any(name_matches(Actor, actor)),
+    "director": lambda director: Movie.director.has(name_matches(Director, director)),
+    "release_year": lambda release_year: Movie.release_year == release_year,
+}
+
+# Actor and director name search goes through the trigram index in
+# name_index.py instead of a LIKE scan.
+ACTOR_FILTERS = {
+    "movie": lambda movie: Actor.movies.any(Movie.title.ilike(f"%{movie}%")),
+    "genre": lambda genre: Actor.movies.any(Movie.genres.any(Genre.type == genre)),
+}
+
+DIRECTOR_FILTERS = {}
+
+
+def compile_filters(filters: dict, **params) -> list:
+    return [filters[key](value) for key, value in params.items() if value]
@@ -0,0 +1,126 @@
+"""Top-rated and trending movies, read from movie_rating_stats.
+
+Both boards rank by a column of movie_rating_stats that rating_stats.py keeps
+current as reviews are written: ``top_score`` (a Bayesian average the
+database derives from the review count and sum) and ``trend_score`` (the
+forward-decayed review weight). Each has an index, so a page walks the index
+from the top and stops after ``limit`` rows; the reviews table is never read.
+
+Trend scores are scaled to the landmark in ``trend_landmark``, and that scale
+doubles every half-life. Run ``python leaderboards.py`` periodically (daily,
+say) to move the landmark to the present and rescale every score; without it
+the scores overflow a double, and review writes start failing, after about
+1,000 half-lives. ``python leaderboards.py --rebuild`` recomputes the scores
+from the reviews instead, needed after changing ``TRENDING_HALF_LIFE_DAYS``.
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from database_models import Movie, MovieRatingStats, Review, TrendLandmark
+from filters import MOVIE_FILTERS, compile_filters
+from rating_stats import half_lives, trend_at, trend_weight
+
+
+def _leaderboard(db: Session, score, limit: int, genre: str | None, decade: int | None, *columns) -> list:
+    filters = compile_filters(MOVIE_FILTERS, genre=genre)
+    if decade is not None:
+        filters += [Movie.release_year >= decade, Movie.release_year < decade + 10]
+    rows = db.execute(
+        select(
+            Movie.id, Movie.title, Movie.release_year, Movie.image_url, Movie.rating,
+            MovieRatingStats.review_count, MovieRatingStats.rating_sum, score.label("score"), *columns,
+        )
+        .join(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        .where(MovieRatingStats.review_count > 0, *filters)
+        # Ties go to the newer movie, which keeps the order on the (score, movie_id) index.
+        .order_by(score.desc(), MovieRatingStats.movie_id.desc())
+        .limit(limit)
+    ).mappings().all()
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "release_year": row["release_year"],
+            "image_url": row["image_url"],
+            "rating": row["rating"],
+            "review_count": row["review_count"],
+            "average_rating": round(row["rating_sum"] / row["review_count"], 2),
+            "score": row["score"],
+            **{column.key: row[column.key] for column in columns},
+        }
+        for row in rows
+    ]
+
+
+def top_movies(db: Session, limit: int, genre: str | None = None, decade: int | None = None) -> list:
+    movies = _leaderboard(db, MovieRatingStats.top_score, limit, genre, decade)
+    for movie in movies:
+        movie["score"] = round(movie["score"], 4)
+    return movies
+
+
+def trending_movies(db: Session, limit: int, genre: str | None = None, decade: int | None = None) -> list:
+    # The landmark is read in the same statement as the scores it scales.
+    landmark = select(TrendLandmark.epoch).where(TrendLandmark.id == 1).scalar_subquery().label("landmark")
+    movies = _leaderboard(db, MovieRatingStats.trend_score, limit, genre, decade, landmark)
+    now = datetime.utcnow()
+    for movie in movies:
+        movie["score"] = round(trend_at(movie["score"], now, movie.pop("landmark")), 4)
+    return movies
+
+
+def advance_landmark(db: Session, now: datetime) -> datetime:
+    """Move the trend landmark to ``now`` and rescale every ``trend_score`` to it, in the caller's transaction.
+
+    Returns the previous landmark. Review writes hold the landmark row, so
+    none of them can mix the two scales.
+    """
+    previous = db.execute(select(TrendLandmark.epoch).where(TrendLandmark.id == 1).with_for_update()).scalar_one()
+    table = MovieRatingStats.__table__
+    db.execute(
+        update(table)
+        .where(table.c.trend_score != 0)
+        .values(trend_score=table.c.trend_score * 2 ** -half_lives(previous, now))
+    )
+    db.execute(update(TrendLandmark).where(TrendLandmark.id == 1).values(epoch=now))
+    return previous
+
+
+def rebuild_trends(db: Session, now: datetime) -> int:
+    """Recompute every ``trend_score`` from the reviews, scaled to a landmark moved to ``now``.
+
+    Runs in the caller's transaction; returns the movies with reviews.
+    """
+    db.execute(select(TrendLandmark.epoch).where(TrendLandmark.id == 1).with_for_update())
+    scores = defaultdict(float)
+    for movie_id, rating, created_at in db.execute(select(Review.movie_id, Review.rating, Review.created_at)):
+        scores[movie_id] += trend_weight(rating, created_at, now)
+    table = MovieRatingStats.__table__
+    db.execute(update(table).values(trend_score=0))
+    if scores:
+        db.execute(update(MovieRatingStats), [{"movie_id": id, "trend_score": score} for id, score in scores.items()])
+    db.execute(update(TrendLandmark).where(TrendLandmark.id == 1).values(epoch=now))
+    return len(scores)
+
+
+def main():
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Move the trend landmark to now and rescale the trend scores.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the trend scores from the reviews")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        if args.rebuild:
+            print(f"{rebuild_trends(db, now)} trend scores recomputed")
+        else:
+            previous = advance_landmark(db, now)
+            print(f"Trend landmark moved from {previous} to {now}")
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import threading
+from sqlalchemy.orm import Session
+
+
+class LiveIndex:
+    """Base for the in-process indexes that requests read while writes update them.
+
+    ``reload`` builds a replacement from the database without holding the
+    lock and only takes it to swap the new structures in. In async mode,
+    lookups take the lock on the event loop, so a rebuild that held it while
+    reading every row would stall all requests. Changes recorded while the
+    replacement loads are replayed onto it before the swap.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._journals = []
+        self.clear()
+
+    def clear(self):
+        raise NotImplementedError
+
+    def ensure_loaded(self, db: Session):
+        raise NotImplementedError
+
+    def replacement(self) -> "LiveIndex":
+        """An empty index configured like this one."""
+        raise NotImplementedError
+
+    def _adopt(self, fresh: "LiveIndex"):
+        """Take over the contents of ``fresh``; called with the lock held."""
+        raise NotImplementedError
+
+    def reload(self, db: Session):
+        journal = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            fresh = self.replacement()
+            fresh.ensure_loaded(db)
+            with self._lock:
+                for method, args in journal:
+                    getattr(fresh, method)(*args)
+                self._adopt(fresh)
+        finally:
+            with self._lock:
+                self._journals.remove(journal)
+
+    def _record(self, method: str, *args):
+        """Note a change for the reloads in progress; called with the lock held."""
+        for journal in self._journals:
+            journal.append((method, args))
@@ -0,0 +1,55 @@
+import os
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+
+LOADER_STRATEGIES = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "subquery": subqueryload,
+}
+
+# Many-to-one and one-to-one relationships are joined (one extra column set
+# per row); every collection gets its own SELECT so a movie with G genres,
+# A actors and R reviews costs G + A + R rows instead of G * A * R joined rows.
+LOADER_POLICIES = {
+    "movie_list": {
+        "director": "joined", "rating_stats": "joined", "genres": "selectin", "actors": "selectin", "reviews": "selectin"
+    },
+    "movie_detail": {
+        "director": "joined", "rating_stats": "joined", "genres": "selectin", "actors": "selectin", "reviews": "selectin"
+    },
+    "movie_batch": {
+        "director": "joined", "rating_stats": "joined", "genres": "selectin", "actors": "selectin", "reviews": "selectin"
+    },
+    "actor_list": {"movies": "selectin"},
+    "actor_detail": {"movies": "selectin"},
+    "actor_batch": {"movies": "selectin"},
+    "director_list": {"movies": "selectin"},
+    "director_detail": {"movies": "selectin"},
+    "director_batch": {"movies": "selectin"},
+}
+
+
+def parse_policy(value: str) -> dict:
+    """Parse an override such as ``"reviews=subquery,genres=joined"``."""
+    policy = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        relationship, _, strategy = item.partition("=")
+        if strategy not in LOADER_STRATEGIES:
+            raise ValueError(f"Unknown loader strategy '{strategy}' for '{relationship}'")
+        policy[relationship] = strategy
+    return policy
+
+
+for endpoint in LOADER_POLICIES:
+    override = os.getenv(f"LOADER_POLICY_{endpoint.upper()}")
+    if override:
+        LOADER_POLICIES[endpoint].update(parse_policy(override))
+
+
+def loader_options(endpoint: str, model, relationships=None) -> list:
+    """Eager-load options for ``endpoint``, optionally limited to ``relationships``."""
+    return [
+        LOADER_STRATEGIES[strategy](getattr(model, relationship))
+        for relationship, strategy in LOADER_POLICIES[endpoint].items()
+        if relationships is None or relationship in relationships
+    ]
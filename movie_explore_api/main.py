@@ -1,26 +1,76 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import movies, actors, genres, directors, reviews
-from database import engine
+from sqlalchemy.orm.exc import StaleDataError
+from routes import movies, actors, genres, directors, reviews, search, autocomplete, export, internal, metrics
+from database import engine, replicas, DATABASE_ASYNC, AsyncSessionLocal
+from response_cache import ResponseCacheMiddleware
+from query_monitor import QueryMonitorMiddleware
+from metrics import MetricsMiddleware
+from replicas import ReplicaPinMiddleware
+from name_index import actor_names, director_names
+from autocomplete import catalog_prefixes
+from etags import stale_version_response
 import database_models
 
-app = FastAPI(title="Movie Explore API", version="1.0.0")
+ROUTERS = [
+    movies.router,
+    actors.router,
+    genres.router,
+    directors.router,
+    reviews.router,
+    search.router,
+    autocomplete.router,
+    export.router,
+    internal.router,
+    metrics.router,
+]
 
+
+def load_indexes(db):
+    for index in (actor_names, director_names, catalog_prefixes):
+        index.ensure_loaded(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DATABASE_ASYNC:
+        # Coroutines share one thread, so the indexes' locks cannot keep two
+        # requests from building the same index at once; build them up front.
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(load_indexes)
+    yield
+
+
+app = FastAPI(title="Movie Explore API", version="1.0.0", lifespan=lifespan)
+app.add_exception_handler(StaleDataError, stale_version_response)
+
+# Added before CORS so cached responses still get per-request CORS headers.
+app.add_middleware(ResponseCacheMiddleware)
+# Outside the cache so that cache hits report zero statements; metrics read
+# the query monitor's DB time, so they sit between the two.
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryMonitorMiddleware)
+app.add_middleware(ReplicaPinMiddleware, replicas=replicas)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
 database_models.Base.metadata.create_all(bind=engine)
 
-app.include_router(movies.router)
-app.include_router(actors.router)
-app.include_router(genres.router)
-app.include_router(directors.router)
-app.include_router(reviews.router)
+if DATABASE_ASYNC:
+    from async_routes import asyncify_router
+
+    for router in ROUTERS:
+        app.include_router(asyncify_router(router))
+else:
+    for router in ROUTERS:
+        app.include_router(router)
  
 @app.get("/")
 def fetchAllRequest():
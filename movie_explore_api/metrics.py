@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from query_monitor import current_queries
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds in seconds (Prometheus ``le`` labels).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests that matched no route share one label instead of one per path.
+UNMATCHED_ROUTE = "<unmatched>"
+
+HISTOGRAMS = (
+    ("http_request_duration_seconds", "Time from receiving the request to sending the last body byte."),
+    ("http_request_db_seconds", "Time spent executing SQL statements."),
+    ("http_request_serialization_seconds",
+     "Time from the last SQL statement to the response headers: model validation and JSON encoding."),
+)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Per-route latency histograms, response counters and the in-flight gauge."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0
+            self.routes = {}
+            self.responses = Counter()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, total: float, db: float, serialization: float):
+        with self._lock:
+            self.in_flight -= 1
+            histograms = self.routes.get((method, route))
+            if histograms is None:
+                histograms = self.routes[(method, route)] = (Histogram(), Histogram(), Histogram())
+            histograms[0].observe(total)
+            histograms[1].observe(db)
+            histograms[2].observe(serialization)
+            self.responses[(method, route, status)] += 1
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being served.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+            ]
+            routes = sorted(self.routes.items())
+            for position, (name, help) in enumerate(HISTOGRAMS):
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+                for (method, route), histograms in routes:
+                    lines += histograms[position].samples(name, f'method="{method}",route="{_label(route)}"')
+            lines += [
+                "# HELP http_responses_total Responses sent, by status code.",
+                "# TYPE http_responses_total counter",
+            ]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'http_responses_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Records every request in ``metrics`` under its route template.
+
+    Must run inside ``QueryMonitorMiddleware`` to split out database time;
+    without it DB time is reported as zero.
+    """
+
+    def __init__(self, app, metrics: Metrics = metrics, enabled: bool = METRICS_ENABLED):
+        self.app = app
+        self.metrics = metrics
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        # Anything that fails before sending headers ends up as a 500.
+        status = 500
+        headers_sent_at = None
+
+        async def record_start(message):
+            nonlocal status, headers_sent_at
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers_sent_at = time.perf_counter()
+            await send(message)
+
+        self.metrics.started()
+        try:
+            await self.app(scope, receive, record_start)
+        finally:
+            end = time.perf_counter()
+            queries = current_queries()
+            db_seconds = queries.db_seconds if queries is not None else 0.0
+            last_statement_end = queries.last_statement_end if queries is not None else None
+            serialization = (headers_sent_at or end) - max(start, last_statement_end or start)
+            route = scope.get("route")
+            self.metrics.finished(
+                scope["method"], route.path if route is not None else UNMATCHED_ROUTE, status,
+                end - start, db_seconds, max(serialization, 0.0),
+            )
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Annotated, Dict, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -38,11 +38,17 @@ class MovieDetailResponse(BaseModel):
     genres: List["GenreResponse"] = []
     actors: List["ActorResponse"] = []
     reviews: List["ReviewResponse"] = []
+    rating_stats: Optional["RatingStatsResponse"] = None
 
     class Config:
         from_attributes = True
 
 
+class MovieBatchResponse(BaseModel):
+    items: List[MovieDetailResponse]
+    missing: List[int]
+
+
 # Genre models
 class GenreBase(BaseModel):
     type: str = Field(min_length=2, max_length=30)
@@ -87,6 +93,11 @@ class ActorDetailResponse(BaseModel):
         from_attributes = True
 
 
+class ActorBatchResponse(BaseModel):
+    items: List[ActorDetailResponse]
+    missing: List[int]
+
+
 # Director models
 class DirectorBase(BaseModel):
     first_name: str = Field(min_length=2, max_length=50)
@@ -118,6 +129,11 @@ class DirectorDetailResponse(BaseModel):
         from_attributes = True
 
 
+class DirectorBatchResponse(BaseModel):
+    items: List[DirectorDetailResponse]
+    missing: List[int]
+
+
 # Review models
 class ReviewBase(BaseModel):
     movie_id: int
@@ -138,4 +154,108 @@ class ReviewResponse(BaseModel):
         from_attributes = True
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# Batch models
+class BatchRequest(BaseModel):
+    ids: List[int]
+
+
+# Bulk import models
+class MovieImport(BaseModel):
+    """One NDJSON line of a bulk import; people and genres are matched by name."""
+    title: str = Field(min_length=3, max_length=50)
+    description: str
+    release_year: int = Field(ge=1900, le=2026)
+    image_url: Optional[str] = None
+    rating: Optional[float] = None
+    director: DirectorBase
+    actors: List[ActorBase] = []
+    genres: List[Annotated[str, Field(min_length=2, max_length=30)]] = []
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    imported: int
+    failed: int
+    seconds: float
+    rows_per_second: float
+    errors: List[ImportRowError]
+
+
+# Rating aggregate models
+class RatingStatsResponse(BaseModel):
+    review_count: int
+    average_rating: Optional[float] = None
+    histogram: Dict[int, int]
+
+    class Config:
+        from_attributes = True
+
+
+class MovieRatingResponse(BaseModel):
+    movie_id: int
+    movie_title: str
+    average_rating: Optional[float] = None
+    total_reviews: int
+    histogram: Dict[int, int]
+
+
+# Search models
+class SearchResult(BaseModel):
+    id: int
+    title: str
+    release_year: int
+    image_url: Optional[str] = None
+    score: float
+    title_highlight: str
+    description_snippet: str
+
+
+# Similar movie models
+class SimilarMovie(BaseModel):
+    id: int
+    title: str
+    release_year: int
+    image_url: Optional[str] = None
+    rating: Optional[float] = None
+    score: float
+
+
+# Leaderboard models
+class LeaderboardEntry(BaseModel):
+    id: int
+    title: str
+    release_year: int
+    image_url: Optional[str] = None
+    rating: Optional[float] = None
+    review_count: int
+    average_rating: float
+    score: float
+
+
+# Autocomplete models
+class AutocompleteEntry(BaseModel):
+    type: str
+    id: int
+    label: str
+    score: float
+
+
+# Facet models
+class FacetCount(BaseModel):
+    value: Optional[int] = None
+    label: str
+    count: int
+
+
+class MovieFacets(BaseModel):
+    genre: Optional[List[FacetCount]] = None
+    decade: Optional[List[FacetCount]] = None
+    director: Optional[List[FacetCount]] = None
+    rating: Optional[List[FacetCount]] = None
@@ -0,0 +1,201 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database_models import Actor, Director
+from live_index import LiveIndex
+
+SIMILARITY_THRESHOLD = 0.3
+NAME_MATCH_LIMIT = 100
+# Only the best-scoring vocabulary tokens per query word are expanded to people.
+TOKEN_MATCH_LIMIT = 32
+
+
+def tokenize(value: str) -> list:
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.findall(r"[a-z0-9]+", stripped.lower())
+
+
+def trigrams(token: str) -> set:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex(LiveIndex):
+    """Fuzzy first/last name lookup for one person table.
+
+    Trigrams are indexed per distinct name token rather than per person, so a
+    query only scores the (small) vocabulary and then expands the matching
+    tokens to people. Scores follow pg_trgm: the Jaccard similarity of the
+    trigram sets, with exact and substring matches ranked above fuzzy ones.
+    A token needs at least ``threshold * n`` of the query's ``n`` trigrams to
+    reach the threshold; shared trigrams are counted in C (``Counter`` and set
+    intersections) and only tokens over that bound are scored in Python.
+    """
+
+    def __init__(self, model, threshold: float = SIMILARITY_THRESHOLD):
+        self.model = model
+        self.threshold = threshold
+        super().__init__()
+
+    def clear(self):
+        with self._lock:
+            self.loaded = False
+            self._people = {}
+            self._token_people = defaultdict(list)
+            self._token_trigrams = {}
+            self._trigram_tokens = defaultdict(set)
+
+    def replacement(self):
+        return TrigramIndex(self.model, self.threshold)
+
+    def _adopt(self, fresh):
+        self._people = fresh._people
+        self._token_people = fresh._token_people
+        self._token_trigrams = fresh._token_trigrams
+        self._trigram_tokens = fresh._trigram_tokens
+        self.loaded = fresh.loaded
+
+    def __len__(self):
+        return len(self._people)
+
+    def ensure_loaded(self, db: Session):
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            rows = db.execute(select(self.model.id, self.model.first_name, self.model.last_name))
+            for id, first_name, last_name in rows:
+                if id not in self._people:
+                    self._add(id, first_name, last_name)
+            self.loaded = True
+
+    def add(self, id: int, first_name: str, last_name: str):
+        with self._lock:
+            self._remove(id)
+            self._add(id, first_name, last_name)
+            self._record("add", id, first_name, last_name)
+
+    def remove(self, id: int):
+        with self._lock:
+            self._remove(id)
+            self._record("remove", id)
+
+    def _add(self, id, first_name, last_name):
+        tokens = tuple(dict.fromkeys(tokenize(first_name) + tokenize(last_name)))
+        self._people[id] = tokens
+        for token in tokens:
+            bisect.insort(self._token_people[token], id)
+            if token not in self._token_trigrams:
+                grams = frozenset(trigrams(token))
+                self._token_trigrams[token] = grams
+                for gram in grams:
+                    self._trigram_tokens[gram].add(token)
+
+    def _remove(self, id):
+        for token in self._people.pop(id, ()):
+            people = self._token_people[token]
+            del people[bisect.bisect_left(people, id)]
+            if not people:
+                del self._token_people[token]
+                for gram in self._token_trigrams.pop(token):
+                    self._trigram_tokens[gram].discard(token)
+                    if not self._trigram_tokens[gram]:
+                        del self._trigram_tokens[gram]
+
+    def _match_token(self, query_token: str) -> dict:
+        grams = trigrams(query_token)
+        min_shared = max(1, math.ceil(self.threshold * len(grams)))
+        postings = sorted((self._trigram_tokens.get(gram, set()) for gram in grams), key=len)
+        # Prefix filtering: a token with min_shared common trigrams must be in
+        # one of the rarest n - min_shared + 1 posting lists. The remaining
+        # (large) lists are only probed for those candidates.
+        split = len(grams) - min_shared + 1
+        shared = Counter()
+        for posting in postings[:split]:
+            shared.update(posting)
+        candidates = shared.keys()
+        for posting in postings[split:]:
+            shared.update(candidates & posting)
+        scores = {}
+        for token, count in shared.items():
+            if count < min_shared:
+                continue
+            if query_token in token:
+                scores[token] = 0.5 + 0.5 * len(query_token) / len(token)
+                continue
+            similarity = count / (len(grams) + len(self._token_trigrams[token]) - count)
+            if similarity >= self.threshold:
+                scores[token] = similarity * 0.5
+        if len(scores) > TOKEN_MATCH_LIMIT:
+            scores = dict(heapq.nlargest(TOKEN_MATCH_LIMIT, scores.items(), key=lambda item: item[1]))
+        return scores
+
+    def search(self, db: Session, query: str, limit: int | None = NAME_MATCH_LIMIT) -> list:
+        """Return up to ``limit`` ``(id, score)`` pairs (all if None), best match first."""
+        self.ensure_loaded(db)
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        with self._lock:
+            matches = [self._match_token(token) for token in query_tokens]
+            if not all(matches):
+                return []
+            if len(matches) == 1:
+                return self._expand_single(matches[0], limit)
+            # Every query token has to match one of the person's names, so
+            # candidates come from the query token with the fewest people.
+            rarest = min(matches, key=lambda match: sum(len(self._token_people[token]) for token in match))
+            candidates = set().union(*(self._token_people[token] for token in rarest))
+            scored = []
+            for id in candidates:
+                tokens = self._people[id]
+                best = [max((match.get(token, 0.0) for token in tokens), default=0.0) for match in matches]
+                if all(best):
+                    scored.append((-sum(best) / len(best), id))
+            best = sorted(scored) if limit is None else heapq.nsmallest(limit, scored)
+            return [(id, -score) for score, id in best]
+
+    def filtered_search(self, db: Session, query: str, filters: list, limit: int = NAME_MATCH_LIMIT) -> list:
+        """``search`` among the rows that pass ``filters``.
+
+        The limit applies after the filters, so it cannot drop a matching row
+        that passes them.
+        """
+        if not filters:
+            return self.search(db, query, limit)
+        ranked = self.search(db, query, None)
+        kept = {
+            id for id, in db.execute(
+                select(self.model.id).where(*filters, self.model.id.in_([id for id, _ in ranked]))
+            )
+        }
+        return [match for match in ranked if match[0] in kept][:limit]
+
+    def _expand_single(self, match: dict, limit: int | None) -> list:
+        results = []
+        for token, score in sorted(match.items(), key=lambda item: (-item[1], item[0])):
+            seen = {id for id, _ in results}
+            people = (id for id in self._token_people[token] if id not in seen)
+            if limit is None:
+                results += [(id, score) for id in people]
+                continue
+            results += [(id, score) for _, id in zip(range(limit - len(results)), people)]
+            if len(results) >= limit:
+                break
+        return results
+
+
+actor_names = TrigramIndex(Actor)
+director_names = TrigramIndex(Director)
+
+
+def rank_by(items: list, ranked: list) -> list:
+    position = {id: i for i, (id, _) in enumerate(ranked)}
+    return sorted(items, key=lambda item: position[item.id])
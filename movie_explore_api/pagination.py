@@ -0,0 +1,102 @@
+import base64
+import json
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from database_models import Movie
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+MOVIE_SORT_KEYS = {
+    "id": Movie.id,
+    "title": Movie.title,
+    "release_year": Movie.release_year,
+    "rating": Movie.rating,
+}
+
+
+def parse_sort(sort: str, sort_keys: dict):
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in sort_keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by '{key}'. Allowed: {', '.join(sort_keys)}"
+        )
+    return key, descending
+
+
+def encode_cursor(sort: str, value, id: int) -> str:
+    raw = json.dumps([sort, value, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def cursor_types(column) -> tuple:
+    """JSON value types a cursor may carry for ``column``.
+
+    Numeric columns take either number: ``Movie.rating`` is declared Integer
+    but holds fractional ratings, and whole floats are written as ints.
+    """
+    python_type = column.type.python_type
+    return (int, float) if python_type in (int, float) else (python_type,)
+
+
+def decode_cursor(cursor: str, sort: str, column):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or type(id) is not int:
+            raise ValueError(cursor_sort)
+        # Anything else, such as a hand-edited list or object, would only
+        # fail later when bound as a SQL parameter.
+        if value is not None and type(value) not in cursor_types(column):
+            raise ValueError(value)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return value, id
+
+
+def keyset_order(column, id_column, descending: bool):
+    # NULL sorts lowest on both MySQL and SQLite, so the plain (column, id)
+    # ordering below can be served straight from an index on column.
+    if descending:
+        return [column.desc(), id_column.desc()]
+    return [column.asc(), id_column.asc()]
+
+
+def keyset_after(column, id_column, descending: bool, value, last_id: int):
+    if column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < last_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < last_id),
+            column.is_(None)
+        )
+    if value is None:
+        return or_(
+            and_(column.is_(None), id_column > last_id),
+            column.is_not(None)
+        )
+    return or_(column > value, and_(column == value, id_column > last_id))
+
+
+def paginate(query, sort: str, limit: int, after: str | None, sort_keys: dict, id_column):
+    key, descending = parse_sort(sort, sort_keys)
+    column = sort_keys[key]
+    if after:
+        value, last_id = decode_cursor(after, sort, column)
+        query = query.filter(keyset_after(column, id_column, descending, value, last_id))
+    rows = query.order_by(*keyset_order(column, id_column, descending)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), getattr(last, id_column.key))
+    return rows, next_cursor
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Checkout wait buckets (upper bounds in milliseconds).
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def pool_settings() -> dict:
+    """QueuePool arguments for ``create_engine`` from ``DB_POOL_*`` variables.
+
+    ``pool_recycle`` retires connections before MySQL's ``wait_timeout`` (8h
+    by default) closes them server-side; ``DB_POOL_PING_IDLE_SECONDS`` is
+    handled by ``install_idle_ping``.
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_use_lifo": os.getenv("DB_POOL_USE_LIFO", "true").lower() == "true",
+    }
+
+
+PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", "60"))
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.pings = 0
+            self.stale = 0
+            self.wait_seconds_total = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if seconds * 1000 <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.wait_buckets[bucket] += 1
+            self.wait_seconds_total += seconds
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def record_ping(self, stale: bool):
+        with self._lock:
+            self.pings += 1
+            self.stale += stale
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["gt_10000ms"]
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "idle_pings": self.pings,
+                "stale_connections": self.stale,
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / waits, 3) if waits else 0.0,
+                "wait_ms_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+class _InstrumentedPool:
+    """Times every wait for a connection, including waits that time out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start, timed_out=False)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def install_idle_ping(engine, idle_seconds: float = PING_IDLE_SECONDS):
+    """Ping a connection on checkout only if it sat idle in the pool for a while.
+
+    Busy connections skip the round trip that ``pool_pre_ping`` pays on every
+    checkout; a connection the server dropped while idle fails the ping and
+    the pool transparently replaces it.
+    """
+    @event.listens_for(engine, "checkin")
+    def remember_checkin(dbapi_connection, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, record, proxy):
+        checked_in_at = record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        stats = getattr(engine.pool, "stats", None)
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            if stats:
+                stats.record_ping(stale=True)
+            raise exc.DisconnectionError("Connection went stale while idle in the pool")
+        if stats:
+            stats.record_ping(stale=False)
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "recycle": pool._recycle,
+        })
+    stats = getattr(pool, "stats", None)
+    if stats:
+        status.update(stats.snapshot())
+    return status
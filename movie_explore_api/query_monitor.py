@@ -0,0 +1,168 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+QUERY_MONITOR_ENABLED = os.getenv("QUERY_MONITOR_ENABLED", "true").lower() == "true"
+# A statement run this many times in one request is reported as a likely N+1.
+REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+MAX_STATEMENT_LENGTH = 200
+
+_current = ContextVar("query_stats", default=None)
+
+
+class RequestQueries:
+    """Statements, rows and database time of one request."""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.last_statement_end = None
+        self.by_statement = Counter()
+
+    def record(self, statement: str, rows: int, seconds: float):
+        self.statements += 1
+        # Drivers report -1 when they do not know the row count (SQLite
+        # SELECTs); MySQL drivers buffer results and always report it.
+        self.rows += max(rows, 0)
+        self.db_seconds += seconds
+        self.last_statement_end = time.perf_counter()
+        self.by_statement[statement] += 1
+
+    def repeated(self) -> list:
+        if self.statements < REPEAT_THRESHOLD:
+            return []
+        return [(statement, count) for statement, count in self.by_statement.most_common() if count >= REPEAT_THRESHOLD]
+
+    def server_timing(self, total_seconds: float) -> str:
+        metrics = [
+            f"db;dur={self.db_seconds * 1000:.3f}",
+            f"db-statements;desc={self.statements}",
+            f"db-rows;desc={self.rows}",
+        ]
+        repeated = self.repeated()
+        if repeated:
+            metrics.append(f"db-repeated;desc={repeated[0][1]}")
+        metrics.append(f"app;dur={total_seconds * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+class QueryStats:
+    """Per-route totals, including the statements flagged as N+1 candidates."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+
+    def record(self, route: str, queries: RequestQueries):
+        repeated = queries.repeated()
+        with self._lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = {
+                    "requests": 0, "statements": 0, "statements_max": 0, "db_ms": 0.0, "n_plus_one": 0, "repeated": None,
+                }
+            stats["requests"] += 1
+            stats["statements"] += queries.statements
+            stats["statements_max"] = max(stats["statements_max"], queries.statements)
+            stats["db_ms"] += queries.db_seconds * 1000
+            if repeated:
+                stats["n_plus_one"] += 1
+                statement, count = repeated[0]
+                stats["repeated"] = {"statement": statement[:MAX_STATEMENT_LENGTH], "count": count}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    "requests": stats["requests"],
+                    "statements_avg": round(stats["statements"] / stats["requests"], 2),
+                    "statements_max": stats["statements_max"],
+                    "db_ms_avg": round(stats["db_ms"] / stats["requests"], 3),
+                    "n_plus_one": stats["n_plus_one"],
+                    "repeated": stats["repeated"],
+                }
+                for route, stats in sorted(self.routes.items())
+            }
+
+
+query_stats = QueryStats()
+
+
+def install_query_monitor(engine):
+    """Attribute every statement ``engine`` runs to the request being served."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        queries = _current.get()
+        if queries is not None and conn.info.get("query_start"):
+            queries.record(statement, cursor.rowcount, time.perf_counter() - conn.info["query_start"].pop())
+
+
+def current_queries():
+    """The ``RequestQueries`` of the request being served, if the monitor is on."""
+    return _current.get()
+
+
+def parse_server_timing(header: str) -> dict:
+    """``{"db": {"dur": "1.2"}, "db-statements": {"desc": "4"}, ...}`` from a Server-Timing header."""
+    metrics = {}
+    for metric in header.split(","):
+        name, *params = (part.strip() for part in metric.split(";"))
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class QueryMonitorMiddleware:
+    """Adds a ``Server-Timing`` header with the SQL each request ran.
+
+    Statements run while a streaming body is sent come after the headers and
+    are not counted.
+    """
+
+    def __init__(self, app, stats: QueryStats = query_stats, enabled: bool = QUERY_MONITOR_ENABLED):
+        self.app = app
+        self.stats = stats
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+        start = time.perf_counter()
+
+        async def add_header(message):
+            if message["type"] == "http.response.start":
+                timing = queries.server_timing(time.perf_counter() - start)
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (b"server-timing", timing.encode("latin-1"))
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, add_header)
+        finally:
+            _current.reset(token)
+        route = scope.get("route")
+        if route is None:
+            return
+        name = f"{scope['method']} {route.path}"
+        self.stats.record(name, queries)
+        for statement, count in queries.repeated():
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", name, count, statement[:MAX_STATEMENT_LENGTH])
@@ -0,0 +1,82 @@
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from database_models import MovieRatingStats, TrendLandmark
+
+# A review's weight in /movies/trending halves every TRENDING_HALF_LIFE_DAYS.
+TRENDING_HALF_LIFE_DAYS = 7.0
+
+
+def rating_bucket(rating: float) -> str:
+    return f"rating_{min(max(int(rating), 1), 10)}"
+
+
+def half_lives(start: datetime, end: datetime) -> float:
+    return (end - start).total_seconds() / (TRENDING_HALF_LIFE_DAYS * 86400)
+
+
+def trend_landmark(db: Session, lock: bool = False) -> datetime:
+    """The instant every ``trend_score`` is scaled to.
+
+    Trend scores are stored scaled to the landmark instead of decayed in place
+    ("forward decay"), so a review only ever updates its own movie's row. The
+    scale doubles every half-life, so leaderboards.advance_landmark moves the
+    landmark forward and rescales the scores. ``lock`` holds the landmark until
+    the caller's transaction ends, so a write cannot straddle a move.
+    """
+    statement = select(TrendLandmark.epoch).where(TrendLandmark.id == 1)
+    if lock:
+        statement = statement.with_for_update(read=True)
+    return db.execute(statement).scalar_one()
+
+
+def trend_weight(rating: float, created_at: datetime | None, landmark: datetime) -> float:
+    """A review's contribution to its movie's ``trend_score``: rating / 10, scaled to ``landmark``.
+
+    Reviews without a ``created_at`` have no age, so they never trend.
+    """
+    if created_at is None:
+        return 0.0
+    return rating / 10 * 2 ** half_lives(landmark, created_at)
+
+
+def trend_at(trend_score: float, now: datetime, landmark: datetime) -> float:
+    """A stored ``trend_score`` decayed to ``now``: the sum of each review's rating / 10 halved per half-life of age."""
+    return trend_score * 2 ** -half_lives(landmark, now)
+
+
+def _apply(db: Session, movie_id: int, rating: float, created_at: datetime | None, delta: int):
+    # Relative UPDATE so concurrent reviews of the same movie never lose an
+    # increment; runs in the caller's transaction alongside the review write.
+    bucket = rating_bucket(rating)
+    trend = 0.0 if created_at is None else delta * trend_weight(rating, created_at, trend_landmark(db, lock=True))
+    table = MovieRatingStats.__table__
+    result = db.execute(
+        update(table)
+        .where(table.c.movie_id == movie_id)
+        .values({
+            table.c.review_count: table.c.review_count + delta,
+            table.c.rating_sum: table.c.rating_sum + delta * rating,
+            table.c[bucket]: table.c[bucket] + delta,
+            table.c.trend_score: table.c.trend_score + trend,
+        })
+    )
+    if result.rowcount == 0:
+        db.add(MovieRatingStats(
+            movie_id=movie_id, review_count=delta, rating_sum=delta * rating, trend_score=trend, **{bucket: delta}
+        ))
+        db.flush()
+
+
+def add_rating(db: Session, movie_id: int, rating: float, created_at: datetime | None):
+    _apply(db, movie_id, rating, created_at, 1)
+
+
+def remove_rating(db: Session, movie_id: int, rating: float, created_at: datetime | None):
+    _apply(db, movie_id, rating, created_at, -1)
+
+
+def change_rating(db: Session, movie_id: int, old_rating: float, new_rating: float, created_at: datetime | None):
+    if old_rating != new_rating:
+        remove_rating(db, movie_id, old_rating, created_at)
+        add_rating(db, movie_id, new_rating, created_at)
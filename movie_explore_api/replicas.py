@@ -0,0 +1,190 @@
+"""Read replicas: health-checked round-robin for GET routes, primary pinning after writes.
+
+``DATABASE_REPLICA_URLS`` lists the replicas, comma separated. For local
+testing two SQLite files can stand in for replicas of a SQLite primary;
+``python replicas.py`` copies the primary into them (``--every`` repeats the
+copy, which makes the copies lag like real replicas)::
+
+    export DATABASE_URL=sqlite:///primary.db
+    export DATABASE_REPLICA_URLS=sqlite:///replica1.db,sqlite:///replica2.db
+    python replicas.py --every 2
+"""
+import argparse
+import math
+import os
+import sqlite3
+import threading
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# How long a client reads from the primary after it writes; keep it above the replicas' usual lag.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# How long a replica that failed is skipped before a request tries it again.
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+PIN_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class Replica:
+    def __init__(self, url: str, engine):
+        self.url = url
+        self.engine = engine
+        self.session = sessionmaker(autoflush=False, autocommit=False, bind=engine)
+        self.healthy = True
+        self.retry_at = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.last_error = None
+
+    def status(self) -> dict:
+        return {
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """Hands out replica sessions round-robin, skipping replicas that failed.
+
+    A replica is healthy while connections check out of its pool (the pool's
+    idle ping catches dropped connections) and its statements do not fail
+    with a database error. A failed replica is left out for
+    ``REPLICA_RETRY_SECONDS``; the next request after that tries it again.
+    """
+
+    def __init__(self, replicas=(), retry_seconds: float = REPLICA_RETRY_SECONDS,
+                 pin_seconds: float = READ_YOUR_WRITES_SECONDS):
+        self.replicas = list(replicas)
+        self.retry_seconds = retry_seconds
+        self.pin_seconds = pin_seconds
+        self._lock = threading.Lock()
+        self._next = 0
+        self.last_write = -math.inf
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def session(self):
+        """A session on a replica with a connection already checked out, or None if none is healthy."""
+        for replica in self._candidates():
+            db = replica.session()
+            try:
+                db.connection()
+            except DBAPIError as error:
+                db.close()
+                self.mark_down(replica, error)
+                continue
+            with self._lock:
+                replica.healthy = True
+                replica.reads += 1
+            db.info["replica"] = replica
+            return db
+        return None
+
+    def _candidates(self) -> list:
+        # Rotating over the available replicas only keeps the load even while one is down.
+        now = time.monotonic()
+        with self._lock:
+            available = [replica for replica in self.replicas if replica.healthy or replica.retry_at <= now]
+            if not available:
+                return []
+            start = self._next % len(available)
+            self._next += 1
+            return available[start:] + available[:start]
+
+    def mark_down(self, replica: Replica, error: Exception):
+        with self._lock:
+            replica.healthy = False
+            replica.retry_at = time.monotonic() + self.retry_seconds
+            replica.failures += 1
+            replica.last_error = f"{type(error).__name__}: {str(error).splitlines()[0]}"
+
+    def wrote(self):
+        with self._lock:
+            self.last_write = time.monotonic()
+
+    def may_lag(self) -> bool:
+        """Whether replicas may not have this process's latest write yet."""
+        return time.monotonic() - self.last_write < self.pin_seconds
+
+    def pinned(self, cookie: str | None) -> bool:
+        try:
+            return cookie is not None and float(cookie) > time.time()
+        except ValueError:
+            return False
+
+    def status(self) -> list:
+        with self._lock:
+            return [replica.status() for replica in self.replicas]
+
+
+class ReplicaPinMiddleware:
+    """Pins a client to the primary for ``pin_seconds`` after each successful write.
+
+    Requests served through ``get_read_db`` count as reads whatever their
+    method. The pin is a cookie holding its expiry, so it follows the client
+    to any worker; a client that forges it only moves its own reads to the
+    primary.
+    """
+
+    def __init__(self, app, replicas: ReplicaSet):
+        self.app = app
+        self.replicas = replicas
+
+    async def __call__(self, scope, receive, send):
+        if not self.replicas or scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def pin(message):
+            if (message["type"] == "http.response.start" and message["status"] < 400
+                    and not scope.get("state", {}).get("read_only")):
+                self.replicas.wrote()
+                seconds = self.replicas.pin_seconds
+                cookie = (f"{PIN_COOKIE}={time.time() + seconds:.3f}; Max-Age={math.ceil(seconds)}; "
+                          f"Path=/; HttpOnly; SameSite=Lax")
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())])
+            await send(message)
+
+        await self.app(scope, receive, pin)
+
+
+def copy_sqlite(primary_url: str, replica_urls: list):
+    """Copy a SQLite primary into SQLite replicas with the online backup API."""
+    source = sqlite3.connect(make_url(primary_url).database)
+    try:
+        for url in replica_urls:
+            target = sqlite3.connect(make_url(url).database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy a SQLite primary into SQLite replicas.")
+    parser.add_argument("--primary", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--replicas", default=",".join(REPLICA_URLS), help="Comma-separated replica URLs")
+    parser.add_argument("--every", type=float, default=None, help="Repeat the copy every N seconds")
+    args = parser.parse_args()
+
+    urls = [args.primary] + [url for url in args.replicas.split(",") if url]
+    if len(urls) < 2 or any(make_url(url).get_backend_name() != "sqlite" for url in urls):
+        parser.error("the primary and the replicas must all be SQLite URLs")
+    while True:
+        copy_sqlite(urls[0], urls[1:])
+        if args.every is None:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
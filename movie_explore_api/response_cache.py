@@ -0,0 +1,280 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+import orjson
+from etags import etag_matches
+
+CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# A single response larger than this is served but never stored.
+CACHE_MAX_ENTRY_BYTES = CACHE_MAX_BYTES // 16
+
+# Path prefix -> entity kind of the objects at the top level of the response.
+CACHED_ROUTES = {
+    "/api/v1/movies": "movie",
+    "/api/v1/actors": "actor",
+    "/api/v1/directors": "director",
+    "/api/v1/genres": "genre",
+    "/api/v1/reviews": "review",
+    "/api/v1/search": "movie",
+}
+
+# Response keys that embed other entities.
+NESTED_KINDS = {
+    "director": "director",
+    "genres": "genre",
+    "actors": "actor",
+    "reviews": "review",
+    "movies": "movie",
+}
+
+# Query parameters that filter on another entity; the response depends on
+# every entity of that kind (a rename can change which rows match).
+FILTER_KINDS = {
+    "genre": "genre",
+    "actor": "actor",
+    "director": "director",
+    "movie": "movie",
+}
+
+# Facet counts (``?facets=``) are labelled with genre and director names.
+FACET_KINDS = ("genre", "director")
+
+# Leaderboards (leaderboards.py) rank movies by their reviews, so any review
+# write can reorder them.
+RANKED_BY_REVIEWS = {("movie", "/top"), ("movie", "/trending")}
+
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def entity_tags(kind: str, *ids) -> list:
+    """Tags to invalidate after a write to ``kind``: its lists and the given rows."""
+    return [f"{kind}:*"] + [f"{kind}:{id}" for id in ids if id is not None]
+
+
+def response_tags(kind: str, path_tail: str, params: list, body) -> set:
+    tags = set()
+    parts = path_tail.strip("/").split("/")
+    if not (len(parts) == 1 and parts[0].isdigit()):
+        tags.add(f"{kind}:*")
+    if len(parts) > 1 and parts[0].isdigit():
+        # A sub-resource (/movies/7/similar) changes with its parent.
+        tags.add(f"{kind}:{parts[0]}")
+    if (kind, path_tail.rstrip("/")) in RANKED_BY_REVIEWS:
+        tags.add("review:*")
+    for name, _ in params:
+        if name in FILTER_KINDS:
+            tags.add(f"{FILTER_KINDS[name]}:*")
+        elif name == "facets":
+            tags.update(f"{facet_kind}:*" for facet_kind in FACET_KINDS)
+    _collect_tags(body, kind, tags)
+    return tags
+
+
+def _collect_tags(value, kind, tags):
+    if isinstance(value, list):
+        for item in value:
+            _collect_tags(item, kind, tags)
+    elif isinstance(value, dict):
+        if "id" in value:
+            tags.add(f"{kind}:{value['id']}")
+        for key, item in value.items():
+            if isinstance(item, (list, dict)):
+                _collect_tags(item, NESTED_KINDS.get(key, kind), tags)
+
+
+class _Entry:
+    __slots__ = ("status", "headers", "body", "tags", "expires_at", "size", "route")
+
+    def __init__(self, status, headers, body, tags, expires_at, route=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.tags = tags
+        self.expires_at = expires_at
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers) + ENTRY_OVERHEAD_BYTES
+        # The route that rendered the response, so hits are reported under it.
+        self.route = route
+
+
+class ResponseCache:
+    """LRU + TTL cache of GET responses with tag-based invalidation.
+
+    Every entry is tagged with the entities it contains (``actor:7``) and,
+    for lists, the kinds whose changes can alter membership (``actor:*``).
+    Writes invalidate their tags, so only responses that include the
+    changed row, or could start including it, are evicted.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._tags = {}
+            self.bytes = 0
+            self.epoch = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, status: int, headers: list, body: bytes, tags: set, epoch: int, route=None):
+        entry = _Entry(status, headers, body, tags, time.monotonic() + self.ttl, route)
+        if entry.size > min(CACHE_MAX_ENTRY_BYTES, self.max_bytes):
+            return
+        with self._lock:
+            # A write committed while this response was rendered; it may be stale.
+            if epoch != self.epoch:
+                return
+            self._drop(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            self.epoch += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+response_cache = ResponseCache()
+
+
+def cache_key(path: str, query_string: bytes) -> tuple:
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{path}?{urlencode(params)}", params
+
+
+def cached_kind(path: str):
+    for prefix, kind in CACHED_ROUTES.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return kind, path[len(prefix):]
+    return None, None
+
+
+def _header(headers, name: bytes):
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache: ResponseCache = response_cache, enabled: bool = CACHE_ENABLED):
+        self.app = app
+        self.cache = cache
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        kind, path_tail = cached_kind(scope["path"])
+        if kind is None:
+            return await self.app(scope, receive, send)
+
+        key, params = cache_key(scope["path"], scope.get("query_string", b""))
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.route is not None:
+                scope["route"] = entry.route
+            if_none_match = _header(scope["headers"], b"if-none-match")
+            etag = _header(entry.headers, b"etag")
+            if etag_matches(if_none_match, etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag.encode("latin-1")), (b"x-cache", b"HIT")],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": entry.headers + [(b"x-cache", b"HIT")],
+            })
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        epoch = self.cache.epoch
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-cache", b"MISS")])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                # Routes set request.state.response_cache_skip for responses that may be stale.
+                if (not message.get("more_body", False) and start.get("status") == 200
+                        and not scope.get("state", {}).get("response_cache_skip")):
+                    self._store(key, kind, path_tail, params, start, b"".join(chunks), epoch, scope.get("route"))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    def _store(self, key, kind, path_tail, params, start, body, epoch, route):
+        headers = list(start.get("headers", []))
+        if not any(k.lower() == b"content-type" and v.startswith(b"application/json") for k, v in headers):
+            return
+        try:
+            payload = orjson.loads(body)
+        except ValueError:
+            return
+        tags = response_tags(kind, path_tail, params, payload)
+        self.cache.put(key, start["status"], headers, body, tags, epoch, route)
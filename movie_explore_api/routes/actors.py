@@ -1,42 +1,114 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
-from database_models import Actor, Movie, Genre
-from models import ActorBase, ActorResponse, ActorDetailResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from batch import fetch_batch, parse_ids, unique_ids
+from database import get_db, get_read_db
+from database_models import Actor
+import core_reads
+from etags import etag_matches, graph_etag, not_modified, record_etag, stored_etag
+from fieldsets import parse_fieldset
+from filters import ACTOR_FILTERS, compile_filters
+from loading import loader_options
+from autocomplete import catalog_prefixes
+from response_cache import entity_tags, response_cache
+import similarity
+from serialization import render
+from name_index import actor_names, rank_by
+from models import ActorBase, ActorResponse, ActorDetailResponse, ActorBatchResponse, BatchRequest
 
 router = APIRouter(prefix="/api/v1/actors", tags=["Actors"])
 
 
 @router.get('/', response_model=List[ActorDetailResponse])
 def getAllActors(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     movie: str | None = None,
     genre: str | None = None,
-    name: str | None = None
+    name: str | None = None,
+    fields: str | None = None,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None)
 ):
-    query = db.query(Actor).options(joinedload(Actor.movies))
+    fieldset = parse_fieldset(Actor, fields, include)
+    relations = fieldset.etag_relations if fieldset else None
+    filters = compile_filters(ACTOR_FILTERS, movie=movie, genre=genre)
     if name:
-        query = query.filter(
-            (Actor.first_name.ilike(f"%{name}%")) |
-            (Actor.last_name.ilike(f"%{name}%"))
-        )
-    if movie:
-        query = query.join(Actor.movies).filter(Movie.title.ilike(f"%{movie}%"))
-    if genre:
-        query = query.join(Actor.movies).join(Movie.genres).filter(Genre.type == genre)
-    actors = query.all()
-    return actors
+        ranked = actor_names.filtered_search(db, name, filters)
+        filters.append(Actor.id.in_([id for id, _ in ranked]))
+
+    if if_none_match:
+        page = db.query(Actor.id).filter(*filters).order_by(Actor.id).all()
+        if name:
+            page = rank_by(page, ranked)
+        etag = stored_etag(db, Actor, [row.id for row in page], weak=True, relations=relations)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if core_reads.CORE_LIST_READS and not fieldset:
+        rows = core_reads.root_query(db, Actor).filter(*filters).order_by(Actor.id).all()
+        if name:
+            rows = rank_by(rows, ranked)
+        actors = core_reads.load_records(db, Actor, rows)
+        return render(ActorDetailResponse, actors, {"ETag": record_etag(Actor, actors, weak=True)})
+
+    options = fieldset.options("actor_list") if fieldset else loader_options("actor_list", Actor)
+    actors = db.query(Actor).options(*options).filter(*filters).order_by(Actor.id).all()
+    if name:
+        actors = rank_by(actors, ranked)
+    etag = graph_etag(Actor, actors, weak=True, relations=relations)
+    if fieldset:
+        return fieldset.render(actors, {"ETag": etag})
+    return render(ActorDetailResponse, actors, {"ETag": etag})
+
+
+@router.get('/batch', response_model=ActorBatchResponse)
+def getActorsBatch(
+    ids: str,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
+):
+    ids = parse_ids(ids)
+    if if_none_match:
+        etag = stored_etag(db, Actor, ids, weak=True)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    batch = fetch_batch(db, Actor, "actor_batch", ids)
+    return render(ActorBatchResponse, batch, {"ETag": graph_etag(Actor, batch["items"], weak=True)})
+
+
+@router.post('/batch', response_model=ActorBatchResponse)
+def postActorsBatch(request: BatchRequest, db: Session = Depends(get_read_db)):
+    return render(ActorBatchResponse, fetch_batch(db, Actor, "actor_batch", unique_ids(request.ids)))
 
 
 @router.get('/{id}', response_model=ActorDetailResponse)
-def getActorById(id: int, db: Session = Depends(get_db)):
-    actor = db.query(Actor).options(joinedload(Actor.movies)).filter(Actor.id == id).first()
+def getActorById(
+    id: int,
+    response: Response,
+    fields: str | None = None,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
+):
+    fieldset = parse_fieldset(Actor, fields, include)
+    relations = fieldset.etag_relations if fieldset else None
+    if if_none_match:
+        etag = stored_etag(db, Actor, [id], relations=relations)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    options = fieldset.options("actor_detail") if fieldset else loader_options("actor_detail", Actor)
+    actor = db.query(Actor).options(*options).filter(Actor.id == id).first()
     if not actor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Actor with id {id} not found"
         )
+    etag = graph_etag(Actor, [actor], relations=relations)
+    if fieldset:
+        return fieldset.render(actor, {"ETag": etag})
+    response.headers["ETag"] = etag
     return actor
 
 
@@ -51,6 +123,9 @@ def createActor(actor: ActorBase, db: Session = Depends(get_db)):
     db.add(new_actor)
     db.commit()
     db.refresh(new_actor)
+    actor_names.add(new_actor.id, new_actor.first_name, new_actor.last_name)
+    catalog_prefixes.put("actor", new_actor.id, f"{new_actor.first_name} {new_actor.last_name}")
+    response_cache.invalidate(*entity_tags("actor", new_actor.id))
     return new_actor
 
 
@@ -70,6 +145,9 @@ def updateActor(id: int, actor: ActorBase, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(existing_actor)
+    actor_names.add(existing_actor.id, existing_actor.first_name, existing_actor.last_name)
+    catalog_prefixes.put("actor", existing_actor.id, f"{existing_actor.first_name} {existing_actor.last_name}")
+    response_cache.invalidate(*entity_tags("actor", id))
     return existing_actor
 
 
@@ -82,6 +160,12 @@ def deleteActor(id: int, db: Session = Depends(get_db)):
             detail=f"Actor with id {id} not found"
         )
     
+    movie_ids = [movie.id for movie in actor.movies]
     db.delete(actor)
+    db.flush()
+    changed = similarity.refresh_movies(db, movie_ids)
     db.commit()
+    actor_names.remove(id)
+    catalog_prefixes.discard("actor", id)
+    response_cache.invalidate(*entity_tags("actor", id), *(f"movie:{movie_id}" for movie_id in changed))
     return None
\ No newline at end of file
@@ -0,0 +1,17 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from autocomplete import TOP_K, catalog_prefixes
+from database import get_read_db
+from models import AutocompleteEntry
+
+router = APIRouter(prefix="/api/v1/autocomplete", tags=["Autocomplete"])
+
+
+@router.get('/', response_model=List[AutocompleteEntry])
+def autocomplete(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=TOP_K, ge=1, le=TOP_K),
+    db: Session = Depends(get_read_db)
+):
+    return catalog_prefixes.complete(db, q, limit)
@@ -1,36 +1,112 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from batch import fetch_batch, parse_ids, unique_ids
+from database import get_db, get_read_db
 from database_models import Director
-from models import DirectorBase, DirectorResponse, DirectorDetailResponse
+import core_reads
+from etags import etag_matches, graph_etag, not_modified, record_etag, stored_etag
+from fieldsets import parse_fieldset
+from filters import DIRECTOR_FILTERS, compile_filters
+from loading import loader_options
+from autocomplete import catalog_prefixes
+from response_cache import entity_tags, response_cache
+import similarity
+from serialization import render
+from name_index import director_names, rank_by
+from models import DirectorBase, DirectorResponse, DirectorDetailResponse, DirectorBatchResponse, BatchRequest
 
 router = APIRouter(prefix="/api/v1/directors", tags=["Directors"])
 
 
 @router.get('/', response_model=List[DirectorDetailResponse])
 def getAllDirectors(
-    db: Session = Depends(get_db),
-    name: str | None = None
+    db: Session = Depends(get_read_db),
+    name: str | None = None,
+    fields: str | None = None,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None)
 ):
-    query = db.query(Director).options(joinedload(Director.movies))
+    fieldset = parse_fieldset(Director, fields, include)
+    relations = fieldset.etag_relations if fieldset else None
+    filters = compile_filters(DIRECTOR_FILTERS)
     if name:
-        query = query.filter(
-            (Director.first_name.ilike(f"%{name}%")) |
-            (Director.last_name.ilike(f"%{name}%"))
-        )
-    directors = query.all()
-    return directors
+        ranked = director_names.filtered_search(db, name, filters)
+        filters.append(Director.id.in_([id for id, _ in ranked]))
+
+    if if_none_match:
+        page = db.query(Director.id).filter(*filters).order_by(Director.id).all()
+        if name:
+            page = rank_by(page, ranked)
+        etag = stored_etag(db, Director, [row.id for row in page], weak=True, relations=relations)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if core_reads.CORE_LIST_READS and not fieldset:
+        rows = core_reads.root_query(db, Director).filter(*filters).order_by(Director.id).all()
+        if name:
+            rows = rank_by(rows, ranked)
+        directors = core_reads.load_records(db, Director, rows)
+        return render(DirectorDetailResponse, directors, {"ETag": record_etag(Director, directors, weak=True)})
+
+    options = fieldset.options("director_list") if fieldset else loader_options("director_list", Director)
+    directors = db.query(Director).options(*options).filter(*filters).order_by(Director.id).all()
+    if name:
+        directors = rank_by(directors, ranked)
+    etag = graph_etag(Director, directors, weak=True, relations=relations)
+    if fieldset:
+        return fieldset.render(directors, {"ETag": etag})
+    return render(DirectorDetailResponse, directors, {"ETag": etag})
+
+
+@router.get('/batch', response_model=DirectorBatchResponse)
+def getDirectorsBatch(
+    ids: str,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
+):
+    ids = parse_ids(ids)
+    if if_none_match:
+        etag = stored_etag(db, Director, ids, weak=True)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    batch = fetch_batch(db, Director, "director_batch", ids)
+    return render(DirectorBatchResponse, batch, {"ETag": graph_etag(Director, batch["items"], weak=True)})
+
+
+@router.post('/batch', response_model=DirectorBatchResponse)
+def postDirectorsBatch(request: BatchRequest, db: Session = Depends(get_read_db)):
+    return render(DirectorBatchResponse, fetch_batch(db, Director, "director_batch", unique_ids(request.ids)))
 
 
 @router.get('/{id}', response_model=DirectorDetailResponse)
-def getDirectorById(id: int, db: Session = Depends(get_db)):
-    director = db.query(Director).options(joinedload(Director.movies)).filter(Director.id == id).first()
+def getDirectorById(
+    id: int,
+    response: Response,
+    fields: str | None = None,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
+):
+    fieldset = parse_fieldset(Director, fields, include)
+    relations = fieldset.etag_relations if fieldset else None
+    if if_none_match:
+        etag = stored_etag(db, Director, [id], relations=relations)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    options = fieldset.options("director_detail") if fieldset else loader_options("director_detail", Director)
+    director = db.query(Director).options(*options).filter(Director.id == id).first()
     if not director:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Director with id {id} not found"
         )
+    etag = graph_etag(Director, [director], relations=relations)
+    if fieldset:
+        return fieldset.render(director, {"ETag": etag})
+    response.headers["ETag"] = etag
     return director
 
 
@@ -45,6 +121,9 @@ def createDirector(director: DirectorBase, db: Session = Depends(get_db)):
     db.add(new_director)
     db.commit()
     db.refresh(new_director)
+    director_names.add(new_director.id, new_director.first_name, new_director.last_name)
+    catalog_prefixes.put("director", new_director.id, f"{new_director.first_name} {new_director.last_name}")
+    response_cache.invalidate(*entity_tags("director", new_director.id))
     return new_director
 
 
@@ -64,6 +143,9 @@ def updateDirector(id: int, director: DirectorBase, db: Session = Depends(get_db
     
     db.commit()
     db.refresh(existing_director)
+    director_names.add(existing_director.id, existing_director.first_name, existing_director.last_name)
+    catalog_prefixes.put("director", existing_director.id, f"{existing_director.first_name} {existing_director.last_name}")
+    response_cache.invalidate(*entity_tags("director", id))
     return existing_director
 
 
@@ -76,6 +158,12 @@ def deleteDirector(id: int, db: Session = Depends(get_db)):
             detail=f"Director with id {id} not found"
         )
     
+    movie_ids = [movie.id for movie in director.movies]
     db.delete(director)
+    db.flush()
+    changed = similarity.refresh_movies(db, movie_ids)
     db.commit()
+    director_names.remove(id)
+    catalog_prefixes.discard("director", id)
+    response_cache.invalidate(*entity_tags("director", id), *(f"movie:{movie_id}" for movie_id in changed))
     return None
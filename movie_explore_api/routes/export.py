@@ -0,0 +1,109 @@
+import csv
+import io
+from datetime import datetime
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import get_read_db
+from database_models import Movie, MovieRatingStats, Review
+
+router = APIRouter(prefix="/api/v1/export", tags=["Export"])
+
+# Rows fetched per round trip and encoded per chunk of the response body.
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+MOVIE_FIELDS = (
+    "id", "title", "description", "release_year", "image_url", "director_id", "rating", "review_count", "average_rating"
+)
+REVIEW_FIELDS = ("id", "movie_id", "reviewer_name", "rating", "comment", "created_at")
+
+
+def movie_rows():
+    return select(
+        Movie.id,
+        Movie.title,
+        Movie.description,
+        Movie.release_year,
+        Movie.image_url,
+        Movie.director_id,
+        Movie.rating,
+        MovieRatingStats.review_count,
+        MovieRatingStats.rating_sum,
+    ).outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id).order_by(Movie.id)
+
+
+def movie_record(row) -> dict:
+    record = row._asdict()
+    rating_sum = record.pop("rating_sum")
+    record["review_count"] = record["review_count"] or 0
+    record["average_rating"] = round(rating_sum / record["review_count"], 2) if record["review_count"] else None
+    return record
+
+
+def review_rows():
+    return select(
+        Review.id, Review.movie_id, Review.reviewer_name, Review.rating, Review.comment, Review.created_at
+    ).order_by(Review.id)
+
+
+def review_record(row) -> dict:
+    return row._asdict()
+
+
+def _encode_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def stream_rows(db: Session, statement, to_record, fields: tuple, format: str):
+    """Yield the encoded result of ``statement`` one batch of rows at a time.
+
+    ``yield_per`` fetches through a server-side cursor (``SSCursor`` on
+    MySQL), so memory holds one batch no matter how large the table is.
+    """
+    try:
+        if format == "csv":
+            yield (",".join(fields) + "\r\n").encode()
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            records = [{key: _encode_value(value) for key, value in to_record(row).items()} for row in rows]
+            if format == "ndjson":
+                yield b"".join(orjson.dumps(record) + b"\n" for record in records)
+                continue
+            buffer = io.StringIO()
+            csv.DictWriter(buffer, fieldnames=fields).writerows(records)
+            yield buffer.getvalue().encode()
+    finally:
+        db.close()
+
+
+def export_response(db: Session, name: str, statement, to_record, fields: tuple, format: str) -> StreamingResponse:
+    if format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format '{format}'. Allowed: {', '.join(MEDIA_TYPES)}"
+        )
+    return StreamingResponse(
+        stream_rows(db, statement, to_record, fields, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+
+# These endpoints are coroutines only so that async mode leaves them alone:
+# they return at once, and Starlette iterates the sync generator (and runs
+# its queries) in the threadpool while the body streams.
+@router.get('/movies')
+async def exportMovies(format: str = "ndjson", db: Session = Depends(get_read_db)):
+    return export_response(db, "movies", movie_rows(), movie_record, MOVIE_FIELDS, format)
+
+
+@router.get('/reviews')
+async def exportReviews(format: str = "ndjson", db: Session = Depends(get_read_db)):
+    return export_response(db, "reviews", review_rows(), review_record, REVIEW_FIELDS, format)
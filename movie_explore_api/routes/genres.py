@@ -1,21 +1,24 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_read_db
 from database_models import Genre
 from models import GenreBase, GenreResponse
+from autocomplete import catalog_prefixes
+from response_cache import entity_tags, response_cache
+import similarity
 
 router = APIRouter(prefix="/api/v1/genres", tags=["Genres"])
 
 
 @router.get('/', response_model=List[GenreResponse])
-def getAllGenres(db: Session = Depends(get_db)):
+def getAllGenres(db: Session = Depends(get_read_db)):
     genres = db.query(Genre).all()
     return genres
 
 
 @router.get('/{id}', response_model=GenreResponse)
-def getGenreById(id: int, db: Session = Depends(get_db)):
+def getGenreById(id: int, db: Session = Depends(get_read_db)):
     genre = db.query(Genre).filter(Genre.id == id).first()
     if not genre:
         raise HTTPException(
@@ -38,6 +41,8 @@ def createGenre(genre: GenreBase, db: Session = Depends(get_db)):
     db.add(new_genre)
     db.commit()
     db.refresh(new_genre)
+    catalog_prefixes.put("genre", new_genre.id, new_genre.type)
+    response_cache.invalidate(*entity_tags("genre", new_genre.id))
     return new_genre
 
 
@@ -54,6 +59,8 @@ def updateGenre(id: int, genre: GenreBase, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(existing_genre)
+    catalog_prefixes.put("genre", existing_genre.id, existing_genre.type)
+    response_cache.invalidate(*entity_tags("genre", id))
     return existing_genre
 
 
@@ -66,6 +73,11 @@ def deleteGenre(id: int, db: Session = Depends(get_db)):
             detail=f"Genre with id {id} not found"
         )
     
+    movie_ids = [movie.id for movie in genre.movies]
     db.delete(genre)
+    db.flush()
+    changed = similarity.refresh_movies(db, movie_ids)
     db.commit()
+    catalog_prefixes.discard("genre", id)
+    response_cache.invalidate(*entity_tags("genre", id), *(f"movie:{movie_id}" for movie_id in changed))
     return None
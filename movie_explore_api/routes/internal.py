@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from database import engine, async_engine, replicas
+from pool_monitor import pool_status
+from query_monitor import query_stats
+from response_cache import response_cache
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@router.get('/cache')
+def getCacheStats():
+    return response_cache.stats()
+
+
+@router.get('/db/pool')
+def getPoolStats():
+    pools = {"sync": pool_status(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine.sync_engine)
+    for position, replica in enumerate(replicas.replicas):
+        pools[f"replica_{position}"] = pool_status(replica.engine)
+    return pools
+
+
+@router.get('/db/replicas')
+def getReplicaStatus():
+    return replicas.status()
+
+
+@router.get('/db/queries')
+def getQueryStats():
+    return query_stats.snapshot()
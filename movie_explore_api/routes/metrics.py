@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from metrics import CONTENT_TYPE, metrics
+
+router = APIRouter(tags=["Internal"])
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+def getMetrics():
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
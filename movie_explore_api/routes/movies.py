@@ -1,9 +1,29 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
-from database_models import Movie, movie_genre, movie_actor, Genre, Actor, Director
-from models import MovieBase, MovieResponse, MovieDetailResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from batch import fetch_batch, parse_ids, unique_ids
+from bulk_import import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, MovieImporter, ndjson_chunks
+import core_reads
+from database import get_db, get_read_db
+from database_models import Movie, MovieRatingStats, movie_genre, movie_actor, Genre, Actor, Director
+from etags import etag_matches, extend_etag, graph_etag, not_modified, record_etag, stored_etag
+from facets import facet_counts, faceted_model, parse_facets
+from fieldsets import parse_fieldset
+from filters import MOVIE_FILTERS, compile_filters
+from leaderboards import top_movies, trending_movies
+from loading import loader_options
+from models import (
+    MovieBase, MovieResponse, MovieDetailResponse, MovieBatchResponse, BatchRequest, ImportReport, SimilarMovie,
+    LeaderboardEntry
+)
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MOVIE_SORT_KEYS, paginate
+import similarity
+import text_search
+from autocomplete import catalog_prefixes, movie_weight, refresh_movie_counts
+from name_index import actor_names, director_names
+from response_cache import entity_tags, response_cache
+from serialization import render
 
 router = APIRouter(prefix="/api/v1/movies", tags=["Movies"])
 
@@ -15,57 +35,149 @@ def getAllMovies(
     director: str | None = None,
     release_year: int | None = None,
     title: str | None = None,
-    db: Session = Depends(get_db)
+    sort: str = "id",
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+    fields: str | None = None,
+    include: str | None = None,
+    facets: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Movie)
-
-    if title:
-        query = query.filter(Movie.title.ilike(f"%{title}%"))
-    if genre:
-        query = query.join(Movie.genres).filter(Genre.type == genre)
-    if actor:
-        query = query.join(Movie.actors).filter(
-            (Actor.first_name.ilike(f"%{actor}%")) |
-            (Actor.last_name.ilike(f"%{actor}%"))
+    fieldset = parse_fieldset(Movie, fields, include)
+    relations = fieldset.etag_relations if fieldset else None
+    params = dict(title=title, genre=genre, actor=actor, director=director, release_year=release_year)
+    filters = compile_filters(MOVIE_FILTERS, **params)
+    headers = {}
+    # Facets count movies beyond the page, so the ETag covers them as well.
+    counts = facet_counts(db, parse_facets(facets), **params) if facets is not None else None
+
+    if if_none_match:
+        # Page through ids and sort values only; answer 304 without loading the graph.
+        page, next_cursor = paginate(
+            db.query(*MOVIE_SORT_KEYS.values()).filter(*filters), sort, limit, after, MOVIE_SORT_KEYS, Movie.id
         )
-    if director:
-        query = query.join(Movie.director).filter(
-            (Director.first_name.ilike(f"%{director}%")) | 
-            (Director.last_name.ilike(f"%{director}%"))
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        etag = stored_etag(db, Movie, [row.id for row in page], weak=True, relations=relations)
+        if etag is not None and counts is not None:
+            etag = extend_etag(etag, counts)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, headers)
+
+    if core_reads.CORE_LIST_READS and not fieldset:
+        rows, next_cursor = paginate(
+            core_reads.root_query(db, Movie).filter(*filters), sort, limit, after, MOVIE_SORT_KEYS, Movie.id
         )
-    if release_year:
-        query = query.filter(Movie.release_year == release_year)
-
-    movie_ids = [m.id for m in query.all()]
-    if movie_ids:
-        movies = db.query(Movie).options(
-            joinedload(Movie.director),
-            joinedload(Movie.genres),
-            joinedload(Movie.actors),
-            joinedload(Movie.reviews)
-        ).filter(Movie.id.in_(movie_ids)).all()
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        movies = core_reads.load_records(db, Movie, rows)
+        etag = record_etag(Movie, movies, weak=True)
     else:
-        movies = []
-    
-    return movies
+        if fieldset:
+            options = fieldset.options("movie_list", MOVIE_SORT_KEYS.get(sort.lstrip("-")))
+        else:
+            options = loader_options("movie_list", Movie)
+        query = db.query(Movie).options(*options).filter(*filters)
+        movies, next_cursor = paginate(query, sort, limit, after, MOVIE_SORT_KEYS, Movie.id)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        etag = graph_etag(Movie, movies, weak=True, relations=relations)
+
+    model = fieldset.response_model if fieldset else MovieDetailResponse
+    if counts is None:
+        headers["ETag"] = etag
+        return render(model, movies, headers)
+    headers["ETag"] = extend_etag(etag, counts)
+    return render(faceted_model(model), {"items": movies, "facets": counts}, headers)
+
+
+@router.get('/batch', response_model=MovieBatchResponse)
+def getMoviesBatch(
+    ids: str,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
+):
+    ids = parse_ids(ids)
+    if if_none_match:
+        etag = stored_etag(db, Movie, ids, weak=True)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    batch = fetch_batch(db, Movie, "movie_batch", ids)
+    return render(MovieBatchResponse, batch, {"ETag": graph_etag(Movie, batch["items"], weak=True)})
+
+
+@router.post('/batch', response_model=MovieBatchResponse)
+def postMoviesBatch(request: BatchRequest, db: Session = Depends(get_read_db)):
+    return render(MovieBatchResponse, fetch_batch(db, Movie, "movie_batch", unique_ids(request.ids)))
+
+
+@router.get('/top', response_model=List[LeaderboardEntry])
+def getTopMovies(
+    genre: str | None = None,
+    decade: int | None = Query(default=None, multiple_of=10),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    return top_movies(db, limit, genre, decade)
+
+
+@router.get('/trending', response_model=List[LeaderboardEntry])
+def getTrendingMovies(
+    genre: str | None = None,
+    decade: int | None = Query(default=None, multiple_of=10),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    return trending_movies(db, limit, genre, decade)
 
 
 @router.get('/{id}', response_model=MovieDetailResponse, status_code=status.HTTP_200_OK)
-def getMovieById(id: int, db: Session = Depends(get_db)):
-    movie = db.query(Movie).options(
-        joinedload(Movie.director),
-        joinedload(Movie.genres),
-        joinedload(Movie.actors),
-        joinedload(Movie.reviews)
-    ).filter(Movie.id == id).first()
+def getMovieById(
+    id: int,
+    response: Response,
+    fields: str | None = None,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db)
+):
+    fieldset = parse_fieldset(Movie, fields, include)
+    relations = fieldset.etag_relations if fieldset else None
+    if if_none_match:
+        etag = stored_etag(db, Movie, [id], relations=relations)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    options = fieldset.options("movie_detail") if fieldset else loader_options("movie_detail", Movie)
+    movie = db.query(Movie).options(*options).filter(Movie.id == id).first()
     if not movie:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Movie with id {id} not found"
         )
+    etag = graph_etag(Movie, [movie], relations=relations)
+    if fieldset:
+        return fieldset.render(movie, {"ETag": etag})
+    response.headers["ETag"] = etag
     return movie
 
 
+@router.get('/{id}/similar', response_model=List[SimilarMovie])
+def getSimilarMovies(
+    id: int,
+    limit: int = Query(default=10, ge=1, le=similarity.SIMILAR_MOVIES),
+    db: Session = Depends(get_read_db)
+):
+    similar = similarity.similar_movies(db, id, limit)
+    if not similar and db.get(Movie, id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Movie with id {id} not found"
+        )
+    return similar
+
+
 @router.post('/', response_model=MovieResponse, status_code=status.HTTP_201_CREATED)
 def createMovie(movie: MovieBase, db: Session = Depends(get_db)):
     director = db.query(Director).filter(Director.id == movie.director_id).first()
@@ -88,14 +200,45 @@ def createMovie(movie: MovieBase, db: Session = Depends(get_db)):
         release_year=movie.release_year,
         image_url=movie.image_url,
         director_id=movie.director_id,
-        rating=movie.rating
+        rating=movie.rating,
+        rating_stats=MovieRatingStats()
     )
     db.add(new_movie)
+    db.flush()
+    text_search.index_movie(db, new_movie)
+    similarity.refresh_movies(db, [new_movie.id])
     db.commit()
     db.refresh(new_movie)
+    catalog_prefixes.put("movie", new_movie.id, new_movie.title, movie_weight(new_movie.rating))
+    refresh_movie_counts(db, "director", [new_movie.director_id])
+    response_cache.invalidate(*entity_tags("movie", new_movie.id), f"director:{new_movie.director_id}")
     return new_movie
 
 
+@router.post('/import', response_model=ImportReport)
+async def importMovies(
+    request: Request,
+    chunk_size: int = Query(default=DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Import an NDJSON request body (see bulk_import.py) one committed chunk at a time."""
+    importer = MovieImporter(db)
+    async for chunk in ndjson_chunks(request.stream(), chunk_size):
+        await run_in_threadpool(importer.import_lines, chunk)
+    report = importer.report()
+    if importer.imported:
+        await run_in_threadpool(rebuild_indexes, db)
+    return report
+
+
+def rebuild_indexes(db: Session):
+    # Rebuilt up front rather than on first use, as async mode requires, and
+    # swapped in so that lookups never wait for the database reads.
+    for index in (actor_names, director_names, catalog_prefixes):
+        index.reload(db)
+    response_cache.clear()
+
+
 @router.put('/{id}', response_model=MovieResponse)
 def updateMovie(id: int, movie: MovieBase, db: Session = Depends(get_db)):
     existing_movie = db.query(Movie).filter(Movie.id == id).first()
@@ -111,15 +254,26 @@ def updateMovie(id: int, movie: MovieBase, db: Session = Depends(get_db)):
             detail=f"Director with id {movie.director_id} not found"
         )
     
+    previous_director_id = existing_movie.director_id
     existing_movie.title = movie.title
     existing_movie.description = movie.description
     existing_movie.release_year = movie.release_year
     existing_movie.image_url = movie.image_url
     existing_movie.director_id = movie.director_id
     existing_movie.rating = movie.rating
+    text_search.index_movie(db, existing_movie)
+    if previous_director_id != existing_movie.director_id:
+        db.flush()
+        similarity.refresh_movies(db, [id])
     
     db.commit()
     db.refresh(existing_movie)
+    catalog_prefixes.put("movie", existing_movie.id, existing_movie.title, movie_weight(existing_movie.rating))
+    if previous_director_id != existing_movie.director_id:
+        refresh_movie_counts(db, "director", [previous_director_id, existing_movie.director_id])
+    response_cache.invalidate(
+        *entity_tags("movie", id), f"director:{previous_director_id}", f"director:{existing_movie.director_id}"
+    )
     return existing_movie
 
 
@@ -132,8 +286,20 @@ def deleteMovie(id: int, db: Session = Depends(get_db)):
             detail=f"Movie with id {id} not found"
         )
     
+    text_search.unindex_movie(db, movie.id)
+    linked = {
+        "director": [movie.director_id],
+        "actor": [actor.id for actor in movie.actors],
+        "genre": [genre.id for genre in movie.genres],
+    }
     db.delete(movie)
+    db.flush()
+    similarity.refresh_movies(db, [id])
     db.commit()
+    catalog_prefixes.discard("movie", id)
+    for kind, ids in linked.items():
+        refresh_movie_counts(db, kind, ids)
+    response_cache.invalidate(*entity_tags("movie", id), f"director:{linked['director'][0]}")
     return None
 def deleteMovie(id: int, db: Session = Depends(get_db)):
     movie = db.query(Movie).filter(Movie.id == id).first()
@@ -1,10 +1,13 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import get_db
-from database_models import Review, Movie
-from models import ReviewBase, ReviewResponse
+from database import get_db, get_read_db
+import core_reads
+from database_models import Review, Movie, MovieRatingStats
+from models import ReviewBase, ReviewResponse, MovieRatingResponse
+from rating_stats import add_rating, change_rating, remove_rating
+from response_cache import entity_tags, response_cache
+from serialization import render
 
 router = APIRouter(prefix="/api/v1/reviews", tags=["Reviews"])
 
@@ -13,19 +16,20 @@ router = APIRouter(prefix="/api/v1/reviews", tags=["Reviews"])
 def getAllReviews(
     movie_id: int | None = None,
     min_rating: float | None = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Review)
+    query = core_reads.root_query(db, Review) if core_reads.CORE_LIST_READS else db.query(Review)
     if movie_id:
         query = query.filter(Review.movie_id == movie_id)
     if min_rating:
         query = query.filter(Review.rating >= min_rating)
-    reviews = query.all()
-    return reviews
+    if core_reads.CORE_LIST_READS:
+        return render(ReviewResponse, core_reads.load_records(db, Review, query.all()))
+    return render(ReviewResponse, query.all())
 
 
 @router.get('/{id}', response_model=ReviewResponse)
-def getReviewById(id: int, db: Session = Depends(get_db)):
+def getReviewById(id: int, db: Session = Depends(get_read_db)):
     review = db.query(Review).filter(Review.id == id).first()
     if not review:
         raise HTTPException(
@@ -52,8 +56,11 @@ def createReview(review: ReviewBase, db: Session = Depends(get_db)):
         comment=review.comment
     )
     db.add(new_review)
+    db.flush()
+    add_rating(db, new_review.movie_id, new_review.rating, new_review.created_at)
     db.commit()
     db.refresh(new_review)
+    response_cache.invalidate(*entity_tags("review", new_review.id), f"movie:{new_review.movie_id}")
     return new_review
 
 
@@ -66,12 +73,14 @@ def updateReview(id: int, review: ReviewBase, db: Session = Depends(get_db)):
             detail=f"Review with id {id} not found"
         )
     
+    change_rating(db, existing_review.movie_id, existing_review.rating, review.rating, existing_review.created_at)
     existing_review.reviewer_name = review.reviewer_name
     existing_review.rating = review.rating
     existing_review.comment = review.comment
     
     db.commit()
     db.refresh(existing_review)
+    response_cache.invalidate(*entity_tags("review", id), f"movie:{existing_review.movie_id}")
     return existing_review
 
 
@@ -84,26 +93,30 @@ def deleteReview(id: int, db: Session = Depends(get_db)):
             detail=f"Review with id {id} not found"
         )
     
+    movie_id = review.movie_id
+    remove_rating(db, movie_id, review.rating, review.created_at)
     db.delete(review)
     db.commit()
+    response_cache.invalidate(*entity_tags("review", id), f"movie:{movie_id}")
     return None
 
 
-@router.get('/movie/{movie_id}/average')
-def getMovieAverageRating(movie_id: int, db: Session = Depends(get_db)):
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
-    if not movie:
+@router.get('/movie/{movie_id}/average', response_model=MovieRatingResponse)
+def getMovieAverageRating(movie_id: int, db: Session = Depends(get_read_db)):
+    row = db.query(Movie.title, MovieRatingStats).outerjoin(
+        MovieRatingStats, MovieRatingStats.movie_id == Movie.id
+    ).filter(Movie.id == movie_id).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Movie with id {movie_id} not found"
         )
     
-    avg_rating = db.query(func.avg(Review.rating)).filter(Review.movie_id == movie_id).scalar()
-    review_count = db.query(func.count(Review.id)).filter(Review.movie_id == movie_id).scalar()
-    
+    title, stats = row
     return {
         "movie_id": movie_id,
-        "movie_title": movie.title,
-        "average_rating": round(avg_rating, 2) if avg_rating else None,
-        "total_reviews": review_count
+        "movie_title": title,
+        "average_rating": stats.average_rating if stats else None,
+        "total_reviews": stats.review_count if stats else 0,
+        "histogram": stats.histogram if stats else {bucket: 0 for bucket in range(1, 11)}
     }
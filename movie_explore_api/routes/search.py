@@ -0,0 +1,17 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_read_db
+from models import SearchResult
+from text_search import search_movies
+
+router = APIRouter(prefix="/api/v1/search", tags=["Search"])
+
+
+@router.get('/', response_model=List[SearchResult])
+def searchMovies(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    return search_movies(db, q, limit)
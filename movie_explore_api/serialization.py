@@ -0,0 +1,170 @@
+import typing
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List
+import orjson
+from fastapi import Response
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Non-string dict keys for histograms; "Z" for UTC like pydantic.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+# Types orjson writes exactly as pydantic's JSON mode does.
+COPIED_TYPES = (int, str, bool, datetime, date)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class UnsupportedModel(Exception):
+    pass
+
+
+class Mismatch(Exception):
+    """A value pydantic would coerce or reject, so the validating path must handle it."""
+
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def response_adapter(model, many: bool = False) -> TypeAdapter:
+    return TypeAdapter(List[model] if many else model)
+
+
+@lru_cache(maxsize=None)
+def encoder(model):
+    """A function turning an ORM object (or dict) into plain data shaped like ``model``.
+
+    It reads loaded columns straight from the instance ``__dict__`` and only
+    coerces what pydantic would change on output (ints in float fields), so
+    no model instances are built. Any other value that does not have its
+    field's declared type, such as a None in a required field, raises
+    ``Mismatch``. Returns None for models it cannot mirror exactly:
+    validators, serializers, computed fields, aliases, or field types outside
+    the ones listed in ``_field_encoder``.
+    """
+    decorators = model.__pydantic_decorators__
+    if (decorators.validators or decorators.field_validators or decorators.model_validators
+            or decorators.field_serializers or decorators.model_serializers or decorators.computed_fields):
+        return None
+    hints = typing.get_type_hints(model)
+    try:
+        plan = []
+        for name, field in model.model_fields.items():
+            if field.alias or field.serialization_alias:
+                raise UnsupportedModel(name)
+            annotation = hints[name]
+            default = field.get_default(call_default_factory=True)
+            plan.append((name, default, _passed(annotation), _field_encoder(annotation)))
+    except UnsupportedModel:
+        return None
+
+    def encode(obj):
+        if obj is None:
+            raise Mismatch(model)
+        state = obj if type(obj) is dict else obj.__dict__
+        data = {}
+        for name, default, passed, convert in plan:
+            value = state[name] if name in state else getattr(obj, name, _MISSING)
+            if type(value) in passed:
+                data[name] = value
+            else:
+                # Like pydantic, defaults are written without validation.
+                data[name] = default if value is _MISSING else convert(value)
+        return data
+
+    return encode
+
+
+def _passed(annotation) -> tuple:
+    """The value types written as they are for ``annotation``, checked inline by the encoder."""
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin is typing.Union and type(None) in args:
+        inner = [arg for arg in args if arg is not type(None)]
+        return (type(None), *_passed(inner[0])) if len(inner) == 1 else ()
+    return (annotation,) if annotation is float or annotation in COPIED_TYPES else ()
+
+
+def _exact(expected):
+    def convert(value):
+        if type(value) is not expected:
+            raise Mismatch(value)
+        return value
+    return convert
+
+
+def _float(value):
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    raise Mismatch(value)
+
+
+def _field_encoder(annotation):
+    """A function returning a value as pydantic would write it, or raising ``Mismatch``."""
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin is typing.Union and type(None) in args:
+        inner = [arg for arg in args if arg is not type(None)]
+        if len(inner) == 1:
+            convert = _field_encoder(inner[0])
+            return lambda value: None if value is None else convert(value)
+    elif origin is list and len(args) == 1:
+        item = _field_encoder(args[0])
+
+        def convert_list(values):
+            if not isinstance(values, list):
+                raise Mismatch(values)
+            return [item(value) for value in values]
+        return convert_list
+    elif origin is dict and len(args) == 2 and args[0] in (int, str) and args[1] in COPIED_TYPES:
+        key_type, value_type = args
+
+        def convert_dict(values):
+            if not isinstance(values, dict) or any(
+                type(key) is not key_type or type(value) is not value_type for key, value in values.items()
+            ):
+                raise Mismatch(values)
+            return values
+        return convert_dict
+    elif annotation is float:
+        return _float
+    elif annotation in COPIED_TYPES:
+        return _exact(annotation)
+    elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        nested = encoder(annotation)
+        if nested is not None:
+            return nested
+    raise UnsupportedModel(annotation)
+
+
+def render(model, content, headers: dict | None = None, status_code: int = 200) -> Response:
+    """Serialize ``content`` (ORM objects or a list of them) as ``model``.
+
+    Bypasses FastAPI's response validation, which builds a pydantic object
+    for every row and embedded row before encoding. Models the encoder
+    cannot mirror, and content it finds a mismatched value in, go through a
+    cached ``TypeAdapter`` instead, which validates as FastAPI would.
+    """
+    many = isinstance(content, list)
+    encode = encoder(model)
+    if encode is not None:
+        try:
+            data = [encode(item) for item in content] if many else encode(content)
+        except Mismatch:
+            pass
+        else:
+            return ORJSONResponse(data, status_code=status_code, headers=headers)
+    adapter = response_adapter(model, many)
+    try:
+        validated = adapter.validate_python(content, from_attributes=True)
+    except ValidationError as exc:
+        # What FastAPI raises when a route's return value fails its response model.
+        raise ResponseValidationError(exc.errors(include_url=False), body=content) from exc
+    body = adapter.dump_json(validated)
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,275 @@
+"""Similar movies: a precomputed top-k neighbour table.
+
+Each movie is a sparse vector over its genres, actors and director, weighted
+by ``FEATURE_WEIGHTS`` and L2-normalised, and two movies are as similar as the
+cosine of their vectors. ``rebuild`` scores the whole catalog with one sparse
+matrix product per block of rows, spread over a process pool, and rewrites
+``movie_similarity``; ``refresh_movies`` updates the affected lists in the
+caller's transaction when a write changes some movies' links. Run the full
+rebuild from ``movie_explore_api/``::
+
+    python similarity.py --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert, literal, select, union, union_all
+from sqlalchemy.orm import Session
+from database_models import Movie, MovieSimilarity, movie_actor, movie_genre
+
+# Neighbours stored per movie, and the most /movies/{id}/similar returns.
+SIMILAR_MOVIES = int(os.getenv("SIMILAR_MOVIES", "20"))
+SIMILARITY_WORKERS = int(os.getenv("SIMILARITY_WORKERS", str(os.cpu_count() or 1)))
+# A shared actor or director says more about a movie than a shared genre.
+FEATURE_WEIGHTS = {"genre": 1.0, "actor": 2.0, "director": 2.0}
+# Scores are rounded before ranking so that ties, common between movies with
+# the same genres, break by id alike in rebuilds and incremental refreshes.
+SCORE_DECIMALS = 6
+# Dense score cells per block of rows (each row is scored against every movie).
+BLOCK_CELLS = 2_000_000
+IN_CHUNK_SIZE = 500
+INSERT_BATCH_SIZE = 10_000
+
+_WEIGHTS = np.array(list(FEATURE_WEIGHTS.values()))
+
+
+def _chunks(ids) -> list:
+    ids = sorted(ids)
+    return [ids[start:start + IN_CHUNK_SIZE] for start in range(0, len(ids), IN_CHUNK_SIZE)]
+
+
+def _links(movie_ids=None):
+    """(kind, movie_id, key) link statements, for the whole catalog or ``movie_ids``."""
+    statements = [
+        select(literal(0), movie_genre.c.movie_id, movie_genre.c.genre_id),
+        select(literal(1), movie_actor.c.movie_id, movie_actor.c.actor_id),
+        select(literal(2), Movie.id, Movie.director_id).where(Movie.director_id.is_not(None)),
+    ]
+    if movie_ids is not None:
+        columns = (movie_genre.c.movie_id, movie_actor.c.movie_id, Movie.id)
+        statements = [statement.where(column.in_(movie_ids)) for statement, column in zip(statements, columns)]
+    return union_all(*statements)
+
+
+def _features(db: Session, movie_ids=None) -> tuple:
+    """(ids, matrix): sorted movie ids and one normalised feature row per movie that has any links."""
+    statements = [_links()] if movie_ids is None else [_links(chunk) for chunk in _chunks(movie_ids)]
+    # Plain tuples: numpy reads Row objects item by item, an order of magnitude slower.
+    rows = [tuple(row) for statement in statements for row in db.execute(statement)]
+    if not rows:
+        return np.empty(0, dtype=np.int64), sparse.csr_matrix((0, 0))
+    links = np.array(rows, dtype=np.int64)
+    ids, row = np.unique(links[:, 1], return_inverse=True)
+    features, column = np.unique(links[:, [0, 2]], axis=0, return_inverse=True)
+    weights = _WEIGHTS[links[:, 0]]
+    matrix = sparse.csr_matrix((weights, (row, column.ravel())), shape=(len(ids), len(features)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return ids, (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def _top_neighbors(rows, row_ids, matrix, ids, k: int) -> tuple:
+    """(movie_id, position, similar_id, score) arrays of the ``k`` best-scoring rows of ``matrix`` for each of ``rows``.
+
+    Ties break by the lower id; a movie is never its own neighbour and movies
+    sharing nothing (score 0) are left out.
+    """
+    k = min(k, len(ids))
+    if k == 0 or rows.shape[0] == 0:
+        return tuple(np.empty(0, dtype=dtype) for dtype in (np.int64, np.int64, np.int64, np.float64))
+    scores = (rows @ matrix.T).toarray().round(SCORE_DECIMALS)
+    own = np.searchsorted(ids, row_ids).clip(max=len(ids) - 1)
+    found = ids[own] == row_ids
+    scores[np.flatnonzero(found), own[found]] = 0
+    kth = np.partition(scores, -k, axis=1)[:, [-k]]
+    above = scores > kth
+    tied = scores == kth
+    keep = above | (tied & (np.cumsum(tied, axis=1) <= k - above.sum(axis=1, keepdims=True)))
+    rows_, columns = np.nonzero(keep)
+    columns = columns.reshape(-1, k)
+    values = scores[rows_, columns.ravel()].reshape(-1, k)
+    order = np.lexsort((columns, -values))
+    columns = np.take_along_axis(columns, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    positive = values > 0
+    movie_ids = np.repeat(row_ids, k).reshape(-1, k)
+    positions = np.broadcast_to(np.arange(k), columns.shape)
+    return movie_ids[positive], positions[positive], ids[columns][positive], values[positive]
+
+
+def _blocks(count: int, width: int) -> list:
+    size = max(1, BLOCK_CELLS // max(width, 1))
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+_catalog = None
+
+
+def _init_worker(ids, matrix, k):
+    global _catalog
+    _catalog = (ids, matrix, k)
+
+
+def _score_block(block: tuple) -> tuple:
+    ids, matrix, k = _catalog
+    start, stop = block
+    return _top_neighbors(matrix[start:stop], ids[start:stop], matrix, ids, k)
+
+
+def _store(db: Session, results: list):
+    _insert(db, [
+        row for result in results for row in zip(*(array.tolist() for array in result))
+    ])
+
+
+def _insert(db: Session, rows: list):
+    rows = [
+        {"movie_id": movie_id, "position": position, "similar_id": similar_id, "score": score}
+        for movie_id, position, similar_id, score in rows
+    ]
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(MovieSimilarity.__table__), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def rebuild(db: Session, workers: int = SIMILARITY_WORKERS, k: int = SIMILAR_MOVIES) -> int:
+    """Recompute every movie's neighbours in the caller's transaction; returns the rows stored.
+
+    Blocks of rows are scored in a pool of ``workers`` processes, each of
+    which receives the catalog matrix once.
+    """
+    ids, matrix = _features(db)
+    blocks = _blocks(len(ids), len(ids))
+    if workers > 1 and len(blocks) > 1:
+        # Spawned rather than forked: the server process runs threads.
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker, initargs=(ids, matrix, k)
+        ) as pool:
+            results = list(pool.map(_score_block, blocks))
+    else:
+        results = [_top_neighbors(matrix[start:stop], ids[start:stop], matrix, ids, k) for start, stop in blocks]
+    db.execute(delete(MovieSimilarity))
+    _store(db, results)
+    return sum(len(result[0]) for result in results)
+
+
+def _sharing(db: Session, movie_ids) -> set:
+    """Movies sharing a genre, an actor or the director with any of ``movie_ids`` (themselves included)."""
+    # IN over the distinct keys rather than a self-join, which would repeat a
+    # movie once per key it shares.
+    found = set()
+    for chunk in _chunks(movie_ids):
+        found.update(db.scalars(union(
+            select(movie_genre.c.movie_id).where(movie_genre.c.genre_id.in_(
+                select(movie_genre.c.genre_id).where(movie_genre.c.movie_id.in_(chunk)).scalar_subquery()
+            )),
+            select(movie_actor.c.movie_id).where(movie_actor.c.actor_id.in_(
+                select(movie_actor.c.actor_id).where(movie_actor.c.movie_id.in_(chunk)).scalar_subquery()
+            )),
+            select(Movie.id).where(Movie.director_id.in_(
+                select(Movie.director_id).where(Movie.id.in_(chunk)).scalar_subquery()
+            )),
+        )))
+    return found
+
+
+def refresh_movies(db: Session, movie_ids, k: int = SIMILAR_MOVIES) -> set:
+    """Update the neighbour lists after the links of ``movie_ids`` changed; call once the change is flushed.
+
+    The changed movies, and every movie that listed one of them, are scored
+    again in full. Any other movie sharing a link with a changed one only
+    needs the changed movies merged into its list, since no other score of
+    its moved. Deleted movies may be passed as well. Returns the ids of the
+    movies whose list was rewritten.
+    """
+    changed = set(movie_ids)
+    if not changed:
+        return set()
+    table = MovieSimilarity.__table__
+    listers = {
+        movie_id for chunk in _chunks(changed)
+        for movie_id in db.scalars(select(table.c.movie_id).where(table.c.similar_id.in_(chunk)).distinct())
+    }
+    rescored = changed | listers
+    ids, matrix = _features(db, _sharing(db, rescored))
+    for chunk in _chunks(rescored):
+        db.execute(delete(table).where(table.c.movie_id.in_(chunk)))
+    positions = np.flatnonzero(np.isin(ids, list(rescored)))
+    _store(db, [
+        _top_neighbors(matrix[positions[start:stop]], ids[positions[start:stop]], matrix, ids, k)
+        for start, stop in _blocks(len(positions), len(ids))
+    ])
+    return rescored | _merge(db, ids, matrix, changed, rescored, k)
+
+
+def _merge(db: Session, ids, matrix, changed: set, rescored: set, k: int) -> set:
+    """Merge the changed movies into the lists of the other movies they now score against."""
+    changed_positions = np.flatnonzero(np.isin(ids, list(changed)))
+    others = np.flatnonzero(~np.isin(ids, list(rescored)))
+    if len(changed_positions) == 0 or len(others) == 0:
+        return set()
+    # The best k changed movies of each other movie; only those can enter its list.
+    offers = {}
+    for start, stop in _blocks(len(others), len(changed_positions)):
+        block = others[start:stop]
+        result = _top_neighbors(matrix[block], ids[block], matrix[changed_positions], ids[changed_positions], k)
+        for movie_id, _, similar_id, score in zip(*(array.tolist() for array in result)):
+            offers.setdefault(movie_id, []).append((score, similar_id))
+    if not offers:
+        return set()
+
+    table = MovieSimilarity.__table__
+    # Only lists that are not full, or whose last score an offer reaches, can change.
+    merging = set(offers)
+    for chunk in _chunks(offers):
+        for movie_id, count, lowest in db.execute(
+            select(table.c.movie_id, func.count(), func.min(table.c.score))
+            .where(table.c.movie_id.in_(chunk)).group_by(table.c.movie_id)
+        ):
+            if count >= k and max(offers[movie_id])[0] < lowest:
+                merging.discard(movie_id)
+    lists = {movie_id: offers[movie_id] for movie_id in merging}
+    for chunk in _chunks(merging):
+        for movie_id, similar_id, score in db.execute(
+            select(table.c.movie_id, table.c.similar_id, table.c.score).where(table.c.movie_id.in_(chunk))
+        ):
+            lists[movie_id].append((score, similar_id))
+        db.execute(delete(table).where(table.c.movie_id.in_(chunk)))
+    _insert(db, [
+        (movie_id, position, similar_id, score)
+        for movie_id, neighbors in lists.items()
+        for position, (score, similar_id) in enumerate(sorted(neighbors, key=lambda item: (-item[0], item[1]))[:k])
+    ])
+    return merging
+
+
+def similar_movies(db: Session, movie_id: int, limit: int) -> list:
+    """The stored neighbours of ``movie_id``, best first: one primary-key range read joined to movies."""
+    rows = db.execute(
+        select(Movie.id, Movie.title, Movie.release_year, Movie.image_url, Movie.rating, MovieSimilarity.score)
+        .join(MovieSimilarity, MovieSimilarity.similar_id == Movie.id)
+        .where(MovieSimilarity.movie_id == movie_id, MovieSimilarity.position < limit)
+        .order_by(MovieSimilarity.position)
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def main():
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the similar movies table.")
+    parser.add_argument("--workers", type=int, default=SIMILARITY_WORKERS)
+    parser.add_argument("--k", type=int, default=SIMILAR_MOVIES, help="neighbours stored per movie")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        stored = rebuild(db, args.workers, args.k)
+        db.commit()
+    print(f"{stored} neighbours stored in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,23 @@
+import json
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from database import Base, get_db
-from main import app
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.pool import NullPool, StaticPool
+
+from async_routes import asyncify_router
+from database import Base, async_url, get_async_db, get_db
+from etags import stale_version_response
+from main import ROUTERS, app
+from name_index import actor_names, director_names
+from autocomplete import catalog_prefixes
+from response_cache import response_cache
+from query_monitor import install_query_monitor, parse_server_timing, query_stats
+from metrics import metrics
 import database_models 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -15,9 +27,20 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+install_query_monitor(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def reset_in_process_state():
+    # Indexes built from the database must not outlive the per-test schema.
+    actor_names.clear()
+    director_names.clear()
+    catalog_prefixes.clear()
+    response_cache.clear()
+    query_stats.reset()
+    metrics.reset()
+
+
 def override_get_db():
     db = TestingSessionLocal()
     try:
@@ -28,6 +51,7 @@ def override_get_db():
 
 @pytest.fixture(scope="function")
 def db_session():
+    reset_in_process_state()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -45,6 +69,62 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_budget(client):
+    """Send a request and fail if it runs more SQL statements than ``budget``."""
+    def request(method, path, budget, **kwargs):
+        response = client.request(method, path, **kwargs)
+        statements = int(parse_server_timing(response.headers["server-timing"])["db-statements"]["desc"])
+        assert statements <= budget, f"{method} {path} ran {statements} SQL statements, budget is {budget}"
+        return response
+    return request
+
+
+class Statement(str):
+    """The SQL text of an executed statement, with its bound ``parameters``."""
+    parameters = ()
+
+
+@pytest.fixture
+def statements(db_session):
+    """Every SQL statement sent to the test database while the fixture is active."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(Statement(statement))
+        executed[-1].parameters = parameters
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(scope="function")
+def async_client(tmp_path):
+    # aiosqlite opens its own connections, so the async app gets a file database.
+    reset_in_process_state()
+    url = f"sqlite:///{tmp_path / 'movies.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    AsyncTestingSessionLocal = async_sessionmaker(
+        create_async_engine(async_url(url), poolclass=NullPool), autoflush=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.add_exception_handler(StaleDataError, stale_version_response)
+    for router in ROUTERS:
+        async_app.include_router(asyncify_router(router))
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
 @pytest.fixture
 def sample_director(client):
     director_data = {
@@ -100,3 +180,61 @@ def sample_review(client, sample_movie):
     }
     response = client.post("/api/v1/reviews/", json=review_data)
     return response.json()
+
+
+@pytest.fixture
+def linked_movie(client, db_session, sample_movie, sample_actor, sample_genre):
+    movie = db_session.get(database_models.Movie, sample_movie["id"])
+    movie.actors.append(db_session.get(database_models.Actor, sample_actor["id"]))
+    movie.genres.append(db_session.get(database_models.Genre, sample_genre["id"]))
+    db_session.commit()
+    return sample_movie
+
+
+@pytest.fixture
+def build_catalog(client, db_session):
+    """Import movies through the bulk import endpoint and return their ids by title.
+
+    Each movie is a dict of bulk import fields in which ``director`` and
+    ``actors`` may be given as full names ("Christopher Nolan");
+    ``description``, ``release_year`` and ``director`` may be left out.
+    Directors, actors and genres are created by name, in order of first
+    appearance. ``reviews`` are ``(title, rating)`` or
+    ``(title, rating, comment)`` tuples.
+    """
+    def build(movies, reviews=(), chunk_size=None):
+        # The importer creates genres from a set; created here first, their
+        # ids do not depend on the hash seed.
+        for genre in dict.fromkeys(genre for movie in movies for genre in movie.get("genres", ())):
+            if not db_session.scalar(select(database_models.Genre.id).where(database_models.Genre.type == genre)):
+                client.post("/api/v1/genres/", json={"type": genre})
+        records = [
+            {
+                "description": "", "release_year": 2010, **movie,
+                "director": person(movie.get("director", "Christopher Nolan")),
+                "actors": [person(actor) for actor in movie.get("actors", ())],
+            }
+            for movie in movies
+        ]
+        body = "".join(json.dumps(record) + "\n" for record in records).encode()
+        params = {"chunk_size": chunk_size} if chunk_size else {}
+        response = client.post(
+            "/api/v1/movies/import", params=params, content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.json()["failed"] == 0, response.json()["errors"]
+
+        ids = dict(db_session.execute(select(database_models.Movie.title, database_models.Movie.id)).all())
+        for title, rating, *comment in reviews:
+            response = client.post("/api/v1/reviews/", json={
+                "movie_id": ids[title], "reviewer_name": "Jane", "rating": rating, "comment": comment[0] if comment else None,
+            })
+            assert response.status_code == 201
+        return ids
+    return build
+
+
+def person(name) -> dict:
+    if isinstance(name, dict):
+        return name
+    first_name, last_name = name.split(" ", 1)
+    return {"first_name": first_name, "last_name": last_name}
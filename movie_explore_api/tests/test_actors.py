@@ -1,5 +1,7 @@
 import pytest
 from fastapi import status
+from database_models import Actor, Genre, Movie
+from name_index import NAME_MATCH_LIMIT
 
 
 class TestActorsEndpoints:
@@ -122,3 +124,44 @@ class TestActorsEndpoints:
         response = client.post("/api/v1/actors/", json=actor_data)
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_filter_actors_by_movie_and_genre(self, client, db_session, sample_actor, sample_movie):
+        movie = db_session.get(Movie, sample_movie["id"])
+        movie.genres = [Genre(type="Sci-Fi"), Genre(type="Thriller")]
+        movie.actors = [db_session.get(Actor, sample_actor["id"])]
+        db_session.commit()
+
+        response = client.get("/api/v1/actors/", params={"movie": "Incep", "genre": "Sci-Fi"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == 1
+        assert len(data[0]["movies"]) == 1
+
+    @pytest.mark.parametrize("name", ["smith", "john smith"])
+    def test_name_match_limit_applies_after_other_filters(self, client, db_session, sample_movie, name):
+        actors = [Actor(first_name="John", last_name="Smith") for _ in range(NAME_MATCH_LIMIT + 50)]
+        db_session.add_all(actors)
+        db_session.get(Movie, sample_movie["id"]).actors = [actors[-1]]
+        db_session.commit()
+
+        response = client.get("/api/v1/actors/", params={"name": name, "movie": "Incep"})
+
+        assert [a["id"] for a in response.json()] == [actors[-1].id]
+
+    def test_filter_actors_by_misspelled_name(self, client, sample_actor):
+        response = client.get("/api/v1/actors/", params={"name": "DeCaprio"})
+
+        assert [a["id"] for a in response.json()] == [sample_actor["id"]]
+
+    def test_filter_actors_by_name_follows_updates(self, client, sample_actor):
+        client.put(f"/api/v1/actors/{sample_actor['id']}", json={
+            "first_name": "Leonardo",
+            "last_name": "Wilhelm"
+        })
+
+        assert client.get("/api/v1/actors/", params={"name": "DiCaprio"}).json() == []
+        assert len(client.get("/api/v1/actors/", params={"name": "Wilhelm"}).json()) == 1
+
+        client.delete(f"/api/v1/actors/{sample_actor['id']}")
+        assert client.get("/api/v1/actors/", params={"name": "Wilhelm"}).json() == []
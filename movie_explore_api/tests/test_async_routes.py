@@ -0,0 +1,56 @@
+from fastapi import status
+
+
+class TestAsyncRoutes:
+
+    def create_movie(self, client):
+        director = client.post("/api/v1/directors/", json={"first_name": "Christopher", "last_name": "Nolan"}).json()
+        movie = client.post("/api/v1/movies/", json={
+            "title": "Inception",
+            "description": "A mind-bending thriller",
+            "release_year": 2010,
+            "director_id": director["id"],
+            "rating": 8.8
+        })
+        assert movie.status_code == status.HTTP_201_CREATED
+        return movie.json()
+
+    def test_detail_embeds_relationships(self, async_client):
+        movie = self.create_movie(async_client)
+        async_client.post("/api/v1/reviews/", json={"movie_id": movie["id"], "reviewer_name": "Jane", "rating": 9.0})
+
+        response = async_client.get(f"/api/v1/movies/{movie['id']}")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["director"]["last_name"] == "Nolan"
+        assert len(data["reviews"]) == 1
+        assert data["rating_stats"]["average_rating"] == 9.0
+
+    def test_headers_and_conditional_requests(self, async_client):
+        movie = self.create_movie(async_client)
+        async_client.post("/api/v1/movies/", json={**movie, "title": "Interstellar"})
+
+        first = async_client.get("/api/v1/movies/?limit=1")
+        assert "x-next-cursor" in first.headers
+        again = async_client.get("/api/v1/movies/?limit=1", headers={"If-None-Match": first.headers["etag"]})
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again.content == b""
+
+    def test_errors_and_empty_responses(self, async_client):
+        movie = self.create_movie(async_client)
+
+        assert async_client.get("/api/v1/movies/999").status_code == status.HTTP_404_NOT_FOUND
+        assert async_client.get("/api/v1/movies/?sort=budget").status_code == status.HTTP_400_BAD_REQUEST
+        deleted = async_client.delete(f"/api/v1/movies/{movie['id']}")
+        assert deleted.status_code == status.HTTP_204_NO_CONTENT
+        assert deleted.content == b""
+
+    def test_indexed_lookups(self, async_client):
+        self.create_movie(async_client)
+
+        assert async_client.get("/api/v1/search/", params={"q": "thriller"}).json()[0]["title"] == "Inception"
+        assert async_client.get("/api/v1/directors/", params={"name": "nolen"}).json()[0]["last_name"] == "Nolan"
+        labels = [entry["label"] for entry in async_client.get("/api/v1/autocomplete/", params={"q": "inc"}).json()]
+        assert labels == ["Inception"]
@@ -0,0 +1,135 @@
+import random
+import pytest
+from fastapi import status
+
+from autocomplete import PrefixIndex, normalize, suffixes
+from database_models import Genre
+
+
+@pytest.fixture
+def index(db_session):
+    index = PrefixIndex(k=3)
+    index.ensure_loaded(db_session)
+    return index
+
+
+class TestPrefixIndex:
+
+    def test_suffixes_start_at_each_word(self):
+        assert suffixes("Christopher Nolan") == ["christopher nolan", "nolan"]
+
+    def test_top_k_by_weight(self, index, db_session):
+        for id, (title, weight) in enumerate([
+            ("Inception", 0.88), ("Interstellar", 0.87), ("Insomnia", 0.72), ("Inside Out", 0.81)
+        ]):
+            index.put("movie", id, title, weight)
+
+        labels = [entry["label"] for entry in index.complete(db_session, "in")]
+        assert labels == ["Inception", "Interstellar", "Inside Out"]
+        assert [entry["label"] for entry in index.complete(db_session, "ins")] == ["Inside Out", "Insomnia"]
+        assert index.complete(db_session, "inx") == []
+
+    def test_matches_later_words(self, index, db_session):
+        index.put("director", 1, "Christopher Nolan", 0.5)
+
+        assert [entry["id"] for entry in index.complete(db_session, "nol")] == [1]
+        assert [entry["id"] for entry in index.complete(db_session, "christopher n")] == [1]
+
+    def test_entry_listed_once(self, index, db_session):
+        index.put("actor", 1, "Nolan Nolan", 0.5)
+
+        assert len(index.complete(db_session, "no")) == 1
+
+    def test_discard_promotes_next_best(self, index, db_session):
+        for id, weight in enumerate([0.9, 0.8, 0.7, 0.6]):
+            index.put("movie", id, f"Movie {id}", weight)
+        index.discard("movie", 0)
+
+        assert [entry["id"] for entry in index.complete(db_session, "mov")] == [1, 2, 3]
+
+    def test_reweight_and_rename(self, index, db_session):
+        index.put("movie", 1, "Alien", 0.5)
+        index.put("movie", 2, "Aliens", 0.6)
+        index.reweight("movie", 1, 0.9)
+        assert [entry["id"] for entry in index.complete(db_session, "ali")] == [1, 2]
+
+        index.put("movie", 1, "Prometheus")
+        assert [entry["id"] for entry in index.complete(db_session, "ali")] == [2]
+        assert index.complete(db_session, "prom")[0]["score"] == 0.9
+
+    def test_reload_replays_changes_made_while_loading(self, index, db_session):
+        db_session.add(Genre(type="Drama"))
+        db_session.commit()
+        index.put("movie", 1, "Alien", 0.5)
+
+        class WritingSession:
+            calls = 0
+
+            def execute(self, statement):
+                # Writes from other requests land while the replacement loads.
+                if not self.calls:
+                    index.put("movie", 2, "Aliens", 0.6)
+                    index.reweight("genre", 1, 0.9)
+                    index.discard("movie", 2)
+                    index.put("movie", 3, "Alien 3", 0.4)
+                self.calls += 1
+                return db_session.execute(statement)
+
+        index.reload(WritingSession())
+
+        assert [entry["label"] for entry in index.complete(db_session, "ali")] == ["Alien 3"]
+        assert index.complete(db_session, "dra") == [{"type": "genre", "id": 1, "label": "Drama", "score": 0.9}]
+
+    def test_matches_brute_force(self, index, db_session):
+        rng = random.Random(7)
+        labels = {}
+        for step in range(400):
+            id = rng.randrange(60)
+            if rng.random() < 0.25:
+                index.discard("movie", id)
+                labels.pop(id, None)
+            else:
+                label = " ".join(rng.choice(["ab", "abc", "b", "bca", "c"]) for _ in range(rng.randint(1, 3)))
+                weight = rng.random()
+                index.put("movie", id, label, weight)
+                labels[id] = (label, weight)
+
+        for prefix in ["a", "ab", "abc", "b", "bc", "c", "ab b", "ca"]:
+            expected = sorted(
+                (-weight, id) for id, (label, weight) in labels.items()
+                if any(term.startswith(normalize(prefix)) for term in suffixes(label))
+            )[:3]
+            assert [entry["id"] for entry in index.complete(db_session, prefix)] == [id for _, id in expected]
+
+
+class TestAutocompleteEndpoint:
+
+    def test_requires_query(self, client):
+        response = client.get("/api/v1/autocomplete/")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_covers_all_catalog_types(self, client, sample_movie, sample_actor, sample_genre):
+        assert client.get("/api/v1/autocomplete/", params={"q": "incep"}).json() == [
+            {"type": "movie", "id": sample_movie["id"], "label": "Inception", "score": pytest.approx(0.88)}
+        ]
+        assert client.get("/api/v1/autocomplete/", params={"q": "nol"}).json()[0]["type"] == "director"
+        assert client.get("/api/v1/autocomplete/", params={"q": "dicap"}).json()[0]["type"] == "actor"
+        assert client.get("/api/v1/autocomplete/", params={"q": "sci"}).json()[0]["type"] == "genre"
+
+    def test_follows_writes(self, client, sample_movie, sample_director):
+        client.get("/api/v1/autocomplete/", params={"q": "incep"})
+        client.put(f"/api/v1/movies/{sample_movie['id']}", json={
+            "title": "Tenet",
+            "description": "Time inversion",
+            "release_year": 2020,
+            "director_id": sample_director["id"],
+            "rating": 7.3
+        })
+        assert client.get("/api/v1/autocomplete/", params={"q": "incep"}).json() == []
+        assert client.get("/api/v1/autocomplete/", params={"q": "ten"}).json()[0]["label"] == "Tenet"
+
+        client.delete(f"/api/v1/movies/{sample_movie['id']}")
+        assert client.get("/api/v1/autocomplete/", params={"q": "ten"}).json() == []
+        director = client.get("/api/v1/autocomplete/", params={"q": "nolan"}).json()[0]
+        assert director["score"] == 0
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import status
+
+from batch import MAX_BATCH_SIZE
+from response_cache import response_cache
+
+
+@pytest.fixture
+def movies(client, sample_movie):
+    second = client.post("/api/v1/movies/", json={**sample_movie, "title": "Interstellar"}).json()
+    third = client.post("/api/v1/movies/", json={**sample_movie, "title": "Tenet"}).json()
+    return [sample_movie, second, third]
+
+
+class TestBatch:
+
+    def test_get_keeps_input_order(self, client, movies):
+        ids = [movies[2]["id"], movies[0]["id"], movies[1]["id"]]
+
+        response = client.get(f"/api/v1/movies/batch?ids={','.join(map(str, ids))}")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [movie["id"] for movie in data["items"]] == ids
+        assert data["items"][0]["director"]["last_name"] == "Nolan"
+        assert data["missing"] == []
+        assert response.headers["etag"].startswith('W/"')
+
+    def test_missing_ids_are_reported(self, client, movies):
+        response = client.get(f"/api/v1/movies/batch?ids=999,{movies[0]['id']},998")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [movie["id"] for movie in response.json()["items"]] == [movies[0]["id"]]
+        assert response.json()["missing"] == [999, 998]
+
+    def test_one_query_per_loader_pass(self, client, movies, statements):
+        ids = ",".join(str(movie["id"]) for movie in movies)
+
+        client.get(f"/api/v1/movies/batch?ids={ids}")
+
+        # The movies with director and rating stats, then genres, actors and reviews.
+        assert len(statements) == 4
+
+    def test_post_form(self, client, movies, sample_actor, sample_director):
+        response = client.post("/api/v1/movies/batch", json={"ids": [movies[1]["id"], movies[1]["id"], 404]})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [movie["title"] for movie in response.json()["items"]] == ["Interstellar"]
+        assert response.json()["missing"] == [404]
+
+        actors = client.post("/api/v1/actors/batch", json={"ids": [sample_actor["id"]]}).json()
+        directors = client.get(f"/api/v1/directors/batch?ids={sample_director['id']}").json()
+        assert actors["items"][0]["last_name"] == "DiCaprio"
+        assert [movie["title"] for movie in directors["items"][0]["movies"]] == ["Inception", "Interstellar", "Tenet"]
+
+    @pytest.mark.parametrize("ids", ["", "1,two", ",".join(map(str, range(MAX_BATCH_SIZE + 1)))])
+    def test_invalid_ids(self, client, ids):
+        response = client.get(f"/api/v1/actors/batch?ids={ids}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_conditional_get(self, client, movies):
+        url = f"/api/v1/movies/batch?ids={movies[1]['id']},{movies[0]['id']}"
+        etag = client.get(url).headers["etag"]
+
+        response_cache.clear()
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_async_mode(self, async_client):
+        director = async_client.post("/api/v1/directors/", json={"first_name": "Greta", "last_name": "Gerwig"}).json()
+
+        got = async_client.get(f"/api/v1/directors/batch?ids=7,{director['id']}").json()
+        posted = async_client.post("/api/v1/directors/batch", json={"ids": [director["id"]]}).json()
+
+        assert [item["id"] for item in got["items"]] == [director["id"]]
+        assert got["missing"] == [7]
+        assert posted["items"] == got["items"]
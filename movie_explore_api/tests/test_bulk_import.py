@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from fastapi import status
+
+from bulk_import import MovieImporter
+from database_models import Actor, Director, Genre, Movie
+
+
+def ndjson(*records) -> bytes:
+    return "".join((record if isinstance(record, str) else json.dumps(record)) + "\n" for record in records).encode()
+
+
+def movie(title, director=("Christopher", "Nolan"), actors=(), genres=(), **fields):
+    return {
+        "title": title,
+        "description": f"{title} description",
+        "release_year": 2010,
+        "director": {"first_name": director[0], "last_name": director[1]},
+        "actors": [{"first_name": first, "last_name": last} for first, last in actors],
+        "genres": list(genres),
+        **fields,
+    }
+
+
+class TestBulkImport:
+
+    def post(self, client, body, chunk_size=2):
+        return client.post(
+            f"/api/v1/movies/import?chunk_size={chunk_size}",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+
+    def test_imports_movies_with_links(self, client, db_session, sample_director, sample_genre):
+        body = ndjson(
+            movie("Inception", actors=[("Leonardo", "DiCaprio"), ("Elliot", "Page")], genres=["Sci-Fi"], rating=8.8),
+            movie("The Revenant", director=("Alejandro", "Inarritu"), actors=[("Leonardo", "DiCaprio")], genres=["Drama"]),
+            movie("Tenet", genres=["Sci-Fi", "Sci-Fi"]),
+        )
+
+        response = self.post(client, body)
+
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report["imported"] == 3
+        assert report["failed"] == 0
+        assert report["errors"] == []
+        assert db_session.query(Director).count() == 2
+        assert db_session.query(Actor).count() == 2
+        assert sorted(genre.type for genre in db_session.query(Genre)) == ["Drama", "Sci-Fi"]
+        inception = client.get(f"/api/v1/movies/{db_session.query(Movie.id).filter(Movie.title == 'Inception').scalar()}").json()
+        assert inception["director"]["id"] == sample_director["id"]
+        assert [actor["last_name"] for actor in inception["actors"]] == ["DiCaprio", "Page"]
+        assert [genre["id"] for genre in inception["genres"]] == [sample_genre["id"]]
+        assert inception["rating_stats"]["review_count"] == 0
+
+    def test_reports_row_errors(self, client, db_session, sample_movie):
+        body = ndjson(
+            movie("Interstellar"),
+            "{not json",
+            movie("Inception"),
+            {"title": "No director", "description": "x", "release_year": 2000},
+            "",
+            movie("Interstellar"),
+            movie("Dunkirk", release_year=1800),
+        )
+
+        report = self.post(client, body).json()
+
+        assert report["imported"] == 1
+        assert report["failed"] == 5
+        assert [error["line"] for error in report["errors"]] == [2, 4, 3, 6, 7]
+        assert report["errors"][1]["error"] == "director: Field required"
+        assert "already exists" in report["errors"][2]["error"]
+        assert report["errors"][4]["error"].startswith("release_year:")
+
+    def test_refreshes_in_process_indexes(self, client):
+        client.get("/api/v1/autocomplete/?q=memento")
+        client.get("/api/v1/directors/?name=nolan")
+
+        self.post(client, ndjson(movie("Memento")))
+
+        assert [entry["label"] for entry in client.get("/api/v1/autocomplete/?q=memento").json()] == ["Memento"]
+        assert client.get("/api/v1/directors/?name=nolan").json()[0]["last_name"] == "Nolan"
+        assert client.get("/api/v1/search/?q=memento").json()[0]["title"] == "Memento"
+
+    @pytest.mark.parametrize("chunk_size", [0, 100_000])
+    def test_rejects_chunk_size(self, client, chunk_size):
+        response = self.post(client, ndjson(movie("Memento")), chunk_size=chunk_size)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    def test_caches_resolved_ids_across_chunks(self, db_session):
+        importer = MovieImporter(db_session)
+        new_directors = []
+        for chunk in ([movie("Memento")], [movie("Insomnia")]):
+            before = len(importer.directors)
+            importer.import_lines([json.dumps(record) for record in chunk])
+            new_directors.append(len(importer.directors) - before)
+
+        assert new_directors == [1, 0]
+        assert importer.report()["imported"] == 2
@@ -0,0 +1,120 @@
+import pytest
+
+import core_reads
+from database_models import Actor, Movie, Review
+from models import ActorDetailResponse, DirectorDetailResponse, MovieDetailResponse
+from response_cache import response_cache
+from serialization import encoder
+
+LEONARDO = {"first_name": "Leonardo", "last_name": "DiCaprio", "age": 49, "image_url": "https://example.com/leo.jpg"}
+
+
+@pytest.fixture
+def catalog(build_catalog, db_session):
+    build_catalog([
+        {
+            "title": "Inception", "description": "A mind-bending thriller", "rating": 8.8,
+            "image_url": "https://example.com/inception.jpg",
+            "director": {"first_name": "Christopher", "last_name": "Nolan", "age": 54},
+            "actors": [LEONARDO, "Anne Hathaway"], "genres": ["Sci-Fi"],
+        },
+        {
+            "title": "Interstellar", "description": "A mind-bending thriller",
+            "actors": [LEONARDO, "Anne Hathaway"], "genres": ["Sci-Fi"],
+        },
+    ], reviews=[("Inception", 9.0, "Amazing movie!"), ("Interstellar", 7), ("Inception", 3)])
+    return db_session
+
+
+def fetch(client, monkeypatch, core: bool, url: str):
+    monkeypatch.setattr(core_reads, "CORE_LIST_READS", core)
+    response_cache.clear()
+    return client.get(url)
+
+
+@pytest.fixture(params=[True, False], ids=["json-aggregates", "rows"])
+def aggregates(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(core_reads, "JSON_AGGREGATES", {})
+    return request.param
+
+
+@pytest.mark.usefixtures("aggregates")
+class TestCoreListReads:
+
+    @pytest.mark.parametrize("url", [
+        "/api/v1/movies/",
+        "/api/v1/movies/?sort=-title&limit=1",
+        "/api/v1/movies/?genre=Sci-Fi&sort=rating",
+        "/api/v1/actors/",
+        "/api/v1/actors/?name=anne",
+        "/api/v1/directors/",
+        "/api/v1/reviews/",
+        "/api/v1/reviews/?movie_id=1&min_rating=5",
+    ])
+    def test_matches_orm_response(self, client, catalog, monkeypatch, url):
+        orm = fetch(client, monkeypatch, False, url)
+        core = fetch(client, monkeypatch, True, url)
+
+        assert core.status_code == orm.status_code == 200
+        assert core.content == orm.content
+        assert core.headers.get("etag") == orm.headers.get("etag")
+        assert core.headers.get("x-next-cursor") == orm.headers.get("x-next-cursor")
+
+    def test_embedded_lists_ordered_by_id(self, client, catalog, monkeypatch):
+        movie = fetch(client, monkeypatch, True, "/api/v1/movies/").json()[0]
+
+        assert [actor["id"] for actor in movie["actors"]] == [1, 2]
+        assert [review["id"] for review in movie["reviews"]] == sorted(review["id"] for review in movie["reviews"])
+
+    def test_etag_revalidates_against_orm_etag(self, client, catalog, monkeypatch):
+        etag = fetch(client, monkeypatch, False, "/api/v1/movies/").headers["etag"]
+
+        response = client.get("/api/v1/movies/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_fieldsets_use_orm_path(self, client, catalog, monkeypatch):
+        orm = fetch(client, monkeypatch, False, "/api/v1/movies/?fields=title&include=director")
+        core = fetch(client, monkeypatch, True, "/api/v1/movies/?fields=title&include=director")
+
+        assert core.content == orm.content
+
+    def test_chunks_parent_ids(self, client, catalog, monkeypatch):
+        orm = fetch(client, monkeypatch, False, "/api/v1/movies/")
+        monkeypatch.setattr(core_reads, "IN_CHUNK_SIZE", 1)
+
+        assert fetch(client, monkeypatch, True, "/api/v1/movies/").content == orm.content
+
+    def test_empty_relationships(self, client, sample_movie, monkeypatch):
+        movie = fetch(client, monkeypatch, True, "/api/v1/movies/").json()[0]
+
+        assert movie["actors"] == movie["genres"] == movie["reviews"] == []
+        assert movie["director"]["id"] == sample_movie["director_id"]
+
+
+class TestEmbeds:
+
+    @pytest.mark.parametrize("model", [Movie, Actor, Review])
+    def test_cover_every_relationship_field(self, model):
+        response_model = core_reads.LIST_MODELS[model]
+        relationships = set(model.__mapper__.relationships.keys())
+
+        assert set(core_reads.EMBEDS[model]) == set(response_model.model_fields) & relationships
+
+    @pytest.mark.parametrize("model", [MovieDetailResponse, ActorDetailResponse, DirectorDetailResponse])
+    def test_list_models_have_encoders(self, model):
+        assert encoder(model) is not None
+
+    @pytest.mark.parametrize("model, name, aggregated", [
+        (Movie, "actors", True),
+        (Movie, "genres", True),
+        (Actor, "movies", True),
+        (Movie, "reviews", False),
+        (Movie, "rating_stats", False),
+    ])
+    def test_aggregates_only_json_exact_columns(self, model, name, aggregated):
+        target = getattr(model, name).property.mapper.class_
+        target_columns = core_reads.columns(target, core_reads.EMBEDS[model][name])
+
+        assert core_reads._json_exact(target, target_columns) is aggregated
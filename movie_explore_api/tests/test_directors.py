@@ -116,3 +116,11 @@ class TestDirectorsEndpoints:
         response = client.post("/api/v1/directors/", json=director_data)
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_filter_directors_by_misspelled_name_ranked(self, client, sample_director):
+        client.post("/api/v1/directors/", json={"first_name": "Greta", "last_name": "Nolen"})
+
+        response = client.get("/api/v1/directors/", params={"name": "Nolen"})
+
+        data = response.json()
+        assert [d["last_name"] for d in data] == ["Nolen", "Nolan"]
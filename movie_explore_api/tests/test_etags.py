@@ -0,0 +1,136 @@
+import pytest
+from fastapi import status
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from database_models import Actor, Movie
+from etags import etag_matches, graph_etag, stored_etag
+from response_cache import response_cache
+
+
+def conditional_get(client, url, etag):
+    # Bypass the response cache so the route itself answers.
+    response_cache.clear()
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+class TestETags:
+
+    def test_detail_not_modified(self, client, linked_movie, statements):
+        url = f"/api/v1/movies/{linked_movie['id']}"
+        etag = client.get(url).headers["etag"]
+        statements.clear()
+
+        response = conditional_get(client, url, etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert len(statements) == 1
+
+    def test_detail_changes_with_embedded_entity(self, client, linked_movie, sample_actor):
+        url = f"/api/v1/movies/{linked_movie['id']}"
+        etag = client.get(url).headers["etag"]
+
+        client.put(f"/api/v1/actors/{sample_actor['id']}", json={**sample_actor, "age": 50})
+
+        response = conditional_get(client, url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    def test_detail_changes_with_new_review(self, client, linked_movie):
+        url = f"/api/v1/movies/{linked_movie['id']}"
+        etag = client.get(url).headers["etag"]
+
+        client.post("/api/v1/reviews/", json={
+            "movie_id": linked_movie["id"], "reviewer_name": "Jane", "rating": 8.0, "comment": "Good"
+        })
+
+        assert conditional_get(client, url, etag).status_code == status.HTTP_200_OK
+
+    def test_actor_and_director_details(self, client, linked_movie, sample_actor, sample_director):
+        for url in [f"/api/v1/actors/{sample_actor['id']}", f"/api/v1/directors/{sample_director['id']}"]:
+            etag = client.get(url).headers["etag"]
+            assert conditional_get(client, url, etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.put(f"/api/v1/movies/{linked_movie['id']}", json={**linked_movie, "rating": 9})
+
+        url = f"/api/v1/actors/{sample_actor['id']}"
+        assert conditional_get(client, url, etag).status_code == status.HTTP_200_OK
+
+    def test_missing_entity_is_404(self, client):
+        assert conditional_get(client, "/api/v1/movies/999", '"x"').status_code == status.HTTP_404_NOT_FOUND
+
+    def test_filtered_list_weak_etag(self, client, linked_movie, sample_director, statements):
+        url = "/api/v1/movies/?genre=Sci-Fi&limit=1"
+        first = client.get(url)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        statements.clear()
+
+        response = conditional_get(client, url, etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(statements) == 2
+
+        client.post("/api/v1/movies/", json={
+            "title": "Interstellar", "description": "Space", "release_year": 2014,
+            "director_id": sample_director["id"], "rating": 8.7
+        })
+        assert conditional_get(client, url, etag).status_code == status.HTTP_304_NOT_MODIFIED
+        assert conditional_get(client, "/api/v1/movies/?limit=1", etag).status_code == status.HTTP_304_NOT_MODIFIED
+        assert conditional_get(client, "/api/v1/movies/", etag).status_code == status.HTTP_200_OK
+
+    def test_person_lists(self, client, linked_movie, sample_actor):
+        for url in ["/api/v1/actors/?name=dicaprio", "/api/v1/directors/"]:
+            etag = client.get(url).headers["etag"]
+            assert conditional_get(client, url, etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_cached_response_honours_if_none_match(self, client, sample_movie):
+        url = f"/api/v1/movies/{sample_movie['id']}"
+        etag = client.get(url).headers["etag"]
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["x-cache"] == "HIT"
+
+    def test_stored_matches_graph(self, client, db_session, linked_movie):
+        client.post("/api/v1/reviews/", json={
+            "movie_id": linked_movie["id"], "reviewer_name": "Jane", "rating": 8.0, "comment": "Good"
+        })
+        movies = db_session.query(Movie).all()
+
+        assert stored_etag(db_session, Movie, [m.id for m in movies]) == graph_etag(Movie, movies)
+        assert stored_etag(db_session, Movie, [999]) is None
+
+    def test_version_bumps_on_update(self, client, db_session, sample_actor):
+        assert db_session.get(Actor, sample_actor["id"]).version == 1
+
+        client.put(f"/api/v1/actors/{sample_actor['id']}", json={**sample_actor, "age": 50})
+
+        db_session.expire_all()
+        assert db_session.get(Actor, sample_actor["id"]).version == 2
+
+    @pytest.mark.parametrize("method", ["PUT", "DELETE"])
+    def test_concurrent_write_is_409(self, client, sample_movie, method):
+        def concurrent_write(session, flush_context, instances):
+            # Another request commits a change between this one's read and its flush.
+            session.connection().execute(update(Movie).values(version=Movie.version + 1))
+
+        event.listen(Session, "before_flush", concurrent_write, once=True)
+        try:
+            response = client.request(method, f"/api/v1/movies/{sample_movie['id']}", json={
+                key: sample_movie[key] for key in ("title", "description", "release_year", "director_id")
+            })
+        finally:
+            event.remove(Session, "before_flush", concurrent_write)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert client.get(f"/api/v1/movies/{sample_movie['id']}").json()["title"] == sample_movie["title"]
+
+    def test_etag_matches(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches('"a"', 'W/"a"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"a"')
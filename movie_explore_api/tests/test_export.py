@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi import status
+
+from routes import export
+
+
+class TestExport:
+
+    def test_movies_ndjson(self, client, sample_movie, sample_review):
+        response = client.get("/api/v1/export/movies")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"] == 'attachment; filename="movies.ndjson"'
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records == [{
+            "id": sample_movie["id"],
+            "title": "Inception",
+            "description": "A mind-bending thriller",
+            "release_year": 2010,
+            "image_url": "https://example.com/inception.jpg",
+            "director_id": sample_movie["director_id"],
+            "rating": 8.8,
+            "review_count": 1,
+            "average_rating": sample_review["rating"],
+        }]
+
+    def test_reviews_csv(self, client, sample_review):
+        response = client.get("/api/v1/export/reviews?format=csv")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["reviewer_name"] == sample_review["reviewer_name"]
+        assert rows[0]["created_at"].startswith(sample_review["created_at"][:10])
+
+    def test_empty_csv_has_header(self, client):
+        response = client.get("/api/v1/export/movies?format=csv")
+
+        assert response.text == ",".join(export.MOVIE_FIELDS) + "\r\n"
+
+    def test_streams_in_batches(self, client, db_session, sample_movie, monkeypatch):
+        monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+        for i in range(4):
+            client.post("/api/v1/movies/", json={**sample_movie, "title": f"Sequel {i}"})
+
+        chunks = export.stream_rows(db_session, export.movie_rows(), export.movie_record, export.MOVIE_FIELDS, "ndjson")
+
+        assert [len(chunk.decode().splitlines()) for chunk in chunks] == [2, 2, 1]
+
+    @pytest.mark.parametrize("path", ["/api/v1/export/movies?format=xml", "/api/v1/export/reviews?format=json"])
+    def test_unknown_format(self, client, path):
+        response = client.get(path)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,137 @@
+import pytest
+from fastapi import status
+
+import core_reads
+from database_models import Movie
+from query_monitor import parse_server_timing
+from response_cache import response_cache
+
+
+@pytest.fixture
+def catalog(build_catalog):
+    return build_catalog([
+        {"title": "Inception", "release_year": 2010, "rating": 8, "genres": ["Sci-Fi"]},
+        {"title": "Interstellar", "release_year": 2014, "rating": 9, "genres": ["Sci-Fi", "Drama"]},
+        {"title": "Memento", "release_year": 2000, "rating": 8, "genres": ["Drama"]},
+        {"title": "Alien", "release_year": 1979, "rating": 8, "director": "Ridley Scott", "genres": ["Sci-Fi"]},
+        {"title": "Gladiator", "release_year": 2000, "rating": 9, "director": "Ridley Scott", "genres": ["Drama"]},
+        {"title": "Hannibal", "release_year": 2001, "director": "Ridley Scott"},
+    ])
+
+
+def counts(facet: list) -> dict:
+    return {item["label"]: item["count"] for item in facet}
+
+
+class TestFacets:
+
+    def test_counts_every_facet(self, client, catalog):
+        response = client.get("/api/v1/movies/?facets=genre,decade,director,rating&limit=2")
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert len(body["items"]) == 2
+        facets = body["facets"]
+        assert facets["genre"] == [
+            {"value": 2, "label": "Drama", "count": 3},
+            {"value": 1, "label": "Sci-Fi", "count": 3},
+        ]
+        assert [(item["value"], item["label"], item["count"]) for item in facets["decade"]] == [
+            (1970, "1970s", 1), (2000, "2000s", 3), (2010, "2010s", 2),
+        ]
+        assert counts(facets["director"]) == {"Christopher Nolan": 3, "Ridley Scott": 3}
+        assert counts(facets["rating"]) == {"8-10": 5, "Unknown": 1}
+
+    def test_fractional_ratings_fall_in_their_band(self, client, db_session, sample_director):
+        for rating in (8.8, 7.5, 6.0, 9.99, 1.2):
+            db_session.add(Movie(title=f"Rated {rating}", description="", release_year=2010, rating=rating,
+                                 director_id=sample_director["id"]))
+        db_session.commit()
+
+        facet = client.get("/api/v1/movies/?facets=rating").json()["facets"]["rating"]
+
+        assert [(item["value"], item["label"], item["count"]) for item in facet] == [
+            (0, "0-2", 1), (6, "6-8", 2), (8, "8-10", 2),
+        ]
+
+    def test_only_requested_facets(self, client, catalog):
+        facets = client.get("/api/v1/movies/?facets=decade").json()["facets"]
+
+        assert facets["genre"] is None and facets["director"] is None and facets["rating"] is None
+        assert facets["decade"]
+
+    def test_without_facets_the_list_is_unchanged(self, client, catalog):
+        assert isinstance(client.get("/api/v1/movies/").json(), list)
+
+    def test_facets_apply_the_other_filters(self, client, catalog):
+        facets = client.get("/api/v1/movies/?genre=Drama&facets=genre,director,decade").json()["facets"]
+
+        # A facet leaves out its own filter: each genre counts what choosing it would return.
+        assert counts(facets["genre"]) == {"Drama": 3, "Sci-Fi": 3}
+        assert counts(facets["director"]) == {"Christopher Nolan": 2, "Ridley Scott": 1}
+        assert counts(facets["decade"]) == {"2000s": 2, "2010s": 1}
+
+    def test_decade_ignores_release_year_filter(self, client, catalog):
+        body = client.get("/api/v1/movies/?release_year=2000&facets=decade").json()
+
+        assert len(body["items"]) == 2
+        assert counts(body["facets"]["decade"]) == {"1970s": 1, "2000s": 3, "2010s": 2}
+
+    def test_facets_cost_one_statement(self, client, catalog):
+        def statements(url):
+            return int(parse_server_timing(client.get(url).headers["server-timing"])["db-statements"]["desc"])
+
+        plain = statements("/api/v1/movies/?genre=Drama&limit=2")
+        faceted = statements("/api/v1/movies/?genre=Drama&limit=2&facets=genre,decade,director,rating")
+
+        assert faceted == plain + 1
+
+    def test_with_sparse_fieldsets(self, client, catalog):
+        body = client.get("/api/v1/movies/?fields=title&facets=director&limit=1").json()
+
+        assert body["items"] == [{"id": 1, "title": "Inception"}]
+        assert counts(body["facets"]["director"]) == {"Christopher Nolan": 3, "Ridley Scott": 3}
+
+    def test_with_core_list_reads(self, client, catalog, monkeypatch):
+        orm = client.get("/api/v1/movies/?facets=genre&limit=3")
+        monkeypatch.setattr(core_reads, "CORE_LIST_READS", True)
+        response_cache.clear()
+        core = client.get("/api/v1/movies/?facets=genre&limit=3")
+
+        assert core.content == orm.content
+        assert core.headers["etag"] == orm.headers["etag"]
+
+    def test_unknown_facet(self, client, catalog):
+        response = client.get("/api/v1/movies/?facets=genre,budget")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "budget" in response.json()["detail"]
+
+
+class TestFacetCaching:
+
+    def test_etag_covers_movies_outside_the_page(self, client, catalog):
+        url = "/api/v1/movies/?facets=decade&limit=1"
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        nolan = client.get(f"/api/v1/movies/{catalog['Inception']}").json()["director_id"]
+        client.post("/api/v1/movies/", json={
+            "title": "Oppenheimer", "description": "", "release_year": 2023, "director_id": nolan,
+        })
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert counts(response.json()["facets"]["decade"])["2020s"] == 1
+
+    def test_genre_rename_invalidates_cached_facets(self, client, catalog):
+        url = "/api/v1/movies/?facets=genre&limit=1"
+        client.get(url)
+        assert client.get(url).headers["x-cache"] == "HIT"
+
+        client.put("/api/v1/genres/1", json={"type": "Thriller"})
+
+        response = client.get(url)
+        assert response.headers["x-cache"] == "MISS"
+        assert "Thriller" in counts(response.json()["facets"]["genre"])
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import status
+
+from response_cache import response_cache
+
+
+class TestFieldsets:
+
+    def test_fields_only_returns_requested_scalars(self, client, linked_movie, statements):
+        response = client.get("/api/v1/movies/?fields=title,release_year")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"id": linked_movie["id"], "title": "Inception", "release_year": 2010}]
+        assert len(statements) == 1
+        assert "description" not in statements[0]
+        assert "JOIN" not in statements[0]
+
+    def test_include_embeds_only_requested_relationships(self, client, linked_movie, statements):
+        response = client.get(f"/api/v1/movies/{linked_movie['id']}?fields=title&include=director,genres")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert set(data) == {"id", "title", "director", "genres"}
+        assert data["director"]["last_name"] == "Nolan"
+        assert [genre["type"] for genre in data["genres"]] == ["Sci-Fi"]
+        assert not any("actors" in statement or "reviews" in statement for statement in statements)
+
+    def test_include_alone_keeps_all_fields(self, client, linked_movie):
+        data = client.get(f"/api/v1/movies/{linked_movie['id']}?include=rating_stats").json()
+
+        assert data["description"] == linked_movie["description"]
+        assert data["rating_stats"]["review_count"] == 0
+        assert "actors" not in data
+
+    def test_actor_and_director_fieldsets(self, client, linked_movie, sample_actor, sample_director):
+        actor = client.get(f"/api/v1/actors/{sample_actor['id']}?fields=last_name&include=movies").json()
+        directors = client.get("/api/v1/directors/?fields=first_name").json()
+
+        assert set(actor) == {"id", "last_name", "movies"}
+        assert actor["movies"][0]["title"] == "Inception"
+        assert directors == [{"id": sample_director["id"], "first_name": "Christopher"}]
+
+    @pytest.mark.parametrize("query", ["fields=title,budget", "include=director,crew", "fields=director"])
+    def test_unknown_names_are_rejected(self, client, sample_movie, query):
+        response = client.get(f"/api/v1/movies/{sample_movie['id']}?{query}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Allowed:" in response.json()["detail"]
+
+    def test_sparse_list_keeps_cursor(self, client, linked_movie):
+        client.post("/api/v1/movies/", json={**linked_movie, "title": "Tenet", "rating": 7.5})
+
+        first = client.get("/api/v1/movies/?fields=title&sort=-rating&limit=1")
+        second = client.get(f"/api/v1/movies/?fields=title&sort=-rating&limit=1&after={first.headers['x-next-cursor']}")
+
+        assert first.json()[0]["title"] == "Inception"
+        assert second.json() == [{"id": linked_movie["id"] + 1, "title": "Tenet"}]
+
+    def test_etag_covers_only_included_relationships(self, client, linked_movie, sample_actor, sample_director):
+        url = f"/api/v1/movies/{linked_movie['id']}?fields=title&include=director"
+        etag = client.get(url).headers["etag"]
+
+        client.put(f"/api/v1/actors/{sample_actor['id']}", json={**sample_actor, "age": 50})
+        response_cache.clear()
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.put(f"/api/v1/directors/{sample_director['id']}", json={**sample_director, "age": 60})
+        response_cache.clear()
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_200_OK
+
+    def test_rating_stats_etag_follows_reviews(self, client, sample_movie):
+        url = f"/api/v1/movies/{sample_movie['id']}?fields=title&include=rating_stats"
+        etag = client.get(url).headers["etag"]
+
+        client.post("/api/v1/reviews/", json={"movie_id": sample_movie["id"], "reviewer_name": "Jane", "rating": 9.0})
+        response_cache.clear()
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["rating_stats"]["average_rating"] == 9.0
+
+    def test_async_mode(self, async_client):
+        director = async_client.post("/api/v1/directors/", json={"first_name": "Greta", "last_name": "Gerwig"}).json()
+        async_client.post("/api/v1/movies/", json={
+            "title": "Lady Bird", "description": "Sacramento", "release_year": 2017, "director_id": director["id"]
+        })
+
+        response = async_client.get("/api/v1/movies/?fields=title&include=director")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0] == {"id": 1, "title": "Lady Bird", "director": {**director, "age": None, "image_url": None}}
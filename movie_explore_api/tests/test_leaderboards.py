@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import update
+
+from database_models import MovieRatingStats, Review, TOP_PRIOR_RATING, TOP_PRIOR_REVIEWS, TREND_FIRST_LANDMARK
+from leaderboards import advance_landmark, rebuild_trends
+from rating_stats import TRENDING_HALF_LIFE_DAYS, add_rating, trend_at, trend_landmark, trend_weight
+from response_cache import response_cache
+
+
+@pytest.fixture
+def catalog(build_catalog):
+    return build_catalog([
+        {"title": "Inception", "release_year": 2010},
+        {"title": "Memento", "release_year": 2000, "genres": ["Drama"]},
+        {"title": "Heat", "release_year": 1995, "genres": ["Drama"]},
+        {"title": "Tenet", "release_year": 2020},
+    ])
+
+
+def review(db_session, movie_id, rating, days_ago=0.0):
+    created_at = datetime.utcnow() - timedelta(days=days_ago)
+    db_session.add(Review(movie_id=movie_id, reviewer_name="Jane", rating=rating, created_at=created_at))
+    add_rating(db_session, movie_id, rating, created_at)
+    db_session.commit()
+
+
+def titles(response) -> list:
+    assert response.status_code == status.HTTP_200_OK
+    return [movie["title"] for movie in response.json()]
+
+
+class TestTopMovies:
+
+    def test_bayesian_average_needs_many_reviews_to_win(self, client, db_session, catalog):
+        review(db_session, catalog["Inception"], 10)
+        for _ in range(30):
+            review(db_session, catalog["Memento"], 9)
+
+        movies = client.get("/api/v1/movies/top").json()
+
+        assert [movie["title"] for movie in movies] == ["Memento", "Inception"]
+        assert movies[0]["score"] == round((30 * 9 + TOP_PRIOR_REVIEWS * TOP_PRIOR_RATING) / (30 + TOP_PRIOR_REVIEWS), 4)
+        assert movies[1]["average_rating"] == 10.0
+        assert movies[1]["review_count"] == 1
+
+    def test_filters_by_genre_and_decade(self, client, db_session, catalog):
+        for title, rating in [("Inception", 9), ("Memento", 8), ("Heat", 7)]:
+            review(db_session, catalog[title], rating)
+
+        assert titles(client.get("/api/v1/movies/top?genre=Drama")) == ["Memento", "Heat"]
+        assert titles(client.get("/api/v1/movies/top?decade=1990")) == ["Heat"]
+        assert titles(client.get("/api/v1/movies/top?genre=Drama&decade=2010")) == []
+        assert client.get("/api/v1/movies/top?decade=1995").status_code == 422
+
+    def test_follows_review_writes(self, client, catalog):
+        first = client.post("/api/v1/reviews/", json={"movie_id": catalog["Heat"], "reviewer_name": "Ann", "rating": 9})
+        client.post("/api/v1/reviews/", json={"movie_id": catalog["Tenet"], "reviewer_name": "Bob", "rating": 8})
+        assert titles(client.get("/api/v1/movies/top")) == ["Heat", "Tenet"]
+
+        client.put(f"/api/v1/reviews/{first.json()['id']}", json={
+            "movie_id": catalog["Heat"], "reviewer_name": "Ann", "rating": 2,
+        })
+        assert titles(client.get("/api/v1/movies/top")) == ["Tenet", "Heat"]
+
+        client.delete(f"/api/v1/reviews/{first.json()['id']}")
+        assert titles(client.get("/api/v1/movies/top")) == ["Tenet"]
+
+    def test_reads_only_the_stats_index(self, db_session, catalog, query_budget, statements):
+        review(db_session, catalog["Inception"], 9)
+        statements.clear()
+
+        query_budget("GET", "/api/v1/movies/top?genre=Drama", 1)
+        query_budget("GET", "/api/v1/movies/trending", 1)
+
+        assert not any("reviews" in statement for statement in statements)
+
+
+class TestTrendingMovies:
+
+    def test_recent_reviews_outweigh_old_ones(self, client, db_session, catalog):
+        for _ in range(3):
+            review(db_session, catalog["Inception"], 10, days_ago=30)
+        review(db_session, catalog["Memento"], 8, days_ago=1)
+
+        movies = client.get("/api/v1/movies/trending").json()
+
+        assert [movie["title"] for movie in movies] == ["Memento", "Inception"]
+        assert movies[0]["score"] == pytest.approx(0.8 * 2 ** (-1 / TRENDING_HALF_LIFE_DAYS), rel=1e-3)
+        assert movies[1]["score"] == pytest.approx(3 * 2 ** (-30 / TRENDING_HALF_LIFE_DAYS), rel=1e-3)
+
+    def test_deleted_reviews_stop_trending(self, client, catalog):
+        created = client.post("/api/v1/reviews/", json={"movie_id": catalog["Heat"], "reviewer_name": "Ann", "rating": 9})
+        assert titles(client.get("/api/v1/movies/trending")) == ["Heat"]
+
+        client.delete(f"/api/v1/reviews/{created.json()['id']}")
+
+        assert titles(client.get("/api/v1/movies/trending")) == []
+
+    def test_reviews_without_created_at_do_not_trend(self, client, db_session, catalog):
+        created = client.post("/api/v1/reviews/", json={"movie_id": catalog["Heat"], "reviewer_name": "Ann", "rating": 9})
+        review_id = created.json()["id"]
+        # Rows written before created_at had a default, or by other tools.
+        db_session.execute(update(Review).where(Review.id == review_id).values(created_at=None))
+        db_session.execute(update(MovieRatingStats).values(trend_score=0))
+        db_session.commit()
+
+        response = client.put(f"/api/v1/reviews/{review_id}", json={
+            "movie_id": catalog["Heat"], "reviewer_name": "Ann", "rating": 4,
+        })
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get("/api/v1/movies/trending").json()[0]["score"] == 0
+        assert rebuild_trends(db_session, datetime.utcnow()) == 1
+
+        assert client.delete(f"/api/v1/reviews/{review_id}").status_code == status.HTTP_204_NO_CONTENT
+        assert titles(client.get("/api/v1/movies/trending")) == []
+
+    def test_rebuild_matches_incremental_scores(self, client, db_session, catalog):
+        for days_ago, rating in [(0, 9), (3, 7), (40, 10)]:
+            review(db_session, catalog["Heat"], rating, days_ago)
+        incremental = client.get("/api/v1/movies/trending").json()
+
+        assert rebuild_trends(db_session, datetime.utcnow()) == 1
+        db_session.commit()
+        response_cache.clear()
+
+        assert client.get("/api/v1/movies/trending").json() == incremental
+
+
+class TestTrendLandmark:
+
+    def test_advancing_keeps_decayed_scores(self, client, db_session, catalog):
+        review(db_session, catalog["Heat"], 9, days_ago=2)
+        review(db_session, catalog["Tenet"], 6)
+        before = client.get("/api/v1/movies/trending").json()
+
+        previous = advance_landmark(db_session, datetime.utcnow())
+        db_session.commit()
+        response_cache.clear()
+
+        assert previous == TREND_FIRST_LANDMARK
+        assert trend_landmark(db_session) > previous
+        after = client.get("/api/v1/movies/trending").json()
+        assert [movie["title"] for movie in after] == [movie["title"] for movie in before]
+        assert [movie["score"] for movie in after] == pytest.approx([movie["score"] for movie in before], abs=1e-4)
+
+    def test_reviews_decades_past_the_first_landmark(self, db_session, catalog):
+        later = TREND_FIRST_LANDMARK + timedelta(days=365 * 30)
+        # 2 ** (30 years of half-lives) overflows a double.
+        with pytest.raises(OverflowError):
+            trend_weight(9, later, TREND_FIRST_LANDMARK)
+
+        advance_landmark(db_session, later - timedelta(days=1))
+        db_session.add(Review(movie_id=catalog["Heat"], reviewer_name="Jane", rating=9, created_at=later))
+        add_rating(db_session, catalog["Heat"], 9, later)
+        db_session.commit()
+
+        stats = db_session.get(MovieRatingStats, catalog["Heat"])
+        assert trend_at(stats.trend_score, later, trend_landmark(db_session)) == pytest.approx(0.9)
+
+
+class TestLeaderboardCache:
+
+    def test_any_review_invalidates_cached_boards(self, client, catalog):
+        client.post("/api/v1/reviews/", json={"movie_id": catalog["Heat"], "reviewer_name": "Ann", "rating": 9})
+        client.get("/api/v1/movies/top")
+        assert client.get("/api/v1/movies/top").headers["x-cache"] == "HIT"
+
+        client.post("/api/v1/reviews/", json={"movie_id": catalog["Tenet"], "reviewer_name": "Bob", "rating": 10})
+
+        response = client.get("/api/v1/movies/top")
+        assert response.headers["x-cache"] == "MISS"
+        assert [movie["title"] for movie in response.json()] == ["Tenet", "Heat"]
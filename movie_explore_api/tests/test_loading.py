@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy.orm.strategy_options import Load
+
+from database_models import Movie
+from loading import LOADER_POLICIES, loader_options, parse_policy
+
+
+class TestLoaderPolicies:
+
+    def test_parse_policy_override(self):
+        assert parse_policy("reviews=subquery, genres=joined") == {
+            "reviews": "subquery",
+            "genres": "joined"
+        }
+
+    def test_parse_policy_rejects_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            parse_policy("reviews=lazy")
+
+    def test_collections_are_not_joined_by_default(self):
+        for endpoint, policy in LOADER_POLICIES.items():
+            for relationship in ("genres", "actors", "reviews", "movies"):
+                assert policy.get(relationship, "selectin") != "joined", endpoint
+
+    def test_loader_options_cover_policy(self):
+        options = loader_options("movie_detail", Movie)
+
+        assert len(options) == len(LOADER_POLICIES["movie_detail"])
+        assert all(isinstance(option, Load) for option in options)
@@ -0,0 +1,73 @@
+from fastapi import status
+
+from metrics import Histogram, LATENCY_BUCKETS, Metrics
+
+
+def sample(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{name} not in metrics")
+
+
+class TestMetrics:
+
+    def test_exposition_format(self, client):
+        response = client.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        # The scrape itself is in flight while it renders.
+        assert sample(response.text, "http_requests_in_flight") == 1
+
+    def test_route_histograms(self, client, sample_genre):
+        client.get(f"/api/v1/genres/{sample_genre['id']}")
+        client.get("/api/v1/genres/999")
+
+        text = client.get("/metrics").text
+        labels = 'method="GET",route="/api/v1/genres/{id}"'
+        assert sample(text, f"http_request_duration_seconds_count{{{labels}}}") == 2
+        assert sample(text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+        assert sample(text, f"http_request_db_seconds_sum{{{labels}}}") > 0
+        assert sample(text, f"http_request_serialization_seconds_count{{{labels}}}") == 2
+        assert sample(text, f'http_responses_total{{{labels},status="200"}}') == 1
+        assert sample(text, f'http_responses_total{{{labels},status="404"}}') == 1
+
+    def test_cache_hits_keep_route_template(self, client, sample_genre):
+        client.get("/api/v1/genres/")
+        client.get("/api/v1/genres/")
+
+        text = client.get("/metrics").text
+        assert sample(text, 'http_responses_total{method="GET",route="/api/v1/genres/",status="200"}') == 2
+
+    def test_unmatched_paths_share_a_label(self, client):
+        client.get("/no/such/path")
+        client.get("/another/missing/path")
+
+        text = client.get("/metrics").text
+        assert sample(text, 'http_responses_total{method="GET",route="<unmatched>",status="404"}') == 2
+
+
+class TestHistogram:
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram()
+        for value in (0.0005, 0.001, 0.003, 20.0):
+            histogram.observe(value)
+
+        lines = histogram.samples("latency", 'route="/"')
+
+        assert lines[0] == 'latency_bucket{route="/",le="0.001"} 2'
+        assert lines[2] == 'latency_bucket{route="/",le="0.005"} 3'
+        assert lines[len(LATENCY_BUCKETS)] == 'latency_bucket{route="/",le="+Inf"} 4'
+        assert lines[-2] == 'latency_sum{route="/"} 20.004500'
+        assert lines[-1] == 'latency_count{route="/"} 4'
+
+    def test_labels_are_escaped(self):
+        metrics = Metrics()
+        metrics.started()
+        metrics.finished("GET", 'a"b', 200, 0.1, 0.0, 0.0)
+
+        assert 'route="a\\"b"' in metrics.render()
+        assert metrics.in_flight == 0
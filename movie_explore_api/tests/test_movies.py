@@ -1,5 +1,7 @@
 import pytest
 from fastapi import status
+from database_models import Actor, Genre, Movie
+from pagination import encode_cursor
 
 
 class TestMoviesEndpoints:
@@ -161,3 +163,156 @@ class TestMoviesEndpoints:
         response = client.post("/api/v1/movies/", json=movie_data)
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestMoviesPagination:
+    """Tests for keyset pagination on the movie list."""
+
+    def _create_movies(self, client, director_id, specs):
+        for title, year, rating in specs:
+            client.post("/api/v1/movies/", json={
+                "title": title,
+                "description": "Test description",
+                "release_year": year,
+                "director_id": director_id,
+                "rating": rating
+            })
+
+    def _collect(self, client, params):
+        titles, after = [], None
+        while True:
+            page_params = dict(params, after=after) if after else params
+            response = client.get("/api/v1/movies/", params=page_params)
+            assert response.status_code == status.HTTP_200_OK
+            titles += [m["title"] for m in response.json()]
+            after = response.headers.get("X-Next-Cursor")
+            if not after:
+                return titles
+
+    def test_pages_follow_cursor(self, client, sample_director):
+        self._create_movies(client, sample_director["id"], [
+            ("Movie One", 2001, 7), ("Movie Two", 2002, 8), ("Movie Three", 2003, 9)
+        ])
+        response = client.get("/api/v1/movies/", params={"limit": 2})
+
+        assert len(response.json()) == 2
+        assert "X-Next-Cursor" in response.headers
+        assert self._collect(client, {"limit": 2}) == ["Movie One", "Movie Two", "Movie Three"]
+
+    def test_last_page_has_no_cursor(self, client, sample_movie):
+        response = client.get("/api/v1/movies/", params={"limit": 1})
+
+        assert len(response.json()) == 1
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_sort_descending_with_ties_and_nulls(self, client, sample_director):
+        self._create_movies(client, sample_director["id"], [
+            ("Movie A", 2001, 7), ("Movie B", 2002, None), ("Movie C", 2003, 7), ("Movie D", 2004, 9)
+        ])
+
+        assert self._collect(client, {"sort": "-rating", "limit": 1}) == [
+            "Movie D", "Movie C", "Movie A", "Movie B"
+        ]
+        assert self._collect(client, {"sort": "rating", "limit": 1}) == [
+            "Movie B", "Movie A", "Movie C", "Movie D"
+        ]
+
+    def test_cursor_stable_under_inserts(self, client, sample_director):
+        self._create_movies(client, sample_director["id"], [
+            ("Movie B", 2001, 7), ("Movie D", 2002, 8)
+        ])
+        first = client.get("/api/v1/movies/", params={"sort": "title", "limit": 1})
+        self._create_movies(client, sample_director["id"], [("Movie A", 2003, 9)])
+        second = client.get("/api/v1/movies/", params={
+            "sort": "title", "limit": 1, "after": first.headers["X-Next-Cursor"]
+        })
+
+        assert first.json()[0]["title"] == "Movie B"
+        assert second.json()[0]["title"] == "Movie D"
+
+    def test_invalid_cursor(self, client):
+        response = client.get("/api/v1/movies/", params={"after": "not-a-cursor"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("sort, value, last_id", [
+        ("rating", {"a": 1}, 5),
+        ("rating", [7], 5),
+        ("rating", "7", 5),
+        ("title", 7, 5),
+        ("release_year", "2001", 5),
+        ("release_year", True, 5),
+        ("rating", 7.0, True),
+    ])
+    def test_cursor_value_must_match_sort_column(self, client, sort, value, last_id):
+        response = client.get("/api/v1/movies/", params={
+            "sort": sort, "after": encode_cursor(sort, value, last_id)
+        })
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
+
+    @pytest.mark.parametrize("sort, value", [("rating", 7), ("rating", None), ("-title", "Movie B")])
+    def test_cursor_accepts_scalars_of_the_column_type(self, client, sort, value):
+        response = client.get("/api/v1/movies/", params={"sort": sort, "after": encode_cursor(sort, value, 1)})
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_cursor_from_other_sort_rejected(self, client, sample_director):
+        self._create_movies(client, sample_director["id"], [
+            ("Movie One", 2001, 7), ("Movie Two", 2002, 8)
+        ])
+        first = client.get("/api/v1/movies/", params={"sort": "title", "limit": 1})
+        response = client.get("/api/v1/movies/", params={
+            "sort": "rating", "after": first.headers["X-Next-Cursor"]
+        })
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_sort_key(self, client):
+        response = client.get("/api/v1/movies/", params={"sort": "description"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestMoviesFilters:
+    """Tests for combined relationship filters on the movie list."""
+
+    def test_filter_by_actor_matching_several_cast_members(self, client, db_session, sample_movie):
+        movie = db_session.get(Movie, sample_movie["id"])
+        movie.actors = [
+            Actor(first_name="Tom", last_name="Hardy"),
+            Actor(first_name="Tom", last_name="Berenger")
+        ]
+        db_session.commit()
+
+        response = client.get("/api/v1/movies/", params={"actor": "Tom"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == 1
+        assert len(data[0]["actors"]) == 2
+
+    def test_filter_by_genre_and_director(self, client, db_session, sample_movie):
+        movie = db_session.get(Movie, sample_movie["id"])
+        movie.genres = [Genre(type="Sci-Fi"), Genre(type="Thriller")]
+        db_session.commit()
+
+        response = client.get("/api/v1/movies/", params={"genre": "Sci-Fi", "director": "Nolan"})
+        assert [m["title"] for m in response.json()] == ["Inception"]
+
+        response = client.get("/api/v1/movies/", params={"genre": "Drama", "director": "Nolan"})
+        assert response.json() == []
+
+    def test_get_movie_by_id_embeds_relationships(self, client, db_session, sample_movie, sample_review):
+        movie = db_session.get(Movie, sample_movie["id"])
+        movie.genres = [Genre(type="Sci-Fi"), Genre(type="Thriller")]
+        movie.actors = [Actor(first_name="Tom", last_name="Hardy")]
+        db_session.commit()
+
+        data = client.get(f"/api/v1/movies/{sample_movie['id']}").json()
+
+        assert data["director"]["last_name"] == "Nolan"
+        assert sorted(g["type"] for g in data["genres"]) == ["Sci-Fi", "Thriller"]
+        assert [a["last_name"] for a in data["actors"]] == ["Hardy"]
+        assert [r["id"] for r in data["reviews"]] == [sample_review["id"]]
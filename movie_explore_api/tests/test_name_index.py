@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from database_models import Actor
+from name_index import TrigramIndex, tokenize, trigrams
+
+
+@pytest.fixture
+def index(db_session):
+    index = TrigramIndex(Actor)
+    index.ensure_loaded(db_session)
+    for id, first_name, last_name in [
+        (1, "Christopher", "Nolan"),
+        (2, "Jonathan", "Nolan"),
+        (3, "Leonardo", "DiCaprio"),
+        (4, "Penélope", "Cruz"),
+        (5, "Christoph", "Waltz"),
+    ]:
+        index.add(id, first_name, last_name)
+    return index
+
+
+class TestTrigramIndex:
+
+    def test_tokenize_strips_accents_and_case(self):
+        assert tokenize("Penélope CRUZ-Sánchez") == ["penelope", "cruz", "sanchez"]
+
+    def test_trigrams_are_padded(self):
+        assert trigrams("nolan") == {"  n", " no", "nol", "ola", "lan", "an "}
+
+    def test_typo_matches(self, index, db_session):
+        ids = [id for id, _ in index.search(db_session, "Nolen")]
+
+        assert sorted(ids) == [1, 2]
+
+    def test_exact_outranks_prefix(self, index, db_session):
+        ranked = index.search(db_session, "Christoph")
+
+        assert [id for id, _ in ranked] == [5, 1]
+        assert ranked[0][1] > ranked[1][1]
+
+    def test_substring_match(self, index, db_session):
+        assert [id for id, _ in index.search(db_session, "capri")] == [3]
+
+    def test_all_query_tokens_must_match(self, index, db_session):
+        assert [id for id, _ in index.search(db_session, "Cristopher Nolan")] == [1]
+        assert index.search(db_session, "Christopher Cruz") == []
+
+    def test_accent_insensitive(self, index, db_session):
+        assert [id for id, _ in index.search(db_session, "penelope")] == [4]
+
+    def test_update_and_remove(self, index, db_session):
+        index.add(3, "Leo", "Messi")
+        assert index.search(db_session, "DiCaprio") == []
+        assert [id for id, _ in index.search(db_session, "Messi")] == [3]
+
+        index.remove(3)
+        assert index.search(db_session, "Messi") == []
+        assert len(index) == 4
+
+    def test_limit(self, index, db_session):
+        assert len(index.search(db_session, "Nolan", limit=1)) == 1
+
+    def test_reload_swaps_in_a_new_index(self, index, db_session):
+        greta = Actor(first_name="Greta", last_name="Gerwig")
+        db_session.add(greta)
+        db_session.commit()
+        reading, resume = threading.Event(), threading.Event()
+
+        class SlowSession:
+            def execute(self, statement):
+                reading.set()
+                resume.wait(5)
+                return db_session.execute(statement)
+
+        reload = threading.Thread(target=index.reload, args=(SlowSession(),))
+        reload.start()
+        assert reading.wait(5)
+        # The lock is free while the replacement reads the database.
+        assert index._lock.acquire(blocking=False)
+        index._lock.release()
+        assert sorted(id for id, _ in index.search(db_session, "Nolan")) == [1, 2]
+        index.add(6, "Denis", "Villeneuve")
+        resume.set()
+        reload.join(5)
+
+        assert [id for id, _ in index.search(db_session, "Gerwig")] == [greta.id]
+        assert [id for id, _ in index.search(db_session, "Villeneuve")] == [6]
+        assert index.search(db_session, "Nolan") == []
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from pool_monitor import InstrumentedQueuePool, install_idle_ping, pool_settings, pool_status
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestPoolMonitor:
+
+    def test_checkouts_and_timeouts(self, engine):
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            status = pool_status(engine)
+            assert status["checked_out"] == 1
+
+        status = pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["checkouts"] == 1
+        assert status["checkout_timeouts"] == 1
+        assert status["wait_ms_histogram"]["le_100ms"] == 1
+        assert sum(status["wait_ms_histogram"].values()) == 2
+
+    def test_stats_survive_pool_recreate(self, engine):
+        with engine.connect():
+            pass
+        engine.dispose()
+
+        assert pool_status(engine)["checkouts"] == 1
+
+    def test_idle_connection_is_pinged(self, engine):
+        install_idle_ping(engine, idle_seconds=0)
+        with engine.connect():
+            pass
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        assert pool_status(engine)["idle_pings"] == 1
+
+    def test_busy_connection_is_not_pinged(self, engine):
+        install_idle_ping(engine, idle_seconds=3600)
+        for _ in range(3):
+            with engine.connect():
+                pass
+
+        assert pool_status(engine)["idle_pings"] == 0
+
+    def test_stale_connection_is_replaced(self, engine):
+        install_idle_ping(engine, idle_seconds=0)
+        with engine.connect() as connection:
+            dbapi_connection = connection.connection.dbapi_connection
+        # Simulate the server closing the connection while it idles in the pool.
+        dbapi_connection.close()
+
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert pool_status(engine)["stale_connections"] == 1
+
+    def test_settings_from_environment(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "32")
+        monkeypatch.setenv("DB_POOL_USE_LIFO", "false")
+
+        settings = pool_settings()
+
+        assert settings["pool_size"] == 32
+        assert settings["pool_use_lifo"] is False
+        assert settings["pool_recycle"] == 1800
+
+    def test_pool_endpoint(self, client):
+        response = client.get("/internal/db/pool")
+
+        assert response.status_code == 200
+        assert "pool" in response.json()["sync"]
@@ -0,0 +1,105 @@
+import logging
+
+import pytest
+from fastapi import status
+
+import loading
+import query_monitor
+from query_monitor import parse_server_timing
+
+MOVIES = 6
+
+# Statement budgets on a catalog of several movies, each with several actors,
+# genres and reviews. They must not grow with the catalog; a lazy load that
+# slips into serialization turns into one statement per row and fails here.
+BUDGETS = [
+    ("/api/v1/movies/", 4),
+    ("/api/v1/movies/1", 4),
+    ("/api/v1/movies/batch?ids=1,2,3", 4),
+    ("/api/v1/actors/", 2),
+    ("/api/v1/actors/1", 2),
+    ("/api/v1/actors/batch?ids=1,2", 2),
+    ("/api/v1/directors/", 2),
+    ("/api/v1/directors/1", 2),
+    ("/api/v1/directors/batch?ids=1,2", 2),
+    ("/api/v1/genres/", 1),
+    ("/api/v1/genres/1", 1),
+    ("/api/v1/reviews/?movie_id=1", 1),
+    ("/api/v1/reviews/movie/1/average", 1),
+]
+
+
+@pytest.fixture
+def catalog(client, build_catalog):
+    titles = [f"Movie {n}" for n in range(MOVIES)]
+    build_catalog([
+        {
+            "title": title, "description": "Benchmark", "release_year": 2000 + n, "rating": 7,
+            "director": f"Director Number {n % 3}",
+            "actors": [f"Actor Number {i}" for i in range(3)],
+            "genres": [f"Genre {i}" for i in range(3)],
+        }
+        for n, title in enumerate(titles)
+    ], reviews=[(title, 8.0) for title in titles])
+    return client
+
+
+class TestQueryMonitor:
+
+    def test_server_timing_header(self, client, sample_genre):
+        response = client.get("/api/v1/genres/")
+
+        timing = parse_server_timing(response.headers["server-timing"])
+        assert timing["db-statements"] == {"desc": "1"}
+        assert float(timing["db"]["dur"]) > 0
+        assert float(timing["app"]["dur"]) >= float(timing["db"]["dur"])
+        assert "db-repeated" not in timing
+
+    def test_writes_report_rows(self, client, sample_genre):
+        response = client.delete(f"/api/v1/genres/{sample_genre['id']}")
+
+        assert int(parse_server_timing(response.headers["server-timing"])["db-rows"]["desc"]) >= 1
+
+    def test_cache_hits_run_no_sql(self, client, sample_genre):
+        client.get("/api/v1/genres/")
+        response = client.get("/api/v1/genres/")
+
+        assert response.headers["x-cache"] == "HIT"
+        assert parse_server_timing(response.headers["server-timing"])["db-statements"] == {"desc": "0"}
+
+    def test_route_stats(self, client, sample_genre):
+        client.get(f"/api/v1/genres/{sample_genre['id']}")
+
+        stats = client.get("/internal/db/queries").json()
+        assert stats["GET /api/v1/genres/{id}"] == {
+            "requests": 1, "statements_avg": 1.0, "statements_max": 1,
+            "db_ms_avg": stats["GET /api/v1/genres/{id}"]["db_ms_avg"], "n_plus_one": 0, "repeated": None,
+        }
+
+    def test_flags_n_plus_one(self, catalog, monkeypatch, caplog):
+        # Without an eager loader, serializing each actor's movies lazy-loads them one actor at a time.
+        monkeypatch.setitem(loading.LOADER_POLICIES, "actor_list", {})
+        monkeypatch.setattr(query_monitor, "REPEAT_THRESHOLD", 3)
+
+        with caplog.at_level(logging.WARNING, logger="query_monitor"):
+            response = catalog.get("/api/v1/actors/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert parse_server_timing(response.headers["server-timing"])["db-repeated"] == {"desc": "3"}
+        stats = catalog.get("/internal/db/queries").json()["GET /api/v1/actors/"]
+        assert stats["n_plus_one"] == 1
+        assert stats["repeated"]["count"] == 3
+        assert "movie_actor" in stats["repeated"]["statement"]
+        assert "Possible N+1 in GET /api/v1/actors/" in caplog.text
+
+    @pytest.mark.parametrize("path, budget", BUDGETS, ids=[path for path, _ in BUDGETS])
+    def test_query_budget(self, catalog, query_budget, path, budget):
+        response = query_budget("GET", path, budget)
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+def test_parse_server_timing():
+    assert parse_server_timing('db;dur=1.5, db-statements;desc=4, app;dur=2') == {
+        "db": {"dur": "1.5"}, "db-statements": {"desc": "4"}, "app": {"dur": "2"},
+    }
@@ -0,0 +1,95 @@
+import pytest
+from fastapi import status
+from fastapi.routing import APIRoute
+
+from main import ROUTERS
+from response_cache import response_cache
+
+# One or more requests per GET route, with the tables each may read in full.
+# Unfiltered lists walk their root table in id order and stop at the page
+# limit; every other table must be reached through an index. A new GET route
+# fails test_every_route_is_covered until it gets an entry here.
+PLAN_CASES = [
+    ("/api/v1/movies/", "/api/v1/movies/?limit=10", {"movies"}),
+    ("/api/v1/movies/", "/api/v1/movies/?sort=-rating&limit=10", set()),
+    ("/api/v1/movies/", "/api/v1/movies/?sort=release_year&release_year=2010", set()),
+    ("/api/v1/movies/", "/api/v1/movies/?genre=Drama&actor=Leo&director=Nolan", {"movies"}),
+    # A substring LIKE cannot use an index; /api/v1/search is the indexed way.
+    ("/api/v1/movies/", "/api/v1/movies/?title=ince", {"movies"}),
+    ("/api/v1/movies/batch", "/api/v1/movies/batch?ids=1,2", set()),
+    ("/api/v1/movies/{id}", "/api/v1/movies/1", set()),
+    ("/api/v1/movies/top", "/api/v1/movies/top", set()),
+    ("/api/v1/movies/top", "/api/v1/movies/top?genre=Drama&decade=2010", set()),
+    ("/api/v1/movies/trending", "/api/v1/movies/trending?limit=5", set()),
+    ("/api/v1/movies/{id}/similar", "/api/v1/movies/1/similar", set()),
+    ("/api/v1/actors/", "/api/v1/actors/", {"actors"}),
+    ("/api/v1/actors/", "/api/v1/actors/?name=caprio&genre=Drama", set()),
+    ("/api/v1/actors/", "/api/v1/actors/?movie=ince", {"actors", "movies"}),
+    ("/api/v1/actors/batch", "/api/v1/actors/batch?ids=1", set()),
+    ("/api/v1/actors/{id}", "/api/v1/actors/1", set()),
+    ("/api/v1/directors/", "/api/v1/directors/?name=nolan", set()),
+    ("/api/v1/directors/batch", "/api/v1/directors/batch?ids=1", set()),
+    ("/api/v1/directors/{id}", "/api/v1/directors/1", set()),
+    ("/api/v1/genres/", "/api/v1/genres/", {"genres"}),
+    ("/api/v1/genres/{id}", "/api/v1/genres/1", set()),
+    ("/api/v1/reviews/", "/api/v1/reviews/?movie_id=1&min_rating=5", set()),
+    ("/api/v1/reviews/", "/api/v1/reviews/?min_rating=9", set()),
+    ("/api/v1/reviews/{id}", "/api/v1/reviews/1", set()),
+    ("/api/v1/reviews/movie/{movie_id}/average", "/api/v1/reviews/movie/1/average", set()),
+    ("/api/v1/search/", "/api/v1/search/?q=dream", set()),
+    ("/api/v1/autocomplete/", "/api/v1/autocomplete/?q=inc", set()),
+    ("/api/v1/export/movies", "/api/v1/export/movies", {"movies"}),
+    ("/api/v1/export/reviews", "/api/v1/export/reviews?format=csv", {"reviews"}),
+]
+
+
+@pytest.fixture
+def catalog(client, build_catalog):
+    # Only Inception gets an actor and a genre; the plans below must run
+    # against populated link tables.
+    build_catalog([
+        {"title": "Inception", "description": "A dream heist", "rating": 8, "actors": ["Leonardo DiCaprio"],
+         "genres": ["Drama"]},
+        {"title": "Interstellar", "description": "A dream heist", "rating": 8},
+    ], reviews=[("Inception", 9.0)])
+    return client
+
+
+def full_scans(connection, statement, parameters) -> set:
+    """Tables SQLite reads in full for ``statement`` (a ``SCAN`` step without an index)."""
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return {
+        detail.split()[1]
+        for _, _, _, detail in plan
+        if detail.startswith("SCAN ") and " USING " not in detail and "VIRTUAL TABLE" not in detail
+    }
+
+
+class TestQueryPlans:
+
+    def test_every_route_is_covered(self):
+        routes = {
+            route.path for router in ROUTERS for route in router.routes
+            if isinstance(route, APIRoute) and "GET" in route.methods and route.path.startswith("/api/v1/")
+        }
+
+        assert routes == {route for route, _, _ in PLAN_CASES}
+
+    @pytest.mark.parametrize("route, path, allowed", PLAN_CASES, ids=[path for _, path, _ in PLAN_CASES])
+    def test_no_unexpected_full_scans(self, catalog, db_session, statements, route, path, allowed):
+        # The first request builds the in-process indexes, which read whole
+        # tables once by design; the second shows the steady state.
+        catalog.get(path)
+        response_cache.clear()
+        statements.clear()
+        response = catalog.get(path)
+        assert response.status_code == status.HTTP_200_OK
+
+        with db_session.get_bind().connect() as connection:
+            scans = {
+                table: statement
+                for statement in statements if statement.lstrip().upper().startswith("SELECT")
+                for table in full_scans(connection, statement, statement.parameters)
+            }
+        unexpected = {table: statement for table, statement in scans.items() if table not in allowed}
+        assert not unexpected, f"Full table scan for {path}: {unexpected}"
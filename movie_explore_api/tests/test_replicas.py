@@ -0,0 +1,165 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import Base, get_db
+from database_models import Genre
+from main import ROUTERS
+from replicas import PIN_COOKIE, Replica, ReplicaPinMiddleware, ReplicaSet, copy_sqlite
+from response_cache import ResponseCacheMiddleware, response_cache
+from routes import internal
+
+
+def sqlite_db(path, *genres) -> str:
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([Genre(type=genre) for genre in genres])
+        db.commit()
+    engine.dispose()
+    return url
+
+
+def replica(url: str) -> Replica:
+    return Replica(url, create_engine(url))
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    """A primary and two replicas whose single genre names the database it lives in."""
+    response_cache.clear()
+    primary = sqlite_db(tmp_path / "primary.db", "Primary")
+    replica_set = ReplicaSet([
+        replica(sqlite_db(tmp_path / "replica1.db", "Replica1")),
+        replica(sqlite_db(tmp_path / "replica2.db", "Replica2")),
+    ])
+    monkeypatch.setattr(database, "replicas", replica_set)
+    monkeypatch.setattr(internal, "replicas", replica_set)
+    PrimarySession = sessionmaker(autoflush=False, bind=create_engine(primary))
+
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def make_client(cached: bool = False) -> TestClient:
+        app = FastAPI()
+        if cached:
+            app.add_middleware(ResponseCacheMiddleware)
+        app.add_middleware(ReplicaPinMiddleware, replicas=replica_set)
+        for router in ROUTERS:
+            app.include_router(router)
+        app.dependency_overrides[get_db] = override_get_db
+        return TestClient(app)
+
+    make_client.replicas = replica_set
+    make_client.primary = primary
+    yield make_client
+    response_cache.clear()
+
+
+def served_by(client) -> str:
+    return client.get("/api/v1/genres/").json()[0]["type"]
+
+
+class TestReadRouting:
+
+    def test_reads_alternate_between_replicas(self, cluster):
+        client = cluster()
+
+        assert [served_by(client) for _ in range(4)] == ["Replica1", "Replica2", "Replica1", "Replica2"]
+        assert [status["reads"] for status in client.get("/internal/db/replicas").json()] == [2, 2]
+
+    def test_writes_go_to_primary_and_pin_the_client(self, cluster):
+        client = cluster()
+
+        response = client.post("/api/v1/genres/", json={"type": "Noir"})
+
+        assert response.status_code == 201
+        assert PIN_COOKIE in response.headers["set-cookie"]
+        assert [genre["type"] for genre in client.get("/api/v1/genres/").json()] == ["Primary", "Noir"]
+
+    def test_expired_pin_reads_from_replicas(self, cluster):
+        client = cluster()
+        client.cookies.set(PIN_COOKIE, "1.0")
+
+        assert served_by(client) == "Replica1"
+
+    def test_failed_writes_and_batch_reads_do_not_pin(self, cluster):
+        client = cluster()
+
+        assert "set-cookie" not in client.post("/api/v1/genres/", json={}).headers
+        assert "set-cookie" not in client.post("/api/v1/movies/batch", json={"ids": [1]}).headers
+        assert served_by(client) == "Replica2"
+
+    def test_replica_snapshot(self, cluster, tmp_path):
+        client = cluster()
+        client.post("/api/v1/genres/", json={"type": "Noir"})
+        copy_sqlite(cluster.primary, [replica.url for replica in cluster.replicas.replicas])
+        client.cookies.clear()
+
+        assert [genre["type"] for genre in client.get("/api/v1/genres/").json()] == ["Primary", "Noir"]
+
+
+class TestHealth:
+
+    def test_unreachable_replica_is_skipped(self, cluster, tmp_path):
+        cluster.replicas.replicas.insert(0, replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"))
+        client = cluster()
+
+        assert [served_by(client) for _ in range(3)] == ["Replica1", "Replica2", "Replica1"]
+        status = client.get("/internal/db/replicas").json()[0]
+        assert status["healthy"] is False
+        assert status["failures"] == 1
+        assert status["last_error"].startswith("OperationalError")
+
+    def test_failed_replica_is_retried(self, cluster, tmp_path):
+        cluster.replicas.retry_seconds = 0
+        cluster.replicas.replicas.insert(0, replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"))
+        client = cluster()
+
+        # Its turn comes again after one round over the three replicas.
+        for _ in range(4):
+            served_by(client)
+
+        assert client.get("/internal/db/replicas").json()[0]["failures"] == 2
+
+    def test_query_errors_take_replica_out(self, cluster, tmp_path):
+        # An empty database: connections succeed, queries fail.
+        cluster.replicas.replicas[0] = replica(f"sqlite:///{tmp_path / 'empty.db'}")
+        client = cluster()
+
+        with pytest.raises(OperationalError):
+            served_by(client)
+
+        assert [served_by(client) for _ in range(2)] == ["Replica2", "Replica2"]
+
+    def test_primary_serves_reads_when_no_replica_is_healthy(self, cluster):
+        client = cluster()
+        for replica_ in cluster.replicas.replicas:
+            cluster.replicas.mark_down(replica_, OperationalError("SELECT 1", {}, Exception("down")))
+
+        assert served_by(client) == "Primary"
+
+
+class TestResponseCache:
+
+    def test_replica_reads_are_cached(self, cluster):
+        client = cluster(cached=True)
+
+        assert client.get("/api/v1/genres/").headers["x-cache"] == "MISS"
+        assert client.get("/api/v1/genres/").headers["x-cache"] == "HIT"
+
+    def test_replica_reads_after_a_write_are_not_cached(self, cluster):
+        writer, reader = cluster(cached=True), cluster(cached=True)
+        writer.post("/api/v1/genres/", json={"type": "Noir"})
+
+        assert reader.get("/api/v1/genres/").headers["x-cache"] == "MISS"
+        assert reader.get("/api/v1/genres/").headers["x-cache"] == "MISS"
@@ -0,0 +1,127 @@
+import pytest
+
+from response_cache import ResponseCache, response_tags
+
+
+@pytest.fixture
+def second_actor(client):
+    response = client.post("/api/v1/actors/", json={
+        "first_name": "Tom",
+        "last_name": "Hardy",
+        "age": 46,
+        "image_url": "https://example.com/hardy.jpg"
+    })
+    return response.json()
+
+
+class TestResponseCacheMiddleware:
+
+    def test_second_get_is_a_hit(self, client, sample_movie):
+        first = client.get(f"/api/v1/movies/{sample_movie['id']}")
+        second = client.get(f"/api/v1/movies/{sample_movie['id']}")
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+
+    def test_query_parameter_order_shares_entry(self, client, sample_movie):
+        client.get("/api/v1/movies/?title=inc&release_year=2010")
+        response = client.get("/api/v1/movies/?release_year=2010&title=inc")
+
+        assert response.headers["x-cache"] == "HIT"
+
+    def test_errors_are_not_cached(self, client):
+        client.get("/api/v1/movies/999")
+        response = client.get("/api/v1/movies/999")
+
+        assert response.status_code == 404
+        assert response.headers["x-cache"] == "MISS"
+
+    def test_write_evicts_only_affected_entries(self, client, sample_actor, second_actor):
+        client.get(f"/api/v1/actors/{sample_actor['id']}")
+        client.get(f"/api/v1/actors/{second_actor['id']}")
+        client.get("/api/v1/actors/")
+
+        client.put(f"/api/v1/actors/{sample_actor['id']}", json={**sample_actor, "age": 50})
+
+        updated = client.get(f"/api/v1/actors/{sample_actor['id']}")
+        assert updated.headers["x-cache"] == "MISS"
+        assert updated.json()["age"] == 50
+        assert client.get("/api/v1/actors/").headers["x-cache"] == "MISS"
+        assert client.get(f"/api/v1/actors/{second_actor['id']}").headers["x-cache"] == "HIT"
+
+    def test_embedded_entity_write_evicts_parent(self, client, sample_movie, sample_director):
+        client.get(f"/api/v1/movies/{sample_movie['id']}")
+
+        client.put(f"/api/v1/directors/{sample_director['id']}", json={**sample_director, "last_name": "Nolan Jr"})
+
+        response = client.get(f"/api/v1/movies/{sample_movie['id']}")
+        assert response.headers["x-cache"] == "MISS"
+        assert response.json()["director"]["last_name"] == "Nolan Jr"
+
+    def test_review_write_evicts_movie(self, client, sample_movie):
+        client.get(f"/api/v1/movies/{sample_movie['id']}")
+
+        client.post("/api/v1/reviews/", json={
+            "movie_id": sample_movie["id"], "reviewer_name": "Jane", "rating": 8.0, "comment": "Good"
+        })
+
+        response = client.get(f"/api/v1/movies/{sample_movie['id']}")
+        assert response.headers["x-cache"] == "MISS"
+        assert len(response.json()["reviews"]) == 1
+
+    def test_stats_endpoint(self, client, sample_movie):
+        client.get(f"/api/v1/movies/{sample_movie['id']}")
+        client.get(f"/api/v1/movies/{sample_movie['id']}")
+
+        stats = client.get("/internal/cache").json()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+class TestResponseCache:
+
+    def put(self, cache, key, body=b"x" * 100, tags=()):
+        cache.put(key, 200, [], body, set(tags), cache.epoch)
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=1000, ttl=60)
+        self.put(cache, "a")
+        self.put(cache, "b")
+        cache.get("a")
+        self.put(cache, "c")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.bytes <= 1000
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = ResponseCache(ttl=10)
+        now = [100.0]
+        monkeypatch.setattr("response_cache.time.monotonic", lambda: now[0])
+        self.put(cache, "a")
+
+        now[0] = 109.0
+        assert cache.get("a") is not None
+        now[0] = 111.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_store_after_concurrent_write_is_dropped(self):
+        cache = ResponseCache(ttl=60)
+        epoch = cache.epoch
+        cache.invalidate("movie:1")
+        cache.put("a", 200, [], b"{}", {"movie:1"}, epoch)
+
+        assert cache.get("a") is None
+
+    def test_response_tags(self):
+        body = [{"id": 1, "director": {"id": 4}, "actors": [{"id": 7}], "genres": []}]
+
+        tags = response_tags("movie", "/", [("genre", "Drama")], body)
+
+        assert tags == {"movie:*", "genre:*", "movie:1", "director:4", "actor:7"}
+        assert response_tags("movie", "/1", [], {"id": 1}) == {"movie:1"}
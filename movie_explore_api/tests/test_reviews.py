@@ -1,5 +1,9 @@
+import random
 import pytest
 from fastapi import status
+from sqlalchemy import func
+
+from database_models import Review
 
 
 class TestReviewsEndpoints:
@@ -142,3 +146,68 @@ class TestReviewsEndpoints:
         # Get reviews for this movie
         response = client.get("/api/v1/reviews/", params={"movie_id": sample_movie["id"]})
         assert len(response.json()) == 3
+
+
+class TestReviewAggregates:
+
+    def post_review(self, client, movie_id, rating):
+        return client.post("/api/v1/reviews/", json={
+            "movie_id": movie_id, "reviewer_name": "Reviewer", "rating": rating, "comment": None
+        }).json()
+
+    def average(self, client, movie_id):
+        return client.get(f"/api/v1/reviews/movie/{movie_id}/average").json()
+
+    def test_no_reviews(self, client, sample_movie):
+        data = self.average(client, sample_movie["id"])
+
+        assert data["average_rating"] is None
+        assert data["total_reviews"] == 0
+        assert set(data["histogram"].values()) == {0}
+
+    def test_histogram_tracks_writes(self, client, sample_movie):
+        first = self.post_review(client, sample_movie["id"], 8.5)
+        second = self.post_review(client, sample_movie["id"], 10.0)
+        client.put(f"/api/v1/reviews/{first['id']}", json={**first, "rating": 3.0})
+        client.delete(f"/api/v1/reviews/{second['id']}")
+        self.post_review(client, sample_movie["id"], 4.0)
+
+        data = self.average(client, sample_movie["id"])
+        assert data["total_reviews"] == 2
+        assert data["average_rating"] == 3.5
+        assert {bucket: count for bucket, count in data["histogram"].items() if count} == {"3": 1, "4": 1}
+
+    def test_average_is_one_query(self, query_budget, sample_review):
+        query_budget("GET", f"/api/v1/reviews/movie/{sample_review['movie_id']}/average", 1)
+
+    def test_embedded_in_movie_responses(self, client, sample_movie):
+        self.post_review(client, sample_movie["id"], 7.0)
+        self.post_review(client, sample_movie["id"], 9.0)
+
+        detail = client.get(f"/api/v1/movies/{sample_movie['id']}").json()
+        listed = client.get("/api/v1/movies/").json()[0]
+
+        assert detail["rating_stats"]["review_count"] == 2
+        assert detail["rating_stats"]["average_rating"] == 8.0
+        assert listed["rating_stats"] == detail["rating_stats"]
+
+    def test_matches_recomputed_aggregates(self, client, db_session, sample_movie):
+        rng = random.Random(3)
+        reviews = []
+        for _ in range(60):
+            action = rng.random()
+            if reviews and action < 0.25:
+                review = reviews.pop(rng.randrange(len(reviews)))
+                client.delete(f"/api/v1/reviews/{review['id']}")
+            elif reviews and action < 0.5:
+                review = rng.choice(reviews)
+                review["rating"] = rng.choice([1.0, 2.5, 5.0, 7.5, 9.9, 10.0])
+                client.put(f"/api/v1/reviews/{review['id']}", json=review)
+            else:
+                reviews.append(self.post_review(client, sample_movie["id"], rng.uniform(1, 10)))
+
+        data = self.average(client, sample_movie["id"])
+        count, average = db_session.query(func.count(Review.id), func.avg(Review.rating)).one()
+        assert data["total_reviews"] == count
+        assert data["average_rating"] == round(average, 2)
+        assert sum(data["histogram"].values()) == count
@@ -0,0 +1,97 @@
+import pytest
+from fastapi import status
+
+from text_search import highlight, snippet
+
+
+@pytest.fixture
+def catalog(client, sample_director):
+    movies = [
+        ("Inception", "A thief who steals corporate secrets through dream-sharing technology"),
+        ("Interstellar", "Explorers travel through a wormhole in space to ensure humanity's survival"),
+        ("Dream Theater", "A documentary about a progressive rock band"),
+    ]
+    created = []
+    for title, description in movies:
+        response = client.post("/api/v1/movies/", json={
+            "title": title,
+            "description": description,
+            "release_year": 2010,
+            "director_id": sample_director["id"]
+        })
+        created.append(response.json())
+    return created
+
+
+class TestSearchEndpoints:
+
+    def test_search_empty(self, client):
+        response = client.get("/api/v1/search/", params={"q": "anything"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    def test_search_requires_query(self, client):
+        response = client.get("/api/v1/search/")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_search_matches_description(self, client, catalog):
+        response = client.get("/api/v1/search/", params={"q": "wormhole"})
+
+        data = response.json()
+        assert [m["title"] for m in data] == ["Interstellar"]
+        assert "<mark>wormhole</mark>" in data[0]["description_snippet"]
+
+    def test_search_ranks_title_matches_first(self, client, catalog):
+        response = client.get("/api/v1/search/", params={"q": "dream"})
+
+        data = response.json()
+        assert [m["title"] for m in data] == ["Dream Theater", "Inception"]
+        assert data[0]["title_highlight"] == "<mark>Dream</mark> Theater"
+        assert data[0]["score"] > data[1]["score"]
+
+    def test_search_escapes_stored_markup(self, client, sample_director):
+        client.post("/api/v1/movies/", json={
+            "title": "<script>alert(1)</script> Dreams",
+            "description": "Tom & Jerry <b>dream</b>",
+            "release_year": 2010,
+            "director_id": sample_director["id"]
+        })
+
+        movie = client.get("/api/v1/search/", params={"q": "dream"}).json()[0]
+
+        assert movie["title_highlight"] == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>Dreams</mark>"
+        assert movie["description_snippet"] == "Tom &amp; Jerry &lt;b&gt;<mark>dream</mark>&lt;/b&gt;"
+
+    def test_highlight_escapes_outside_marks(self):
+        # The MySQL path highlights in Python rather than in FTS5.
+        assert highlight("<i>Dream</i> & co", ["dream"]) == "&lt;i&gt;<mark>Dream</mark>&lt;/i&gt; &amp; co"
+        assert snippet("a <script> about dreams", ["dream"]) == "a &lt;script&gt; about <mark>dreams</mark>"
+
+    def test_search_prefix_and_all_terms(self, client, catalog):
+        response = client.get("/api/v1/search/", params={"q": "Interst wormh"})
+        assert [m["title"] for m in response.json()] == ["Interstellar"]
+
+        response = client.get("/api/v1/search/", params={"q": "Interstellar dream"})
+        assert response.json() == []
+
+    def test_search_ignores_query_syntax(self, client, catalog):
+        response = client.get("/api/v1/search/", params={"q": '"incep*('})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [m["title"] for m in response.json()] == ["Inception"]
+
+    def test_search_follows_update_and_delete(self, client, catalog, sample_director):
+        inception = catalog[0]
+        client.put(f"/api/v1/movies/{inception['id']}", json={
+            "title": "Inception",
+            "description": "A heist inside layered subconscious worlds",
+            "release_year": 2010,
+            "director_id": sample_director["id"]
+        })
+        assert client.get("/api/v1/search/", params={"q": "steals"}).json() == []
+        assert [m["title"] for m in client.get("/api/v1/search/", params={"q": "heist"}).json()] == ["Inception"]
+
+        client.delete(f"/api/v1/movies/{inception['id']}")
+        assert client.get("/api/v1/search/", params={"q": "heist"}).json() == []
@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from typing import Any, List
+
+import pytest
+from fastapi.exceptions import ResponseValidationError
+from pydantic import BaseModel, TypeAdapter, field_validator
+
+from batch import fetch_batch
+from database_models import Actor, Director, Movie, Review
+from loading import loader_options
+from models import (
+    ActorDetailResponse, DirectorDetailResponse, MovieBatchResponse, MovieDetailResponse, MovieResponse, ReviewResponse,
+)
+from serialization import Mismatch, encoder, render
+
+
+def pydantic_json(model, content) -> bytes:
+    adapter = TypeAdapter(List[model] if isinstance(content, list) else model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+@pytest.fixture
+def catalog(build_catalog, db_session):
+    build_catalog([
+        {
+            "title": "Inception", "description": "A mind-bending thriller", "rating": 8.8,
+            "image_url": "https://example.com/inception.jpg",
+            "director": {"first_name": "Christopher", "last_name": "Nolan", "age": 54},
+            "actors": [{"first_name": "Leonardo", "last_name": "DiCaprio", "age": 49}], "genres": ["Sci-Fi"],
+        },
+        {"title": "Interstellar", "description": "A mind-bending thriller"},
+    ], reviews=[("Inception", 9.0, "Amazing movie!"), ("Inception", 7)])
+    return db_session
+
+
+class TestRender:
+
+    @pytest.mark.parametrize("model, endpoint", [
+        (MovieDetailResponse, "movie_list"),
+        (ActorDetailResponse, "actor_list"),
+        (DirectorDetailResponse, "director_list"),
+    ])
+    def test_matches_pydantic(self, catalog, model, endpoint):
+        orm_model = {MovieDetailResponse: Movie, ActorDetailResponse: Actor, DirectorDetailResponse: Director}[model]
+        objects = catalog.query(orm_model).options(*loader_options(endpoint, orm_model)).all()
+
+        # Well-formed rows take the fast path rather than the validating one.
+        assert [encoder(model)(obj) for obj in objects]
+        assert render(model, objects).body == pydantic_json(model, objects)
+
+    def test_reviews_match_pydantic(self, catalog):
+        reviews = catalog.query(Review).all()
+
+        assert render(ReviewResponse, reviews).body == pydantic_json(ReviewResponse, reviews)
+
+    def test_batch_matches_pydantic(self, catalog):
+        batch = fetch_batch(catalog, Movie, "movie_batch", [2, 99, 1])
+
+        assert render(MovieBatchResponse, batch).body == pydantic_json(MovieBatchResponse, batch)
+
+    def test_single_object_and_headers(self, catalog):
+        movie = catalog.get(Movie, 1)
+
+        response = render(MovieResponse, movie, {"ETag": 'W/"1"'}, status_code=201)
+
+        assert response.status_code == 201
+        assert response.headers["etag"] == 'W/"1"'
+        assert response.headers["content-type"] == "application/json"
+        assert response.body == pydantic_json(MovieResponse, movie)
+
+
+class TestEncoder:
+
+    def test_coerces_ints_in_float_fields(self):
+        movie = {"id": 1, "title": "Alien", "description": "", "release_year": 1979, "director_id": 1, "rating": 8}
+
+        assert encoder(MovieResponse)(movie)["rating"] == 8.0
+        assert render(MovieResponse, movie).body == pydantic_json(MovieResponse, movie)
+
+    @pytest.mark.parametrize("created_at", [
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 1, 12, 30, 5, 4500),
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+    ])
+    def test_datetimes_match_pydantic(self, created_at):
+        review = {"id": 1, "movie_id": 1, "reviewer_name": "Jane", "rating": 9.5, "comment": None, "created_at": created_at}
+
+        assert render(ReviewResponse, review).body == pydantic_json(ReviewResponse, review)
+
+    def test_missing_attributes_use_defaults(self):
+        movie = {"id": 1, "title": "Alien", "description": "", "release_year": 1979, "director_id": 1}
+
+        assert render(MovieDetailResponse, movie).body == pydantic_json(MovieDetailResponse, movie)
+
+    def test_none_in_required_field_fails_validation(self):
+        movie = {"id": 1, "title": None, "description": "", "release_year": 1979, "director_id": 1}
+
+        with pytest.raises(Mismatch):
+            encoder(MovieResponse)(movie)
+        with pytest.raises(ResponseValidationError):
+            render(MovieResponse, [movie])
+
+    def test_float_in_int_field_is_validated(self):
+        movie = {"id": 1, "title": "Alien", "description": "", "release_year": 1979.0, "director_id": 1}
+
+        assert render(MovieResponse, movie).body == pydantic_json(MovieResponse, movie)
+        assert b'"release_year":1979,' in render(MovieResponse, movie).body
+        with pytest.raises(ResponseValidationError):
+            render(MovieResponse, {**movie, "release_year": 1979.5})
+
+    def test_falls_back_for_validators(self):
+        class Shouting(BaseModel):
+            name: str
+
+            @field_validator("name")
+            @classmethod
+            def upper(cls, value):
+                return value.upper()
+
+        assert encoder(Shouting) is None
+        assert render(Shouting, [{"name": "nolan"}]).body == b'[{"name":"NOLAN"}]'
+
+    def test_falls_back_for_unsupported_types(self):
+        class Loose(BaseModel):
+            value: Any
+
+        assert encoder(Loose) is None
+        assert render(Loose, {"value": {1, 2}}).body == pydantic_json(Loose, {"value": {1, 2}})
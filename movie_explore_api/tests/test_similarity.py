@@ -0,0 +1,163 @@
+import random
+
+import pytest
+from fastapi import status
+from sqlalchemy import select
+
+import similarity
+from database_models import Actor, Genre, Movie, MovieSimilarity
+from query_monitor import parse_server_timing
+
+
+def stored(db_session) -> list:
+    db_session.expire_all()
+    return db_session.execute(
+        select(MovieSimilarity.movie_id, MovieSimilarity.position, MovieSimilarity.similar_id, MovieSimilarity.score)
+        .order_by(MovieSimilarity.movie_id, MovieSimilarity.position)
+    ).all()
+
+
+def assert_matches_rebuild(db_session):
+    incremental = stored(db_session)
+    similarity.rebuild(db_session, workers=1)
+    db_session.commit()
+    assert incremental == stored(db_session)
+
+
+@pytest.fixture
+def catalog(client, build_catalog):
+    build_catalog([
+        {"title": "Inception", "actors": ["Leonardo DiCaprio", "Elliot Page"], "genres": ["Sci-Fi", "Thriller"]},
+        {"title": "Interstellar", "actors": ["Matthew McConaughey"], "genres": ["Sci-Fi", "Drama"]},
+        {
+            "title": "Shutter Island", "director": "Martin Scorsese", "actors": ["Leonardo DiCaprio"],
+            "genres": ["Thriller"],
+        },
+        {"title": "The Irishman", "director": "Martin Scorsese", "actors": ["Robert De Niro"], "genres": ["Drama"]},
+        {"title": "Juno", "director": "Jason Reitman", "actors": ["Elliot Page"], "genres": ["Comedy"]},
+        {"title": "Airplane!", "director": "Jim Abrahams"},
+    ], chunk_size=7)
+    return client
+
+
+def random_catalog(rng, movies) -> list:
+    return [
+        {
+            "title": f"Movie {n}",
+            "director": f"Director Number {rng.randrange(6)}",
+            "actors": sorted({f"Actor Number {rng.randrange(30)}" for _ in range(rng.randrange(4))}),
+            "genres": sorted({f"Genre {rng.randrange(5)}" for _ in range(rng.randrange(1, 3))}),
+        }
+        for n in range(movies)
+    ]
+
+
+class TestSimilarMovies:
+
+    def test_ranks_by_shared_links(self, catalog):
+        similar = catalog.get("/api/v1/movies/1/similar").json()
+
+        # Shutter Island shares an actor and a genre with Inception, as
+        # Interstellar shares the director and a genre, but has fewer links of
+        # its own. Juno only shares an actor.
+        assert [movie["title"] for movie in similar] == ["Shutter Island", "Interstellar", "Juno"]
+        assert similar[0]["score"] > similar[1]["score"] > similar[2]["score"] > 0
+        assert set(similar[0]) == {"id", "title", "release_year", "image_url", "rating", "score"}
+
+    def test_scores_are_symmetric(self, catalog):
+        inception = catalog.get("/api/v1/movies/1/similar").json()
+        interstellar = catalog.get("/api/v1/movies/2/similar").json()
+
+        assert interstellar[0]["title"] == "Inception"
+        assert interstellar[0]["score"] == inception[1]["score"]
+
+    def test_limit(self, catalog):
+        assert len(catalog.get("/api/v1/movies/1/similar?limit=2").json()) == 2
+        assert catalog.get("/api/v1/movies/1/similar?limit=0").status_code == 422
+
+    def test_movie_without_links(self, catalog):
+        assert catalog.get("/api/v1/movies/6/similar").json() == []
+
+    def test_missing_movie(self, catalog):
+        response = catalog.get("/api/v1/movies/999/similar")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"] == "Movie with id 999 not found"
+
+    def test_one_statement(self, catalog):
+        response = catalog.get("/api/v1/movies/1/similar")
+
+        assert parse_server_timing(response.headers["server-timing"])["db-statements"]["desc"] == "1"
+
+
+class TestIncrementalRefresh:
+
+    def test_import_matches_rebuild(self, catalog, db_session):
+        assert_matches_rebuild(db_session)
+
+    def test_link_changes_match_rebuild(self, client, db_session, build_catalog):
+        rng = random.Random(7)
+        build_catalog(random_catalog(rng, 60), chunk_size=7)
+        assert_matches_rebuild(db_session)
+
+        movie = db_session.get(Movie, 5)
+        client.put("/api/v1/movies/5", json={
+            "title": movie.title, "description": "", "release_year": 2010,
+            "director_id": (movie.director_id % 6) + 1,
+        })
+        assert_matches_rebuild(db_session)
+
+        client.delete(f"/api/v1/actors/{db_session.scalars(select(Actor.id)).first()}")
+        assert_matches_rebuild(db_session)
+
+        client.delete(f"/api/v1/genres/{db_session.scalars(select(Genre.id)).first()}")
+        assert_matches_rebuild(db_session)
+
+        client.delete("/api/v1/directors/2")
+        assert_matches_rebuild(db_session)
+
+        client.delete("/api/v1/movies/9")
+        assert_matches_rebuild(db_session)
+
+        client.post("/api/v1/movies/", json={
+            "title": "Newcomer", "description": "", "release_year": 2020, "director_id": 3,
+        })
+        build_catalog([
+            {"title": f"Late {n}", "director": "Director Number 1", "actors": [f"Actor Number {n}"],
+             "genres": ["Genre 1"]}
+            for n in range(5)
+        ], chunk_size=7)
+        assert_matches_rebuild(db_session)
+
+    def test_deleted_movie_leaves_every_list(self, catalog, db_session):
+        catalog.delete("/api/v1/movies/2")
+
+        assert all(2 not in (movie_id, similar_id) for movie_id, _, similar_id, _ in stored(db_session))
+        assert "Interstellar" not in [movie["title"] for movie in catalog.get("/api/v1/movies/1/similar").json()]
+
+    def test_cached_lists_follow_link_changes(self, catalog):
+        url = "/api/v1/movies/5/similar"
+        assert [movie["title"] for movie in catalog.get(url).json()] == ["Inception"]
+        assert catalog.get(url).headers["x-cache"] == "HIT"
+
+        catalog.delete("/api/v1/actors/2")
+
+        response = catalog.get(url)
+        assert response.headers["x-cache"] == "MISS"
+        assert response.json() == []
+
+
+class TestRebuild:
+
+    def test_process_pool_matches_single_process(self, db_session, build_catalog, monkeypatch):
+        build_catalog(random_catalog(random.Random(3), 40), chunk_size=7)
+        expected = stored(db_session)
+        # Several blocks, so the rows are scored by the pool.
+        monkeypatch.setattr(similarity, "BLOCK_CELLS", 400)
+
+        assert similarity.rebuild(db_session, workers=2) == len(expected)
+        db_session.commit()
+        assert stored(db_session) == expected
+
+    def test_empty_catalog(self, db_session):
+        assert similarity.rebuild(db_session, workers=2) == 0
@@ -0,0 +1,141 @@
+import html
+import re
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_WORDS = 16
+# FTS5 marks matches with these, and the text is escaped before they become
+# HIGHLIGHT_OPEN / HIGHLIGHT_CLOSE.
+FTS_OPEN = "\x02"
+FTS_CLOSE = "\x03"
+
+# BM25 column weights for the FTS5 table: a title match counts ten times a
+# description match. InnoDB scores the combined FULLTEXT index as a whole.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def query_terms(q: str) -> list:
+    return re.findall(r"\w+", q.lower())
+
+
+def index_movie(db: Session, movie):
+    """Insert or replace the movie's row in the SQLite FTS table.
+
+    MySQL maintains its FULLTEXT index inside the same transaction, so this is a
+    no-op there.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    unindex_movie(db, movie.id)
+    db.execute(
+        text("INSERT INTO movies_fts (rowid, title, description) VALUES (:id, :title, :description)"),
+        {"id": movie.id, "title": movie.title, "description": movie.description}
+    )
+
+
+def index_new_movies(db: Session, movies: list):
+    """Bulk ``index_movie`` for rows that were just inserted (``id``, ``title``, ``description`` dicts)."""
+    if db.get_bind().dialect.name != "sqlite" or not movies:
+        return
+    db.execute(text("INSERT INTO movies_fts (rowid, title, description) VALUES (:id, :title, :description)"), movies)
+
+
+def unindex_movie(db: Session, movie_id: int):
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    db.execute(text("DELETE FROM movies_fts WHERE rowid = :id"), {"id": movie_id})
+
+
+def search_movies(db: Session, q: str, limit: int) -> list:
+    terms = query_terms(q)
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == "sqlite":
+        return _search_sqlite(db, terms, limit)
+    return _search_mysql(db, terms, limit)
+
+
+def _search_sqlite(db: Session, terms: list, limit: int) -> list:
+    rows = db.execute(
+        text(
+            "SELECT m.id, m.title, m.release_year, m.image_url, "
+            f"-bm25(movies_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score, "
+            "highlight(movies_fts, 0, :open, :close) AS title_highlight, "
+            f"snippet(movies_fts, 1, :open, :close, '…', {SNIPPET_WORDS}) AS description_snippet "
+            "FROM movies_fts JOIN movies m ON m.id = movies_fts.rowid "
+            "WHERE movies_fts MATCH :match "
+            "ORDER BY score DESC, m.id "
+            "LIMIT :limit"
+        ),
+        {"match": " ".join(f'"{term}"*' for term in terms), "limit": limit, "open": FTS_OPEN, "close": FTS_CLOSE}
+    ).mappings().all()
+    return [
+        {
+            **row,
+            "title_highlight": _fts_html(row["title_highlight"] or ""),
+            "description_snippet": _fts_html(row["description_snippet"] or ""),
+        }
+        for row in rows
+    ]
+
+
+def _fts_html(value: str) -> str:
+    return html.escape(value).replace(FTS_OPEN, HIGHLIGHT_OPEN).replace(FTS_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def _search_mysql(db: Session, terms: list, limit: int) -> list:
+    match = " ".join(f"+{term}*" for term in terms)
+    rows = db.execute(
+        text(
+            "SELECT id, title, release_year, image_url, description, "
+            "MATCH (title, description) AGAINST (:match IN BOOLEAN MODE) AS score "
+            "FROM movies "
+            "WHERE MATCH (title, description) AGAINST (:match IN BOOLEAN MODE) "
+            "ORDER BY score DESC, id "
+            "LIMIT :limit"
+        ),
+        {"match": match, "limit": limit}
+    ).mappings().all()
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "release_year": row["release_year"],
+            "image_url": row["image_url"],
+            "score": row["score"],
+            "title_highlight": highlight(row["title"] or "", terms),
+            "description_snippet": snippet(row["description"] or "", terms),
+        }
+        for row in rows
+    ]
+
+
+def _term_pattern(terms: list):
+    return re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+
+
+def highlight(value: str, terms: list) -> str:
+    """``value`` as HTML, with the words matching ``terms`` wrapped in ``<mark>``.
+
+    Everything but the marks is escaped, so clients can render the result as is.
+    """
+    parts, end = [], 0
+    for match in _term_pattern(terms).finditer(value):
+        parts += [html.escape(value[end:match.start()]), HIGHLIGHT_OPEN, html.escape(match.group(0)), HIGHLIGHT_CLOSE]
+        end = match.end()
+    parts.append(html.escape(value[end:]))
+    return "".join(parts)
+
+
+def snippet(value: str, terms: list) -> str:
+    words = value.split()
+    pattern = _term_pattern(terms)
+    first = next((i for i, word in enumerate(words) if pattern.search(word)), 0)
+    start = max(0, first - SNIPPET_WORDS // 4)
+    window = " ".join(words[start:start + SNIPPET_WORDS])
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + SNIPPET_WORDS < len(words) else ""
+    return prefix + highlight(window, terms) + suffix